@@ -1,25 +1,36 @@
+import argparse
 import json
 import socket
 import time
 import os
 import sys
 import threading
-from typing import Dict
+from collections import Counter
+from concurrent.futures import CancelledError, Future, wait
+from typing import Callable, Dict, List, Optional, Tuple
 
 try:
     import wx
     import wx.lib.mixins.inspection as WIT
     import wx.adv
+    import wx.grid
 except ImportError as err:
     print("wxPython required: http://www.wxpython.org")
     sys.exit(1)
 
-try:
-    import ahttp
-except ImportError as err:
-    print("ahttp required: http://stash/projects/DVG/repos/ahttp/browse")
-    sys.exit(1)
-http = ahttp.start()
+from nexxapi import ControlServer
+from nexxcapabilities import MAX_CHANNELS, CapabilityCache, Capabilities, probe
+from nexxclone import clone_card, clone_input
+from nexxdiscovery import host_count, scan
+from nexxinventory import Inventory, format_age
+from nexxlock import DEFAULT_DIRECTORY as DEFAULT_LOCK_DIRECTORY, CardLocked, LockManager
+from nexxmonitor import DriftMonitor
+import nexxschema
+from nexxscheduler import Scheduler
+from nexxsession import Sessions
+from nexxstate import MAX_INPUTS, Snapshot, TrapMatrix, expand_templates
+from nexxclient import (DEFAULT_IDLE_TIMEOUT, DEFAULT_LATENCY_CEILING, DEFAULT_POOL_SIZE, TRANSPORTS,
+                        RequestEngine, RequestError, Speculation, Transport, Unsupported, create_transport)
 
 DEBUG = False  # Enable/disable the debug stderr/stdout window
 APPNAME = "Bulk Standard MV Controller"
@@ -28,25 +39,72 @@ COMPANYNAME = "Evertz Microsystems Ltd."
 PRODUCTNAME = "Bulk Notify Controller"
 COPYRIGHT = "2025 Evertz Microsystems Ltd."
 VERSION = "0.1"
-BASE_API = "v.api/apis/EV/"
 IP_LOC = "nexxIP"
+SNAPSHOT_WILDCARD = "NEXX snapshots (*.nxs)|*.nxs"
+LATENCY_CEILING_LOC = "latencyCeilingMs"
+PREFETCH_ALL_LOC = "prefetchAllInputs"
+MONITOR_LOC = "driftMonitor"
+CONTROL_API_LOC = "controlApi"
+LOCK_DIR_LOC = "lockDirectory"
+FLEET_LOC = "fleetTargets"
 # Define colors
 DARK_GRAY = wx.Colour(50, 50, 50)
 WHITE = wx.Colour(255, 255, 255)
 YELLOW = wx.Colour(255, 255, 0)
+OUTLIER_RED = wx.Colour(255, 170, 170)
+PENDING_BLUE = wx.Colour(60, 70, 110)
+ERROR_RED = wx.Colour(130, 40, 40)
+DRIFT_ORANGE = wx.Colour(170, 100, 20)
+UNSUPPORTED_GRAY = wx.Colour(90, 90, 90)
+FIELD_COLOURS = {"pending": PENDING_BLUE, "loaded": DARK_GRAY, "error": ERROR_RED, "changed": DRIFT_ORANGE,
+                 "unsupported": UNSUPPORTED_GRAY}
+# Every page's parameters, ranges and labels (nexx_schema.json)
+SCHEMA = nexxschema.load()
 
 
 class AppFrame(wx.Frame):
     """Main application frame (window)"""
 
-    def __init__(self, debug=0):
+    def __init__(self, debug=0, transport: Transport = None):
         """Initialize our main application frame."""
         # Call the original constructor to do its job
         TITLE = "%s v%s" % (PRODUCTNAME, VERSION)
         wx.Frame.__init__(self, parent=None, title=TITLE, size=(1250, 800))
         self.wxconfig = wx.Config()
-        self.http = ahttp.start()
+        self.transport = transport or create_transport("ahttp")
+        ceiling_ms = self.wxconfig.ReadInt(LATENCY_CEILING_LOC, defaultVal=int(DEFAULT_LATENCY_CEILING * 1000))
+        self.engine = RequestEngine(self.transport, latency_ceiling=ceiling_ms / 1000)
         menubar = wx.MenuBar()
+        fileMenu = wx.Menu()
+        save_snapshot_item = fileMenu.Append(wx.ID_ANY, "&Save Snapshot...")
+        compare_snapshots_item = fileMenu.Append(wx.ID_ANY, "&Compare Snapshots...")
+        fileMenu.AppendSeparator()
+        fileMenu.Append(wx.ID_EXIT, "E&xit")
+        self.Bind(wx.EVT_MENU, self.OnExit, id=wx.ID_EXIT)
+        menubar.Append(fileMenu, "&File")
+        fleetMenu = wx.Menu()
+        discover_item = fleetMenu.Append(wx.ID_ANY, "&Discover Cards...")
+        query_inventory_item = fleetMenu.Append(wx.ID_ANY, "&Query Inventory...")
+        menubar.Append(fleetMenu, "F&leet")
+        cardMenu = wx.Menu()
+        clone_input_item = cardMenu.Append(wx.ID_ANY, "&Clone Input...")
+        clone_card_item = cardMenu.Append(wx.ID_ANY, "Clone to &Other Cards...")
+        menubar.Append(cardMenu, "&Card")
+        settingsMenu = wx.Menu()
+        latency_item = settingsMenu.Append(wx.ID_ANY, "&Latency Ceiling...")
+        self.Bind(wx.EVT_MENU, self.OnLatencyCeiling, latency_item)
+        self.prefetch_all_item = settingsMenu.AppendCheckItem(wx.ID_ANY, "&Prefetch All Inputs on Connect")
+        self.prefetch_all_item.Check(self.wxconfig.ReadBool(PREFETCH_ALL_LOC, defaultVal=False))
+        self.Bind(wx.EVT_MENU, self.OnPrefetchAll, self.prefetch_all_item)
+        self.monitor_item = settingsMenu.AppendCheckItem(wx.ID_ANY, "&Monitor for External Changes")
+        self.monitor_item.Check(self.wxconfig.ReadBool(MONITOR_LOC, defaultVal=False))
+        self.Bind(wx.EVT_MENU, self.OnMonitor, self.monitor_item)
+        self.control_api_item = settingsMenu.AppendCheckItem(wx.ID_ANY, "Local &Job API")
+        self.control_api_item.Check(self.wxconfig.ReadBool(CONTROL_API_LOC, defaultVal=False))
+        self.Bind(wx.EVT_MENU, self.OnControlApi, self.control_api_item)
+        lock_dir_item = settingsMenu.Append(wx.ID_ANY, "Card Lock &Directory...")
+        self.Bind(wx.EVT_MENU, self.OnLockDirectory, lock_dir_item)
+        menubar.Append(settingsMenu, "&Settings")
         helpMenu = wx.Menu()
         helpMenu.Append(wx.ID_ABOUT, "&About")
         menubar.Append(helpMenu, "&Help")
@@ -54,11 +112,38 @@ class AppFrame(wx.Frame):
         self.SetMenuBar(menubar)
 
         self.CreateStatusBar(number=2, style=wx.STB_DEFAULT_STYLE)
-        self.SetStatusWidths([-1, 100])
+        self.SetStatusWidths([-1, 260])
         self.SetStatusText("Welcome to NEXX Bulk Controller", 0)
 
         self.panel = AppPanel(frame=self, wxconfig=self.wxconfig,
-                              http_thread=self.http)
+                              engine=self.engine)
+        self.Bind(wx.EVT_MENU, self.panel.on_save_snapshot, save_snapshot_item)
+        self.Bind(wx.EVT_MENU, self.panel.on_compare_snapshots, compare_snapshots_item)
+        self.Bind(wx.EVT_MENU, self.panel.on_discover, discover_item)
+        self.Bind(wx.EVT_MENU, self.panel.on_query_inventory, query_inventory_item)
+        self.Bind(wx.EVT_MENU, self.panel.on_clone_input, clone_input_item)
+        self.Bind(wx.EVT_MENU, self.panel.on_clone_card, clone_card_item)
+
+        # Every value read from or written to a card goes into the fleet inventory
+        self.inventory = Inventory(templates=SCHEMA.templates())
+        self.engine.add_listener(self.inventory.record)
+        self.panel.inventory = self.inventory
+
+        # Re-reads loaded values in the background to spot changes made outside this tool
+        self.monitor = DriftMonitor(self.engine, on_drift=self.panel.on_drift)
+        if self.monitor_item.IsChecked():
+            self.monitor.start()
+
+        # Jobs submitted over the local API run on this window's engine
+        self.scheduler: Optional[Scheduler] = None
+        self.control_server: Optional[ControlServer] = None
+        if self.control_api_item.IsChecked():
+            self.start_control_api()
+
+        # Show the connected card's request window live in the second pane
+        self.window_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.OnWindowTimer, self.window_timer)
+        self.window_timer.Start(500)
 
         sizer = wx.BoxSizer()
         sizer.Add(self.panel, proportion=1, flag=wx.EXPAND)
@@ -88,6 +173,90 @@ class AppFrame(wx.Frame):
         info.AddDeveloper("Omkarsinh Sindha")
         wx.adv.AboutBox(info)
 
+    def OnLatencyCeiling(self, event):
+        current = int(self.engine.latency_ceiling * 1000)
+        value = wx.GetNumberFromUser("Requests slower than this shrink the request window.",
+                                     "Latency ceiling (ms):", "Latency Ceiling",
+                                     current, 10, 10000, self)
+        if value == -1:  # Cancelled
+            return
+        self.wxconfig.WriteInt(LATENCY_CEILING_LOC, value)
+        self.engine.set_latency_ceiling(value / 1000)
+
+    def OnPrefetchAll(self, event):
+        self.wxconfig.WriteBool(PREFETCH_ALL_LOC, self.prefetch_all_item.IsChecked())
+
+    def OnMonitor(self, event):
+        self.wxconfig.WriteBool(MONITOR_LOC, self.monitor_item.IsChecked())
+        if self.monitor_item.IsChecked():
+            self.monitor.start()
+        else:
+            self.monitor.stop()
+
+    def OnControlApi(self, event):
+        self.wxconfig.WriteBool(CONTROL_API_LOC, self.control_api_item.IsChecked())
+        if self.control_api_item.IsChecked():
+            self.start_control_api()
+        else:
+            self.stop_control_api()
+            self.SetStatusText("Job API stopped", 0)
+
+    def OnLockDirectory(self, event):
+        with wx.DirDialog(self, "Directory every instance keeps its card locks in, e.g. on a shared drive",
+                          defaultPath=self.panel.locks.directory) as dialog:
+            if dialog.ShowModal() == wx.ID_CANCEL:
+                return
+            directory = dialog.GetPath()
+        try:
+            locks = LockManager(directory)
+        except OSError as e:
+            self.panel.error_alert(f"Error: Cannot use {directory} for card locks. {e}")
+            return
+        self.wxconfig.Write(LOCK_DIR_LOC, directory)
+        restart = self.scheduler is not None
+        if restart:
+            self.stop_control_api()
+        self.panel.locks.close()
+        self.panel.locks = locks
+        if restart:
+            self.start_control_api()
+
+    def start_control_api(self):
+        self.scheduler = Scheduler(self.engine, capability_cache=self.panel.capability_cache,
+                                   locks=self.panel.locks).start()
+        try:
+            self.control_server = ControlServer(self.scheduler).start()
+        except OSError as e:
+            self.stop_control_api()
+            self.control_api_item.Check(False)
+            self.panel.error_alert(f"Error: Cannot start the job API. {e}")
+            return
+        self.SetStatusText(f"Job API on http://{self.control_server.host}:{self.control_server.port}/jobs", 0)
+
+    def stop_control_api(self):
+        """Stop serving and pause the API's running jobs after their chunks in flight."""
+        if self.control_server is not None:
+            self.control_server.stop()
+            self.control_server = None
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            self.scheduler = None
+
+    def OnWindowTimer(self, event):
+        ip = self.panel.current_ip()
+        if ip == "":
+            self.SetStatusText("", 1)
+            return
+        client = self.engine.client(ip)
+        latency_ms = client.window.latency * 1000
+        text = f"Window {client.window.size} ({client.in_flight} busy) {latency_ms:.0f} ms"
+        pool = self.transport.stats(ip)
+        if pool:
+            text += f", reuse {pool['reuse_rate']:.0%}"
+        if client.coalesced:
+            text += f", {client.coalesced} merged"
+        self.SetStatusText(text, 1)
+
     def OnClose(self, event: wx.CloseEvent):
         """User wants to close the application. Forward to app_panel."""
         # Skip event by default so it propagates, closing the application.
@@ -96,50 +265,111 @@ class AppFrame(wx.Frame):
         # self.panel.OnExit(event)
         # If we are exiting, stop the timer and loader processes.
         if event.GetSkipped():
-            self.http.stop()
+            self.window_timer.Stop()
+            self.monitor.stop()
+            self.stop_control_api()
+            self.panel.sessions.close_all()
+            self.panel.locks.close()
+            self.engine.stop()
+            self.inventory.close()
 
 
 class AppPanel(wx.Panel):
-    def __init__(self, frame: wx.Frame, wxconfig: wx.ConfigBase, http_thread):
+    def __init__(self, frame: wx.Frame, wxconfig: wx.ConfigBase, engine: RequestEngine):
         wx.Panel.__init__(self, parent=frame)
-        self.http = http_thread
+        self.engine = engine
         self.wxconfig = wxconfig
+        self.capability_cache = CapabilityCache()
+        # The open cards; the pages show the current one
+        self.sessions = Sessions(engine)
+        # Advisory card locks shared with other instances and the job API
+        try:
+            self.locks = LockManager(self.wxconfig.Read(LOCK_DIR_LOC, DEFAULT_LOCK_DIRECTORY))
+        except OSError:  # The configured share is not mounted
+            self.locks = LockManager()
+        # (ip, identity) of the cards found by discovery
+        self.fleet: List[Tuple[str, str]] = [tuple(card) for card in json.loads(self.wxconfig.Read(FLEET_LOC, "[]"))]
 
         self.SetBackgroundColour(DARK_GRAY)
 
         # IP label and text ctrl
         self.label1 = wx.StaticText(self, label="Nexx IP:")
         self.label1.SetForegroundColour(WHITE)
-        self.ip_input = wx.TextCtrl(self)
+        self.ip_input = wx.ComboBox(self, choices=[ip for ip, _ in self.fleet])
         self.ip_input.SetValue(self.wxconfig.Read(IP_LOC, defaultVal=""))
         self.ip_input.SetBackgroundColour(DARK_GRAY)
         self.ip_input.SetForegroundColour(WHITE)
         self.connet_btn = wx.Button(self, label="Connect")
-        self.reset_btn = wx.Button(self, label="Reset")
         self.connet_btn.Bind(wx.EVT_BUTTON, self.on_connect)
-        self.reset_btn.Bind(wx.EVT_BUTTON, self.on_reset)
         hbox = wx.BoxSizer(orient=wx.HORIZONTAL)
         hbox.Add(self.label1, 0, wx.ALL, 10)
         hbox.Add(self.ip_input, 0, wx.ALL, 10)
         hbox.Add(self.connet_btn, 0, wx.ALL, 10)
-        hbox.Add(self.reset_btn, 0, wx.ALL, 10)
+
+        # Open cards: which one the pages show, and which others a group apply also writes to
+        card_label = wx.StaticText(self, label="Card:")
+        card_label.SetForegroundColour(WHITE)
+        self.card_choice = wx.Choice(self, size=(260, -1))
+        self.card_choice.Bind(wx.EVT_CHOICE, self.on_switch_card)
+        self.reset_btn = wx.Button(self, label="Close Card")
+        self.reset_btn.Bind(wx.EVT_BUTTON, self.on_reset)
+        self.group_btn = wx.Button(self, label="Group...")
+        self.group_btn.Bind(wx.EVT_BUTTON, self.on_group)
+        self.group_check = wx.CheckBox(self, label="Apply to group")
+        self.group_check.SetForegroundColour(WHITE)
+        self.group_check.Bind(wx.EVT_CHECKBOX, lambda evt: self.show_group())
+        self.group_label = wx.StaticText(self, label="")
+        self.group_label.SetForegroundColour(WHITE)
+        card_hbox = wx.BoxSizer(orient=wx.HORIZONTAL)
+        card_hbox.Add(card_label, 0, wx.LEFT | wx.ALIGN_CENTER_VERTICAL, 10)
+        card_hbox.Add(self.card_choice, 0, wx.ALL, 10)
+        card_hbox.Add(self.reset_btn, 0, wx.ALL, 10)
+        card_hbox.Add(self.group_btn, 0, wx.ALL, 10)
+        card_hbox.Add(self.group_check, 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 10)
+        card_hbox.Add(self.group_label, 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 10)
+
+        # Apply every tab's settings to an input range in one go
+        apply_all_label = wx.StaticText(self, label="Apply all tabs to inputs")
+        apply_all_label.SetForegroundColour(WHITE)
+        self.apply_all_from = wx.SpinCtrl(self, min=1, max=32, initial=1)
+        self.apply_all_from.SetBackgroundColour(DARK_GRAY)
+        self.apply_all_from.SetForegroundColour(WHITE)
+        apply_all_to_label = wx.StaticText(self, label="to")
+        apply_all_to_label.SetForegroundColour(WHITE)
+        self.apply_all_to = wx.SpinCtrl(self, min=1, max=32, initial=32)
+        self.apply_all_to.SetBackgroundColour(DARK_GRAY)
+        self.apply_all_to.SetForegroundColour(WHITE)
+        self.apply_all_btn = wx.Button(self, label="Apply All Tabs")
+        self.apply_all_btn.Bind(wx.EVT_BUTTON, self.on_apply_all)
+        self.apply_all_gauge = wx.Gauge(self, size=(200, -1))
+        self.apply_all_gauge.Hide()
+        hbox.Add(apply_all_label, 0, wx.LEFT | wx.ALIGN_CENTER_VERTICAL, 30)
+        hbox.Add(self.apply_all_from, 0, wx.ALL, 10)
+        hbox.Add(apply_all_to_label, 0, wx.ALIGN_CENTER_VERTICAL)
+        hbox.Add(self.apply_all_to, 0, wx.ALL, 10)
+        hbox.Add(self.apply_all_btn, 0, wx.ALL, 10)
+        hbox.Add(self.apply_all_gauge, 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 10)
         self.notebook = wx.Notebook(self)
         self.notebook.SetBackgroundColour(DARK_GRAY)
         self.notebook.SetForegroundColour(WHITE)
-        self.page1 = SystemNotify(self.notebook, frame, self.wxconfig, self.http)
-        self.page2 = VideoNotify(self.notebook, frame, self.wxconfig, self.http)
-        self.page3 = AudioNotify(self.notebook, frame, self.wxconfig, self.http)
-        self.page4 = AdvancedNotify(self.notebook, frame, self.wxconfig, self.http)
-        self.page5 = AdvancedAudioNotify(self.notebook, frame, self.wxconfig, self.http)
+        self.page1 = SystemNotify(self.notebook, frame, self.wxconfig, self.engine)
+        self.page2 = VideoNotify(self.notebook, frame, self.wxconfig, self.engine)
+        self.page3 = AudioNotify(self.notebook, frame, self.wxconfig, self.engine)
+        self.page4 = AdvancedNotify(self.notebook, frame, self.wxconfig, self.engine)
+        self.page5 = AdvancedAudioNotify(self.notebook, frame, self.wxconfig, self.engine)
         self.notebook.AddPage(self.page5, "Advanced Audio Notify")
         self.notebook.AddPage(self.page4, "Advanced Notify")
         self.notebook.AddPage(self.page3, "Audio Notify")
         self.notebook.AddPage(self.page2, "Video Notify")
         self.notebook.AddPage(self.page1, "System Notify")
+        self.pages = [self.page1, self.page2, self.page3, self.page4, self.page5]
+        # Every plan is checked against the schema's ranges before anything is sent
+        self.ranges = SCHEMA.range_table()
         #self.notebook.Disable()
         # Main sizer for notebook and top elements
         main_sizer = wx.BoxSizer(wx.VERTICAL)
         main_sizer.Add(hbox, 0, wx.ALIGN_LEFT)
+        main_sizer.Add(card_hbox, 0, wx.ALIGN_LEFT)
         main_sizer.Add(self.notebook, 1, wx.EXPAND)
 
         self.SetSizer(main_sizer)
@@ -153,73 +383,972 @@ class AppPanel(wx.Panel):
             dlg.ShowModal()
             dlg.Destroy()
             return
+        if ip in self.sessions:
+            self.switch_card(ip)
+            return
         error = "Error:"
         try:
-            varid1 = "1"
-            url = f"http://{ip}/{BASE_API}GET/parameter/{varid1}"
-            op = self.http.get(url, block=True)
-            op_content = json.loads(op.content)
-            value = op_content.get("value", None)
-            dlg: wx.MessageDialog = wx.MessageDialog(self, f"Card Found: {value}", "Card Found", wx.OK)
+            session = self.sessions.open(ip)
+            dlg: wx.MessageDialog = wx.MessageDialog(self, f"Card Found: {session.identity}", "Card Found", wx.OK)
             dlg.ShowModal()
             dlg.Destroy()
-            self.wxconfig.Write(IP_LOC, ip)
-            self.ip_input.Disable()
-            self.connet_btn.Disable()
+            self.card_choice.Append(session.label, ip)
+            self.switch_card(ip)
             self.notebook.Enable()
         except Exception as e:
             self.error_alert(f"{error} Cannot connect to {ip}. ")
+            return
+        threading.Thread(target=self._probe_thread, args=(ip,), daemon=True).start()
+
+    def current_ip(self) -> str:
+        """The card the pages load from and apply to, or "" if no card is open."""
+        return self.sessions.current or ""
+
+    def switch_card(self, ip):
+        """Make an open card the one the pages work on. The widgets keep their values."""
+        self.sessions.current = ip
+        self.wxconfig.Write(IP_LOC, ip)
+        for i in range(self.card_choice.GetCount()):
+            if self.card_choice.GetClientData(i) == ip:
+                self.card_choice.SetSelection(i)
+        capabilities = self.sessions.get(ip).capabilities
+        self.show_capabilities(capabilities or Capabilities(None, MAX_INPUTS, MAX_CHANNELS, []))
+        self.show_group()
+        self.update_status(f"Working on {self.sessions.get(ip).label}")
+
+    def on_switch_card(self, evt):
+        self.switch_card(self.card_choice.GetClientData(self.card_choice.GetSelection()))
+
+    def on_group(self, evt):
+        ip = self.current_ip()
+        others = [session for session in self.sessions.sessions() if session.ip != ip]
+        if not others:
+            self.error_alert("Connect to more cards first. A group apply writes to the current card and the "
+                             "open cards picked here.")
+            return
+        with wx.MultiChoiceDialog(self, "Open cards applies also write to when \"Apply to group\" is on:",
+                                  "Card Group", [session.label for session in others]) as dlg:
+            dlg.SetSelections([i for i, session in enumerate(others) if session.ip in self.sessions.group])
+            if dlg.ShowModal() != wx.ID_OK:
+                return
+            self.sessions.group = [others[i].ip for i in dlg.GetSelections()]
+        self.group_check.SetValue(bool(self.sessions.group))
+        self.show_group()
+
+    def show_group(self):
+        targets = self.apply_targets(self.current_ip()) if self.current_ip() else []
+        if self.group_check.GetValue() and len(targets) > 1:
+            self.group_label.SetLabel(f"Applies go to {len(targets)} cards")
+        else:
+            self.group_label.SetLabel("")
+        self.Layout()
+
+    def apply_targets(self, ip) -> List[str]:
+        """Cards an apply on ip writes to: just ip, or the group too when group apply is on."""
+        return self.sessions.targets(ip, self.group_check.GetValue())
+
+    def _probe_thread(self, ip):
+        """Find out which inputs and parameters the card has, then start the prefetch."""
+        wx.CallAfter(self.update_status, f"Probing capabilities of {ip}")
+        client = self.engine.client(ip)
+        templates = SCHEMA.templates()
+        try:
+            capabilities, cached = probe(client, templates, self.capability_cache, SCHEMA.indexes())
+        except RequestError as e:
+            wx.CallAfter(self.update_status, f"Could not probe {ip}: {e}")
+        else:
+            client.capabilities = capabilities
+            wx.CallAfter(self._on_probed, ip, capabilities, cached)
+        wx.CallAfter(self.start_prefetch, ip)
+
+    def _on_probed(self, ip, capabilities: Capabilities, cached: bool):
+        if ip != self.current_ip():
+            return  # Shown when the operator switches to the card
+        self.show_capabilities(capabilities)
+        message = f"{ip}: {capabilities.inputs} inputs, {capabilities.channels} audio channels"
+        if capabilities.missing:
+            message += f", {len(capabilities.missing)} parameters not supported"
+            families = capabilities.missing_families()
+            if families:
+                message += f" (no {', '.join(families)} traps)"
+        if cached:
+            message += " (cached)"
+        self.update_status(message)
+
+    def show_capabilities(self, capabilities: Capabilities):
+        for page in self.pages:
+            page.set_capabilities(capabilities)
+        self.apply_all_from.SetRange(1, capabilities.inputs)
+        self.apply_all_to.SetRange(1, capabilities.inputs)
+
+    def start_prefetch(self, ip):
+        """Read the pages' parameters in the background so the first Load is served from cache.
+
+        Input 1 of every page is fetched first, then (if enabled in Settings)
+        the remaining inputs. Prefetch only uses idle request capacity.
+        """
+        var_ids = self.page_var_ids([1])
+        if ip not in self.sessions:
+            return  # Closed while probing
+        if self.wxconfig.ReadBool(PREFETCH_ALL_LOC, defaultVal=False):
+            var_ids = list(dict.fromkeys(var_ids + self.page_var_ids(range(2, MAX_INPUTS + 1))))
+        futures = list(self.engine.client(ip).prefetch(var_ids).values())
+        threading.Thread(target=self._prefetch_thread, args=(futures,), daemon=True).start()
+
+    def _prefetch_thread(self, futures):
+        start = time.perf_counter()
+        wait(futures)
+        fetched = sum(not future.cancelled() and future.exception() is None for future in futures)
+        if fetched:
+            wx.CallAfter(self.update_status, f"Prefetched {fetched} parameters in "
+                                             f"{time.perf_counter() - start:.1f} s")
 
     def error_alert(self, message: str) -> None:
         dlg: wx.MessageDialog = wx.MessageDialog(self, message, "Error", wx.OK | wx.ICON_ERROR)
         dlg.ShowModal()
         dlg.Destroy()
 
+    def update_status(self, message, pane=0):
+        self.GetParent().SetStatusText(message, pane)
+
+    def page_var_ids(self, inputs) -> List[str]:
+        """Every parameter of every page for the given inputs."""
+        return expand_templates(SCHEMA.templates(), inputs)
+
+    def snapshot_var_ids(self) -> List[str]:
+        """Every parameter of every page, for all inputs."""
+        return self.page_var_ids(range(1, MAX_INPUTS + 1))
+
+    def on_save_snapshot(self, evt):
+        ip = self.current_ip()
+
+        if ip == "":
+            self.error_alert("IP not set. Try connecting first.")
+            return
+        with wx.FileDialog(self, "Save Snapshot", defaultFile=f"{ip}.nxs", wildcard=SNAPSHOT_WILDCARD,
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dlg:
+            if dlg.ShowModal() != wx.ID_OK:
+                return
+            path = dlg.GetPath()
+        threading.Thread(target=self._save_snapshot_thread, args=(ip, path, self.snapshot_var_ids())).start()
+
+    def _save_snapshot_thread(self, ip, path, var_ids):
+        wx.CallAfter(self.update_status, f"Reading {len(var_ids)} parameters for snapshot")
+        client = self.engine.client(ip)
+        results = client.get_many(var_ids)
+        try:
+            card = client.get("1")
+        except RequestError:
+            card = None
+        snapshot = Snapshot.from_results(results, {"ip": ip, "card": card, "taken": time.time()})
+        snapshot.save(path)
+        failed = sum(isinstance(value, Exception) for value in results.values())
+        if failed:
+            wx.CallAfter(self.update_status, f"Saved snapshot to {path}, {failed} parameters could not be read")
+        else:
+            wx.CallAfter(self.update_status, f"Successfully saved snapshot to {path} :)")
+
+    def on_compare_snapshots(self, evt):
+        with wx.FileDialog(self, "Reference Snapshot", wildcard=SNAPSHOT_WILDCARD,
+                           style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as dlg:
+            if dlg.ShowModal() != wx.ID_OK:
+                return
+            reference_path = dlg.GetPath()
+        with wx.FileDialog(self, "Snapshots to Compare", wildcard=SNAPSHOT_WILDCARD,
+                           style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST | wx.FD_MULTIPLE) as dlg:
+            if dlg.ShowModal() != wx.ID_OK:
+                return
+            paths = dlg.GetPaths()
+        try:
+            reference = Snapshot.load(reference_path)
+            snapshots = [Snapshot.load(path) for path in paths]
+        except (OSError, ValueError) as e:
+            self.error_alert(f"Error: Cannot read snapshot. {e}")
+            return
+
+        if len(snapshots) == 1:
+            differences = reference.diff(snapshots[0])
+            rows = [[var_id, format_value(mine), format_value(theirs)] for var_id, mine, theirs in differences]
+            summary = f"{len(differences)} parameters differ"
+            out_of_range = len(self.ranges.check_snapshot(snapshots[0]))
+            if out_of_range:
+                summary += f", {out_of_range} values out of range"
+            TableFrame(self, f"{os.path.basename(reference_path)} vs {os.path.basename(paths[0])}",
+                       [str(i) for i in range(1, len(rows) + 1)], ["Var ID", "Reference", "Other"], rows,
+                       summary, highlight_outliers=False)
+            return
+        rows = []
+        for snapshot in snapshots:
+            taken = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.meta.get("taken", 0)))
+            rows.append([format_value(snapshot.meta.get("card")), snapshot.meta.get("ip", ""), taken,
+                         str(reference.count_differences(snapshot)), str(len(self.ranges.check_snapshot(snapshot)))])
+        TableFrame(self, f"Compared to {os.path.basename(reference_path)}", [os.path.basename(path) for path in paths],
+                   ["Card", "IP", "Taken", "Differences", "Out of Range"], rows, highlight_outliers=False)
+
+    def on_discover(self, evt):
+        ip = self.ip_input.GetValue()
+        default = f"{ip.rsplit('.', 1)[0]}.0/24" if ip.count(".") == 3 else "192.168.1.0/24"
+        with wx.TextEntryDialog(self, "Address range to scan (CIDR):", "Discover Cards", default) as dlg:
+            if dlg.ShowModal() != wx.ID_OK:
+                return
+            cidr = dlg.GetValue().strip()
+        try:
+            count = host_count(cidr)
+        except ValueError as e:
+            self.error_alert(f"{cidr} is not a valid address range to scan. {e}")
+            return
+        self.update_status(f"Scanning {count} addresses in {cidr}")
+        threading.Thread(target=self._discover_thread, args=(cidr,), daemon=True).start()
+
+    def _discover_thread(self, cidr):
+        start = time.perf_counter()
+
+        def progress(done, total):
+            if done % 32 == 0 or done == total:
+                wx.CallAfter(self.update_status, f"Scanned {done} / {total} addresses in {cidr}")
+
+        found = scan(cidr, progress=progress)
+        wx.CallAfter(self._on_discovered, cidr, found, time.perf_counter() - start)
+
+    def _on_discovered(self, cidr, found, elapsed):
+        fleet = dict(self.fleet)
+        fleet.update(found)
+        self.fleet = sorted(fleet.items(), key=lambda card: socket.inet_aton(card[0]))
+        self.wxconfig.Write(FLEET_LOC, json.dumps(self.fleet))
+        ip = self.ip_input.GetValue()
+        self.ip_input.Set([card_ip for card_ip, _ in self.fleet])
+        self.ip_input.SetValue(ip)
+        summary = f"{len(found)} cards found in {cidr} in {elapsed:.1f} s"
+        self.update_status(summary)
+        TableFrame(self, f"Cards in {cidr}", [str(i) for i in range(1, len(found) + 1)], ["IP", "Card"],
+                   [[card_ip, identity] for card_ip, identity in found], summary, highlight_outliers=False)
+
+    def on_query_inventory(self, evt):
+        labels: Dict[str, str] = {}
+        for page in self.pages:
+            labels.update({f"{label} ({template})": template for template, label in page.template_labels().items()})
+        choices = sorted(labels)
+        with wx.SingleChoiceDialog(self, "Parameter to look up across the fleet:", "Query Inventory",
+                                   choices) as dlg:
+            if dlg.ShowModal() != wx.ID_OK:
+                return
+            choice = dlg.GetStringSelection()
+        with wx.TextEntryDialog(self, "Only show this value (leave blank for any):", "Query Inventory") as dlg:
+            if dlg.ShowModal() != wx.ID_OK:
+                return
+            value_text = dlg.GetValue().strip()
+        value = None
+        if value_text:
+            try:
+                value = int(value_text)
+            except ValueError:
+                self.error_alert("Value must be a whole number.")
+                return
+
+        start = time.perf_counter()
+        rows = self.inventory.query(labels[choice], value)
+        elapsed = (time.perf_counter() - start) * 1000
+        table = [[card, str(input_num), str(sub), format_value(row_value), f"{format_age(updated)} ago"]
+                 for card, input_num, sub, row_value, updated in rows]
+        TableFrame(self, choice, [str(i) for i in range(1, len(table) + 1)],
+                   ["Card", "Input", "Sub Index", "Value", "Seen"], table,
+                   f"{len(rows)} rows on {len({row[0] for row in rows})} cards in {elapsed:.1f} ms",
+                   highlight_outliers=False)
+
+    def ask(self, message: str, caption: str) -> bool:
+        """Yes/No question on the GUI thread, for use from worker threads."""
+        answer = threading.Event()
+        done = threading.Event()
+
+        def show():
+            with wx.MessageDialog(self, message, caption, wx.YES_NO | wx.NO_DEFAULT | wx.ICON_WARNING) as dlg:
+                if dlg.ShowModal() == wx.ID_YES:
+                    answer.set()
+            done.set()
+
+        wx.CallAfter(show)
+        done.wait()
+        return answer.is_set()
+
+    def apply_writes(self, ip: str, writes: List[Tuple[str, object]],
+                     progress: Optional[Callable[[int, int], None]] = None,
+                     targets: Optional[List[str]] = None) -> Optional[List[Tuple[str, Exception]]]:
+        """set_many() that asks first if it would overwrite values changed on the card since they were loaded.
+
+        Called from apply threads. With group apply on, the same writes go to
+        every card of the group concurrently, each through its session's job
+        queue, and progress(done, total) counts the writes of all of them.
+        targets overrides which cards are written, e.g. [ip] for writes
+        planned from one card's own values. Returns the failed writes (of every card), or None if the operator
+        chose not to apply, a value is out of range or another instance holds a
+        card's lock (then nothing is sent).
+        """
+        violations = self.ranges.check(writes)
+        if violations:
+            lines = [f"{var_id}: {value} is not in {low} to {high}" for var_id, value, low, high in violations[:10]]
+            if len(violations) > 10:
+                lines.append(f"... and {len(violations) - 10} more")
+            wx.CallAfter(self.error_alert, f"{len(violations)} values are out of range, nothing was applied:\n\n" +
+                         "\n".join(lines))
+            return None
+        targets = targets or self.apply_targets(ip)
+        holders = [holder for holder in map(self.locks.check, targets) if holder is not None]
+        if holders:
+            lines = [f"{holder.ip}: {holder.describe()}" for holder in holders]
+            wx.CallAfter(self.error_alert, "Cards are being written by another instance, nothing was applied:\n\n" +
+                         "\n".join(lines))
+            return None
+        monitor = self.GetParent().monitor
+        conflicts = [(card_ip, *conflict) for card_ip in targets for conflict in monitor.conflicts(card_ip, writes)]
+        if conflicts:
+            lines = [f"{card_ip + ' ' if len(targets) > 1 else ''}{var_id}: loaded {loaded}, now {current} on the "
+                     f"card, would write {value}" for card_ip, var_id, loaded, current, value in conflicts[:10]]
+            if len(conflicts) > 10:
+                lines.append(f"... and {len(conflicts) - 10} more")
+            message = (f"{len(conflicts)} values were changed on the card since you loaded them:\n\n" +
+                       "\n".join(lines) + "\n\nApply anyway and overwrite them?")
+            if not self.ask(message, "Overwrite External Changes?"):
+                return None
+
+        counts: Dict[str, Tuple[int, int]] = {}
+        lock = threading.Lock()
+
+        def card_progress(card_ip):
+            def report(done, total):
+                with lock:
+                    counts[card_ip] = (done, total)
+                    done_all = sum(count[0] for count in counts.values())
+                    total_all = sum(count[1] for count in counts.values())
+                progress(done_all, total_all)
+            return report if progress is not None else None
+
+        def run(card_ip) -> Future:
+            try:
+                return self.sessions.get(card_ip).run(self._apply_card, card_ip, writes, card_progress(card_ip))
+            except KeyError:  # Not an open card, e.g. a clone destination
+                future = Future()
+                future.set_result(self._apply_card(card_ip, writes, card_progress(card_ip)))
+                return future
+
+        futures = {card_ip: run(card_ip) for card_ip in targets}
+        failed = []
+        for card_ip, future in futures.items():
+            try:
+                card_failed = future.result()
+            except CancelledError:
+                card_failed = [(var_id, RequestError("Card closed before the apply ran")) for var_id, _ in writes]
+            if len(targets) > 1:
+                card_failed = [(var_id, RequestError(f"{card_ip}: {e}")) for var_id, e in card_failed]
+            failed.extend(card_failed)
+        return failed
+
+    def _apply_card(self, ip, writes, progress):
+        """One card's part of apply_writes(), run on the card's session job queue."""
+        monitor = self.GetParent().monitor
+        try:
+            with self.locks.hold([ip], "GUI apply"):
+                failed = self.engine.client(ip).set_many(writes, progress=progress)
+        except CardLocked as e:  # Taken by another instance since apply_writes() checked
+            return [(var_id, e) for var_id, _ in writes]
+        failed_ids = {var_id for var_id, _ in failed}
+        cleared = monitor.rebase(ip, [(var_id, value) for var_id, value in writes if var_id not in failed_ids])
+        for page in self.pages:
+            wx.CallAfter(page.mark_applied, ip, cleared)
+        return failed
+
+    def on_apply_all(self, evt):
+        ip = self.current_ip()
+
+        if ip == "":
+            self.error_alert("IP not set. Try connecting first.")
+            return
+
+        from_input = self.apply_all_from.GetValue()
+        to_input = self.apply_all_to.GetValue()
+        if from_input > to_input:
+            self.error_alert("Starting input must be less than or equal to ending input.")
+            return
+
+        # One merged plan; a var id planned by several pages gets the last page's value
+        merged: Dict[str, object] = {}
+        owners: Dict[str, str] = {}
+        for page in self.pages:
+            name = self.notebook.GetPageText(self.notebook.FindPage(page))
+            for var_id, value in page.plan_all(from_input, to_input):
+                merged[var_id] = value
+                owners[var_id] = name
+        targets = self.apply_targets(ip)
+        self.apply_all_btn.Disable()
+        self.apply_all_gauge.SetRange(max(1, len(merged) * len(targets)))
+        self.apply_all_gauge.SetValue(0)
+        self.apply_all_gauge.Show()
+        self.Layout()
+        threading.Thread(target=self._apply_all_thread,
+                         args=(ip, targets, from_input, to_input, list(merged.items()), owners), daemon=True).start()
+
+    def _apply_all_thread(self, ip, targets, from_input, to_input, writes, owners):
+        skipped = [var_id for card_ip in targets for var_id, _ in writes
+                   if not self.engine.client(card_ip).supports(var_id)]
+        total = len(writes) * len(targets) - len(skipped)
+
+        def progress(done, _):
+            if done % 16 == 0 or done == total:
+                wx.CallAfter(self.apply_all_gauge.SetValue, done)
+                wx.CallAfter(self.update_status, f"Applying all tabs: {done} / {total} writes")
+
+        start = time.perf_counter()
+        failed = self.apply_writes(ip, writes, progress, targets)
+        wx.CallAfter(self._on_applied_all, from_input, to_input, len(targets), writes, owners, skipped, failed,
+                     time.perf_counter() - start)
+
+    def _on_applied_all(self, from_input, to_input, cards, writes, owners, skipped, failed, elapsed):
+        self.apply_all_btn.Enable()
+        self.apply_all_gauge.Hide()
+        self.Layout()
+        if failed is None:
+            self.update_status("Apply cancelled, nothing was written")
+            return
+        pages = list(dict.fromkeys(owners.values()))
+        counts = {name: Counter() for name in pages}
+        for var_id, _ in writes:
+            counts[owners[var_id]]["planned"] += cards
+        for var_id in skipped:
+            counts[owners[var_id]]["skipped"] += 1
+        for var_id, _ in failed:
+            counts[owners[var_id]]["failed"] += 1
+        rows = [[str(c["planned"]), str(c["skipped"]), str(c["failed"]),
+                 str(c["planned"] - c["skipped"] - c["failed"])] for c in (counts[name] for name in pages)]
+        planned = len(writes) * cards
+        written = planned - len(skipped) - len(failed)
+        summary = (f"Inputs {from_input} to {to_input}: {written} of {planned} writes applied in {elapsed:.1f} s"
+                   f", {len(failed)} failed, {len(skipped)} not supported by the card")
+        if cards > 1:
+            summary += f" ({cards} cards)"
+        self.update_status(summary)
+        TableFrame(self, "Apply All Tabs", pages, ["Planned", "Not Supported", "Failed", "Applied"], rows, summary,
+                   highlight_outliers=False)
+
+    def on_clone_input(self, evt):
+        ip = self.current_ip()
+
+        if ip == "":
+            self.error_alert("IP not set. Try connecting first.")
+            return
+
+        client = self.engine.client(ip)
+        inputs = client.capabilities.inputs if client.capabilities is not None else MAX_INPUTS
+        names = [self.notebook.GetPageText(self.notebook.FindPage(page)) for page in self.pages]
+        with CloneInputDialog(self, ["All Tabs"] + names, inputs) as dlg:
+            if dlg.ShowModal() != wx.ID_OK:
+                return
+            tab, source, from_input, to_input = dlg.get_values()
+        if from_input > to_input:
+            self.error_alert("Starting input must be less than or equal to ending input.")
+            return
+        pages = self.pages if tab == 0 else [self.pages[tab - 1]]
+        templates = [template for page in pages for template in page.var_id_templates()]
+        targets = [input_num for input_num in range(from_input, to_input + 1) if input_num != source]
+        if not targets:
+            self.error_alert("Pick at least one input other than the source.")
+            return
+        self.apply_all_btn.Disable()
+        self.update_status(f"Reading input {source} and inputs {from_input} to {to_input}")
+        threading.Thread(target=self._clone_input_thread, args=(ip, templates, source, targets),
+                         daemon=True).start()
+
+    def _clone_input_thread(self, ip, templates, source, targets):
+        """Copy straight from the card's values, so nothing has to be loaded into the widgets first."""
+
+        def write(writes):
+            total = len(writes)
+
+            def progress(done, _):
+                if done % 16 == 0 or done == total:
+                    wx.CallAfter(self.update_status, f"Cloning input {source}: {done} / {total} writes")
+
+            return self.apply_writes(ip, writes, progress, targets=[ip])
+
+        report = clone_input(self.engine.client(ip), templates, source, targets, write)
+        wx.CallAfter(self.apply_all_btn.Enable)
+        if report.failed is None:
+            wx.CallAfter(self.update_status, "Clone cancelled, nothing was written")
+        else:
+            wx.CallAfter(self.update_status, f"Cloned input {source} to {len(targets)} inputs: {report.summary()}")
+
+    def on_clone_card(self, evt):
+        ip = self.current_ip()
+
+        if ip == "":
+            self.error_alert("IP not set. Try connecting first.")
+            return
+
+        others = [f"{card_ip}  {identity}" for card_ip, identity in self.fleet if card_ip != ip]
+        if others:
+            with wx.MultiChoiceDialog(self, f"Copy every tab's settings from {ip} to:", "Clone to Other Cards",
+                                      others) as dlg:
+                if dlg.ShowModal() != wx.ID_OK:
+                    return
+                destinations = [others[i].split()[0] for i in dlg.GetSelections()]
+        else:
+            with wx.TextEntryDialog(self, f"Copy every tab's settings from {ip} to (comma separated IPs):",
+                                    "Clone to Other Cards") as dlg:
+                if dlg.ShowModal() != wx.ID_OK:
+                    return
+                destinations = [card_ip.strip() for card_ip in dlg.GetValue().split(",") if card_ip.strip()]
+        for card_ip in destinations:
+            try:
+                socket.inet_aton(card_ip)
+            except socket.error:
+                self.error_alert(f"{card_ip} is not a valid IP.")
+                return
+        if not destinations:
+            return
+        self.apply_all_btn.Disable()
+        self.update_status(f"Cloning {ip} to {len(destinations)} cards")
+        threading.Thread(target=self._clone_card_thread, args=(ip, destinations), daemon=True).start()
+
+    def _clone_card_thread(self, ip, destinations):
+        templates = SCHEMA.templates()
+        # Destinations need their capabilities so parameters they lack are skipped rather than failed
+        for card_ip in destinations:
+            client = self.engine.client(card_ip)
+            if client.capabilities is None:
+                try:
+                    client.capabilities, _ = probe(client, templates, self.capability_cache, SCHEMA.indexes())
+                except RequestError:
+                    pass  # An unreachable card shows up as failed reads and writes in the report
+        source = self.engine.client(ip)
+        inputs = source.capabilities.inputs if source.capabilities is not None else MAX_INPUTS
+        reports = clone_card(self.engine, templates, ip, destinations, inputs,
+                             write=lambda card_ip, writes: self.apply_writes(card_ip, writes, targets=[card_ip]))
+        wx.CallAfter(self._on_cloned_card, ip, reports)
+
+    def _on_cloned_card(self, ip, reports):
+        self.apply_all_btn.Enable()
+        rows = []
+        for report in reports.values():
+            if report.failed is None:
+                rows.append([str(len(report.writes)), str(report.unchanged), str(report.unsupported), "", "",
+                             "Cancelled"])
+                continue
+            mismatched = report.mismatched or []
+            verified = len(report.writes) - len(report.failed) - len(mismatched)
+            rows.append([str(len(report.writes)), str(report.unchanged), str(report.unsupported),
+                         str(len(report.failed)), str(len(mismatched)), str(verified)])
+        clean = sum(report.failed == [] and not report.mismatched for report in reports.values())
+        elapsed = max((report.elapsed for report in reports.values()), default=0.0)
+        summary = f"Cloned {ip} to {len(reports)} cards in {elapsed:.1f} s, {clean} fully verified"
+        self.update_status(summary)
+        TableFrame(self, f"Clone of {ip}", list(reports),
+                   ["Writes", "Already Matching", "Not Supported", "Failed", "Differ After Write", "Verified"],
+                   rows, summary, highlight_outliers=False)
+
+    def on_drift(self, ip, var_id, loaded, current):
+        """DriftMonitor callback, called from a request worker thread."""
+        wx.CallAfter(self._show_drift, ip, var_id, loaded, current)
+
+    def _show_drift(self, ip, var_id, loaded, current):
+        for page in self.pages:
+            page.show_drift(ip, var_id, loaded, current)
+        if current != loaded:
+            self.update_status(f"{var_id} was changed on {ip} from {loaded} to {current}")
+
     def on_reset(self, evt):
-        self.ip_input.Clear()
-        self.ip_input.Enable()
-        self.connet_btn.Enable()
+        """Close the current card and switch to another open one, if any."""
+        ip = self.current_ip()
+        if ip == "":
+            return
+        for i in range(self.card_choice.GetCount()):
+            if self.card_choice.GetClientData(i) == ip:
+                self.card_choice.Delete(i)
+                break
+        current = self.sessions.close(ip)
+        if current is not None:
+            self.switch_card(current)
+            return
+        self.group_check.SetValue(False)
+        self.show_group()
+        self.ip_input.SetValue("")
         self.notebook.Disable()
         self.wxconfig.Write("/nexxIP", "") # Clear IP from config
 
-class SystemNotify(wx.ScrolledWindow):
+class CardPage(wx.ScrolledWindow):
+    """Streaming loads and applies shared by all pages.
+
+    Pages set self.engine, self.main_frame, self.load_btn and self.watched
+    (card and var id to the widget loaded from it), define update_status()
+    and override plan_all(). SCHEMA_PAGE names the page's entry in the schema, which
+    its widgets are built from.
+    """
+
+    SCHEMA_PAGE = ""
+
+    @property
+    def schema(self) -> nexxschema.Page:
+        return SCHEMA.page(self.SCHEMA_PAGE)
+
+    def var_id_templates(self) -> List[Tuple[str, int]]:
+        """(var id template, number of "y" sub indices) for every parameter the page covers."""
+        return self.schema.templates()
+
+    def template_labels(self) -> Dict[str, str]:
+        """Display name of every var id template on the page."""
+        return {parameter.template: parameter.label for parameter in self.schema.parameters()}
+
+    def spin_control(self, parameter: nexxschema.Parameter) -> wx.SpinCtrl:
+        spin = wx.SpinCtrl(self, min=parameter.low, max=parameter.high, initial=parameter.default)
+        spin.SetBackgroundColour(DARK_GRAY)
+        spin.SetForegroundColour(WHITE)
+        return spin
+
+    def choice_control(self, parameter: nexxschema.Parameter) -> wx.ComboBox:
+        combobox = wx.ComboBox(self, choices=parameter.choices, style=wx.CB_READONLY)
+        combobox.SetSelection(parameter.default)
+        combobox.SetBackgroundColour(DARK_GRAY)
+        combobox.SetForegroundColour(WHITE)
+        return combobox
+
+    def visible_first(self, fields: List[Tuple[wx.Window, str]]) -> List[Tuple[wx.Window, str]]:
+        """Fields currently scrolled into view first, each group top to bottom."""
+        height = self.GetClientSize().height
+
+        def key(field):
+            y = field[0].GetPosition().y
+            return not 0 <= y < height, y
+
+        return sorted(fields, key=key)
+
+    def mark_field(self, widget: wx.Window, state: str, tooltip: str) -> None:
+        """Show a field as "pending", "loaded" or "error"."""
+        widget.SetBackgroundColour(FIELD_COLOURS[state])
+        widget.SetToolTip(tooltip)
+        widget.Refresh()
+
+    def show_value(self, widget: wx.Window, value) -> None:
+        value = int(value)
+        if isinstance(widget, wx.ComboBox):
+            if not 0 <= value < widget.GetCount():
+                raise ValueError(f"{value} is not a valid choice")
+            widget.SetSelection(value)
+        else:
+            widget.SetValue(value)
+
+    def stream_load(self, ip: str, fields: List[Tuple[wx.Window, str]], description: str,
+                    neighbours: Optional[List[str]] = None) -> None:
+        """Load fields concurrently, filling in each widget as its value arrives.
+
+        Called on the GUI thread; requests go out visible fields first and
+        every result is applied through wx.CallAfter. neighbours are
+        speculatively prefetched once the load is done.
+        """
+        client = self.engine.client(ip)
+        monitor = self.main_frame.monitor
+        unwatched: Dict[str, List[str]] = {}
+        for watched_ip, var_id in self.watched:
+            unwatched.setdefault(watched_ip, []).append(var_id)
+        for watched_ip, var_ids in unwatched.items():
+            monitor.unwatch(watched_ip, var_ids)
+        self.watched = {}
+        fields = self.visible_first(fields)
+        hits = self.speculation.claim(var_id for _, var_id in fields) if neighbours is not None else 0
+        remaining = len(fields)
+        errors = 0
+        start = time.perf_counter()
+
+        def on_result(widget, var_id, future: Future):
+            nonlocal remaining, errors
+            try:
+                value = future.result()
+                self.show_value(widget, value)
+            except Unsupported:
+                self.mark_field(widget, "unsupported", f"{var_id} is not supported by this card")
+            except (ValueError, TypeError, RequestError, CancelledError) as e:
+                errors += 1
+                self.mark_field(widget, "error", f"{var_id}: {str(e) or type(e).__name__}")
+            else:
+                self.mark_field(widget, "loaded", f"{var_id} loaded at {time.strftime('%H:%M:%S')}")
+                self.watched[(ip, var_id)] = widget
+                monitor.watch(ip, var_id, value)
+            remaining -= 1
+            if remaining:
+                return
+            if neighbours is not None:
+                self.speculation.guess(client, neighbours)
+            self.load_btn.Enable()
+            elapsed = time.perf_counter() - start
+            if errors:
+                self.update_status(f"Loaded {description} in {elapsed:.1f} s, "
+                                   f"{errors} of {len(fields)} values could not be read")
+            else:
+                note = self.prefetch_note(hits, len(fields)) if neighbours is not None else ""
+                self.update_status(f"Successfully loaded {description} in {elapsed:.1f} s :){note}")
+
+        self.load_btn.Disable()
+        self.update_status(f"Loading {description}")
+        for widget, var_id in fields:
+            self.mark_field(widget, "pending", f"{var_id}: loading")
+        for widget, var_id in fields:
+            client.submit_cached(var_id).add_done_callback(
+                lambda future, widget=widget, var_id=var_id: wx.CallAfter(on_result, widget, var_id, future))
+
+
+    def set_capabilities(self, capabilities: Capabilities) -> None:
+        """Limit the page's input and channel selectors to what the connected card has."""
+
+    def show_drift(self, ip: str, var_id: str, loaded, current) -> None:
+        widget = self.watched.get((ip, var_id))
+        if widget is None:
+            return
+        if current == loaded:
+            self.mark_field(widget, "loaded", f"{var_id} is back to its loaded value {loaded}")
+        else:
+            self.mark_field(widget, "changed", f"{var_id} was changed on the card from {loaded} to {current} "
+                                               f"at {time.strftime('%H:%M:%S')}. Load again to see it.")
+
+    def current_ip(self) -> str:
+        """See AppPanel.current_ip."""
+        return self.main_frame.panel.current_ip()
+
+    def apply_writes(self, ip: str, writes: List[Tuple[str, object]],
+                     progress: Optional[Callable[[int, int], None]] = None) -> Optional[List[Tuple[str, Exception]]]:
+        """See AppPanel.apply_writes."""
+        return self.main_frame.panel.apply_writes(ip, writes, progress)
+
+    def mark_applied(self, ip: str, var_ids: List[str]) -> None:
+        applied = time.strftime("%H:%M:%S")
+        for var_id in var_ids:
+            widget = self.watched.get((ip, var_id))
+            if widget is not None:
+                self.mark_field(widget, "loaded", f"{var_id} applied at {applied}")
+
+    def plan_all(self, from_input: int, to_input: int) -> List[Tuple[str, object]]:
+        """Writes for everything on the page, applied to inputs from_input..to_input.
+
+        Reads the widgets, so call it on the GUI thread. A page that does not
+        override it is left out of Apply All.
+        """
+        return []
+
+
+class NotifyPage(CardPage):
+    """Behaviour shared by the per-input notify pages.
+
+    Pages set self.engine, self.wxconfig, self.labels (widget to display
+    name) and self.speculation, and override table_columns() and
+    load_fields(); a page that does not shows an empty Load Range table and
+    loads nothing.
+    """
+
+    def table_columns(self) -> List[Tuple[str, wx.Window, str]]:
+        """(label, widget, var id) for every value on the page, "x" left in for the input."""
+        return []
+
+    def load_fields(self, input_num: int) -> List[Tuple[wx.Window, str]]:
+        """(widget, var id) for every value Load Values reads for an input."""
+        return []
+
+    # Selectors of the per-input pages; each page has some of them
+    INPUT_SPINS = ("input", "input_from", "input_to", "range_from", "range_to", "toggle_input_from",
+                   "toggle_input_to", "loudness_input_from", "loudness_input_to", "compressed_input_from",
+                   "compressed_input_to")
+    CHANNEL_SPINS = ("channel", "channel_start", "channel_end")
+    capabilities: Optional[Capabilities] = None  # Of the connected card, once probed
+
+    def set_capabilities(self, capabilities: Capabilities) -> None:
+        self.capabilities = capabilities
+        for name in self.INPUT_SPINS:
+            spin = getattr(self, name, None)
+            if spin is not None:
+                spin.SetRange(1, capabilities.inputs)
+        for name in self.CHANNEL_SPINS:
+            spin = getattr(self, name, None)
+            if spin is not None:
+                spin.SetRange(1, capabilities.channels)
+
+    def input_var_ids(self, input_num: int, *selection) -> List[str]:
+        """Var ids Load Values reads for an input."""
+        return [var_id for _, var_id in self.load_fields(input_num, *selection)]
+
+    def neighbour_var_ids(self, input_num: int) -> List[str]:
+        """Var ids of the inputs either side of input_num, the likeliest next loads."""
+        return [var_id for neighbour in (input_num + 1, input_num - 1) if 1 <= neighbour <= MAX_INPUTS
+                for var_id in self.input_var_ids(neighbour)]
+
+    def prefetch_note(self, hits: int, total: int) -> str:
+        rate = self.speculation.hit_rate
+        if rate is None:
+            return ""
+        return f" ({hits} of {total} values prefetched, {rate:.0%} of prefetches used)"
+
+    def create_range_row(self) -> wx.BoxSizer:
+        range_hbox = wx.BoxSizer()
+        range_label = wx.StaticText(self, label="Load inputs")
+        range_label.SetForegroundColour(WHITE)
+
+        self.range_from = wx.SpinCtrl(self, min=1, max=32, initial=1)
+        self.range_from.SetBackgroundColour(DARK_GRAY)
+        self.range_from.SetForegroundColour(WHITE)
+
+        to_label = wx.StaticText(self, label="to")
+        to_label.SetForegroundColour(WHITE)
+
+        self.range_to = wx.SpinCtrl(self, min=1, max=32, initial=32)
+        self.range_to.SetBackgroundColour(DARK_GRAY)
+        self.range_to.SetForegroundColour(WHITE)
+
+        self.load_range_btn = wx.Button(self, label="Load Range")
+        self.load_range_btn.Bind(wx.EVT_BUTTON, self.on_load_range)
+
+        range_hbox.Add(range_label, flag=wx.ALL | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL)
+        range_hbox.Add(self.range_from, 0, wx.ALL, 10)
+        range_hbox.Add(to_label, 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
+        range_hbox.Add(self.range_to, 0, wx.ALL, 10)
+        range_hbox.Add(self.load_range_btn, 0, wx.ALL, 10)
+        return range_hbox
+
+    def on_load_range(self, evt):
+        ip = self.current_ip()
+
+        if ip == "":
+            self.error_alert("IP not set. Try connecting first.")
+            return
+
+        from_input = self.range_from.GetValue()
+        to_input = self.range_to.GetValue()
+
+        if from_input > to_input:
+            self.error_alert("Starting input must be less than or equal to ending input.")
+            return
+
+        # Read the widgets here, the loader thread must not touch them
+        columns = []
+        golden_var_ids = []
+        golden_row = []
+        for label, widget, var_id in self.table_columns():
+            choices = None
+            if isinstance(widget, wx.ComboBox):
+                choices = widget.GetStrings()
+                golden_var_ids.append(var_id)
+                golden_row.append(widget.GetSelection())
+            columns.append((label, choices, var_id))
+        golden = TrapMatrix.from_row(golden_var_ids, golden_row, from_input, to_input)
+        threading.Thread(target=self._load_range_thread, args=(ip, from_input, to_input, columns, golden)).start()
+
+    def _load_range_thread(self, ip, from_input, to_input, columns, golden):
+        wx.CallAfter(self.load_range_btn.Disable)
+        wx.CallAfter(self.update_status, f"Loading inputs {from_input} to {to_input} from card")
+
+        inputs = list(range(from_input, to_input + 1))
+        var_ids = [[var_id.replace("x", str(input_num - 1)) for _, _, var_id in columns] for input_num in inputs]
+        results = self.engine.client(ip).get_many(var_id for row in var_ids for var_id in row)
+
+        rows = [[format_value(results[var_id], choices) for (_, choices, _), var_id in zip(columns, row)]
+                for row in var_ids]
+        # Which inputs' enables differ from the ones currently set on the page
+        state = TrapMatrix(golden.var_ids)
+        for input_num in inputs:
+            state.update(input_num, results)
+        differing = state.differing_inputs(golden)
+        if differing:
+            summary = f"Enables differ from page settings on inputs {', '.join(map(str, differing))}"
+        else:
+            summary = "Enables match page settings on all inputs"
+        title = f"{self.GetParent().GetPageText(self.GetParent().FindPage(self))} - inputs {from_input} to {to_input}"
+        row_labels = [f"Input {input_num}" for input_num in inputs]
+        wx.CallAfter(TableFrame, self, title, row_labels, [label for label, _, _ in columns], rows, summary)
+        wx.CallAfter(self.load_range_btn.Enable)
+        wx.CallAfter(self.update_status, f"Successfully loaded inputs {from_input} to {to_input} :)")
+
+
+def format_value(value, choices: Optional[List[str]] = None) -> str:
+    """Display text for a value read from the card, using the combobox choices if any."""
+    if isinstance(value, Unsupported):
+        return "n/a"
+    if isinstance(value, Exception):
+        return "Error"
+    if value is None:
+        return ""
+    try:
+        return choices[int(value)] if choices else str(value)
+    except (ValueError, TypeError, IndexError):
+        return str(value)
+
+
+class TableFrame(wx.Frame):
+    """Read-only table, e.g. inputs x parameters from a Load Range.
+
+    With highlight_outliers, cells that differ from the most common value in
+    their column are highlighted so outlier rows stand out.
+    """
+
+    def __init__(self, parent: wx.Window, title: str, row_labels: List[str], labels: List[str],
+                 rows: List[List[str]], summary: str = "", highlight_outliers: bool = True):
+        wx.Frame.__init__(self, parent=parent, title=title, size=(1100, 700))
+        self.CreateStatusBar()
+        self.SetStatusText(summary)
+        grid = wx.grid.Grid(self)
+        grid.CreateGrid(len(row_labels), len(labels))
+        grid.EnableEditing(False)
+        for col, label in enumerate(labels):
+            grid.SetColLabelValue(col, label)
+        for row, row_label in enumerate(row_labels):
+            grid.SetRowLabelValue(row, row_label)
+            for col, value in enumerate(rows[row]):
+                grid.SetCellValue(row, col, value)
+
+        if highlight_outliers and rows:
+            for col in range(len(labels)):
+                common, _ = Counter(row[col] for row in rows).most_common(1)[0]
+                for row in range(len(row_labels)):
+                    if rows[row][col] != common:
+                        grid.SetCellBackgroundColour(row, col, OUTLIER_RED)
+
+        grid.AutoSizeColumns()
+        self.Show()
+
+
+class CloneInputDialog(wx.Dialog):
+    """Which tabs to clone, from which input, to which input range."""
+
+    def __init__(self, parent: wx.Window, tabs: List[str], inputs: int):
+        wx.Dialog.__init__(self, parent, title="Clone Input")
+        self.tab_choice = wx.Choice(self, choices=tabs)
+        self.tab_choice.SetSelection(0)
+        self.source = wx.SpinCtrl(self, min=1, max=inputs, initial=1)
+        self.from_input = wx.SpinCtrl(self, min=1, max=inputs, initial=1)
+        self.to_input = wx.SpinCtrl(self, min=1, max=inputs, initial=inputs)
+        grid = wx.FlexGridSizer(cols=2, vgap=8, hgap=10)
+        for label, control in (("Tabs:", self.tab_choice), ("Copy input:", self.source),
+                               ("To inputs:", self.from_input), ("through:", self.to_input)):
+            grid.Add(wx.StaticText(self, label=label), 0, wx.ALIGN_CENTER_VERTICAL)
+            grid.Add(control)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(grid, 0, wx.ALL, 15)
+        sizer.Add(self.CreateButtonSizer(wx.OK | wx.CANCEL), 0, wx.EXPAND | wx.ALL, 10)
+        self.SetSizerAndFit(sizer)
+
+    def get_values(self) -> Tuple[int, int, int, int]:
+        """(tab index, 0 for all tabs; source input; first and last target input)."""
+        return (self.tab_choice.GetSelection(), self.source.GetValue(), self.from_input.GetValue(),
+                self.to_input.GetValue())
+
+
+class SystemNotify(CardPage):
     """System Notify panel (window)"""
 
-    CPU_USE_TH = "343@i"
-    CPU_USE_DUR = "344@i"
-    CPU_USE_RES_DUR = "345@i"
-    DISK_USE_TH = "219@i"
-    # List of notification and its var id
-    NOTIFICATIONS = {
-        "CPU Usage too high": "850.2@i",
-        "CPU Temperature too high": "850.3@i",
-        "Memory Usage too high": "850.4@i",
-        "FPGA temperature fabric too high": "850.5@i",
-        "FPGA temperature BR too high": "850.6@i",
-        "FPGA temperature TR too high": "850.7@i",
-        "FPGA temperature BL too high": "850.8@i",
-        "FPGA temperature TL too high": "850.9@i",
-        "NTP Error": "850.18@i",
-        "CPU Load too high": "850.19@i",
-        "NTP Unsynchronised": "850.20@i",
-        "SSD Critical Warning": "850.21@i",
-        "High lifetime disk usage": "850.23@i",
-        "Genlock REF 1 Missing": "850.24@i",
-        "Genlock REF 2 Missing": "850.25@i",
-        "Serial FVH 1 Missing": "850.26@i",
-        "Serial FVH 2 Missing": "850.27@i"
-    }
-
-    def __init__(self, notebook: wx.Notebook, main_frame, wxconfig: wx.ConfigBase, http_thread):
+    SCHEMA_PAGE = "System Notify"
+
+    def __init__(self, notebook: wx.Notebook, main_frame, wxconfig: wx.ConfigBase, engine: RequestEngine):
         """Initialize our main application frame."""
         wx.ScrolledWindow.__init__(self, parent=notebook)
         self.main_frame = main_frame
-        self.http = http_thread
+        self.engine = engine
         self.wxconfig = wxconfig
         self.SetBackgroundColour(DARK_GRAY)
         self.toggle_flag = True
         self.comboboxes: dict[wx.ComboBox: str] = {}
         self.spin_inputs:dict[wx.SpinCtrl: str] = {}
+        self.watched: Dict[Tuple[str, str], wx.Window] = {}
         main_sizer = wx.BoxSizer(wx.VERTICAL)
 
         btn_hbox = wx.BoxSizer()
@@ -243,76 +1372,26 @@ class SystemNotify(wx.ScrolledWindow):
         system_control_label.SetForegroundColour(YELLOW)
         main_sizer.Add(system_control_label, 0, wx.LEFT, 25)
 
+        # Two rows of controls, with a spacer column between each pair of columns
         grid = wx.GridBagSizer()
-        # CPU Usage Threshold
-        hbox1 = wx.BoxSizer(orient=wx.HORIZONTAL)
-        cpu_usage_label = wx.StaticText(self, label="CPU Usage Threshold")
-        cpu_usage_label.SetForegroundColour(WHITE)
-        hbox1.Add(cpu_usage_label, 0, wx.ALL, 5)
-        self.cpu_usage_threshold = wx.SpinCtrl(self, min=0, max=100)
-        self.cpu_usage_threshold.SetBackgroundColour(DARK_GRAY)
-        self.cpu_usage_threshold.SetForegroundColour(WHITE)
-        hbox1.Add(self.cpu_usage_threshold, 0, wx.ALL, 5)
-        percent_label = wx.StaticText(self, label="(0 to 100) %")
-        percent_label.SetForegroundColour(WHITE)
-        hbox1.Add(percent_label, 0, wx.ALL, 5)
-        grid.Add(hbox1, pos=(0, 0),
-               flag=wx.TOP | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=10)
-
-        # CPU Usage Duration
-        hbox2 = wx.BoxSizer()
-        cpu_duration_label = wx.StaticText(self, label="CPU Usage Duration")
-        cpu_duration_label.SetForegroundColour(WHITE)
-        hbox2.Add(cpu_duration_label, 0, wx.ALL, 5)
-        self.cpu_usage_duration = wx.SpinCtrl(self, min=0, max=600)
-        self.cpu_usage_duration.SetBackgroundColour(DARK_GRAY)
-        self.cpu_usage_duration.SetForegroundColour(WHITE)
-        hbox2.Add(self.cpu_usage_duration, 0, wx.ALL, 5)
-        seconds_label = wx.StaticText(self, label="(0 to 600) seconds")
-        seconds_label.SetForegroundColour(WHITE)
-        hbox2.Add(seconds_label, 0, wx.ALL, 5)
-        grid.Add(hbox2, pos=(1, 0),
-                 flag=wx.TOP | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=10)
-
-        grid.Add((0, 0), pos=(0, 1), flag=wx.ALL, border=20)
-        grid.Add((0, 0), pos=(1, 1), flag=wx.ALL, border=20)
-
-        # CPU Usage Reset Duration
-        hbox3 = wx.BoxSizer()
-        cpu_reset_label = wx.StaticText(self, label="CPU Usage Reset Duration")
-        cpu_reset_label.SetForegroundColour(WHITE)
-        hbox3.Add(cpu_reset_label, 0, wx.ALL, 5)
-        self.cpu_usage_reset_duration = wx.SpinCtrl(self, min=0, max=60)
-        self.cpu_usage_reset_duration.SetBackgroundColour(DARK_GRAY)
-        self.cpu_usage_reset_duration.SetForegroundColour(WHITE)
-        hbox3.Add(self.cpu_usage_reset_duration, 0, wx.ALL, 5)
-        reset_seconds_label = wx.StaticText(self, label="(0 to 60) seconds")
-        reset_seconds_label.SetForegroundColour(WHITE)
-        hbox3.Add(reset_seconds_label, 0, wx.ALL, 5)
-        grid.Add(hbox3, pos=(0, 2),flag=wx.TOP | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=10)
-
-        # High Lifetime Disk Usage Threshold
-        hbox4 = wx.BoxSizer()
-        disk_usage_label = wx.StaticText(self, label="High Lifetime Disk Usage Threshold")
-        disk_usage_label.SetForegroundColour(WHITE)
-        hbox4.Add(disk_usage_label, 0, wx.ALL, 5)
-        self.disk_usage_threshold = wx.SpinCtrl(self, min=0, max=100)
-        self.disk_usage_threshold.SetBackgroundColour(DARK_GRAY)
-        self.disk_usage_threshold.SetForegroundColour(WHITE)
-        hbox4.Add(self.disk_usage_threshold, 0, wx.ALL, 5)
-        disk_percent_label = wx.StaticText(self, label="(0 to 100) %")
-        disk_percent_label.SetForegroundColour(WHITE)
-        hbox4.Add(disk_percent_label, 0, wx.ALL, 5)
-        grid.Add(hbox4, pos=(1, 2),
-                 flag=wx.TOP | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=10)
+        for i, parameter in enumerate(self.schema.group("System Notify Control").parameters):
+            hbox = wx.BoxSizer(orient=wx.HORIZONTAL)
+            label = wx.StaticText(self, label=parameter.label)
+            label.SetForegroundColour(WHITE)
+            hbox.Add(label, 0, wx.ALL, 5)
+            spin = self.spin_control(parameter)
+            hbox.Add(spin, 0, wx.ALL, 5)
+            range_label = wx.StaticText(self, label=parameter.range_text)
+            range_label.SetForegroundColour(WHITE)
+            hbox.Add(range_label, 0, wx.ALL, 5)
+            grid.Add(hbox, pos=(i % 2, i // 2 * 2), flag=wx.TOP | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=10)
+            if i % 2 == 0 and i:
+                grid.Add((0, 0), pos=(0, i // 2 * 2 - 1), flag=wx.ALL, border=20)
+                grid.Add((0, 0), pos=(1, i // 2 * 2 - 1), flag=wx.ALL, border=20)
+            self.spin_inputs[spin] = parameter.template
 
         main_sizer.Add(grid, 0, wx.ALL | wx.LEFT, 25)
 
-        self.spin_inputs[self.cpu_usage_threshold] = self.CPU_USE_TH
-        self.spin_inputs[self.cpu_usage_duration] = self.CPU_USE_DUR
-        self.spin_inputs[self.cpu_usage_reset_duration] = self.CPU_USE_RES_DUR
-        self.spin_inputs[self.disk_usage_threshold] = self.DISK_USE_TH
-
         head_hbox = wx.BoxSizer()
         # System Notify
         system_notify_label = wx.StaticText(self, label="System Notify")
@@ -332,16 +1411,13 @@ class SystemNotify(wx.ScrolledWindow):
         grid_sizer = wx.GridBagSizer(hgap=5, vgap=5)
         grid_sizer.Add(head_hbox, pos=(0,0), flag=wx.ALL, border=5)
 
-        for i, (notification, varid) in enumerate(self.NOTIFICATIONS.items(), start=1):
-            notification_label = wx.StaticText(self, label=notification)
+        for i, parameter in enumerate(self.schema.group("System Notify").parameters, start=1):
+            notification_label = wx.StaticText(self, label=parameter.label)
             notification_label.SetForegroundColour(WHITE)
             grid_sizer.Add(notification_label, pos=(i, 0), flag=wx.ALL, border=5)
 
-            combobox = wx.ComboBox(self, choices=["False", "True"], style=wx.CB_READONLY)
-            combobox.SetSelection(1)  # Set "True" as the default selection
-            combobox.SetBackgroundColour(DARK_GRAY)
-            combobox.SetForegroundColour(WHITE)
-            self.comboboxes[combobox] = varid
+            combobox = self.choice_control(parameter)
+            self.comboboxes[combobox] = parameter.template
             grid_sizer.Add(combobox, pos=(i, 1), flag=wx.ALL, border=5)
 
         main_sizer.Add(grid_sizer, 0, wx.ALL | wx.LEFT, 25)
@@ -369,100 +1445,67 @@ class SystemNotify(wx.ScrolledWindow):
         dlg.Destroy()
 
     def on_apply(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
             return
         threading.Thread(target=self._apply_thread, args=(ip,)).start()
 
-    def _apply_thread(self, ip):
-        self.apply_btn.Disable()
-        self.update_status("Applying config to card")
+    def plan_all(self, from_input=None, to_input=None):
+        """System parameters are card wide, so the input range does not matter."""
+        writes = []
         for spin, varid in self.spin_inputs.items():
-            value = spin.GetValue()
-            url = f"http://{ip}/v.api/apis/EV/SET/parameter/{varid}/{value}"
-            self.http.get(url)
+            writes.append((varid, spin.GetValue()))
 
         for box, varid in self.comboboxes.items():
-            value = box.GetSelection()
-            url = f"http://{ip}/v.api/apis/EV/SET/parameter/{varid}/{value}"
-            self.http.get(url)
+            writes.append((varid, box.GetSelection()))
+        return writes
+
+    def _apply_thread(self, ip):
+        self.apply_btn.Disable()
+        self.update_status("Applying config to card")
+        writes = self.plan_all()
+        failed = self.apply_writes(ip, writes)
         self.apply_btn.Enable()
-        self.update_status("Successfully applied config to card :)")
+        if failed is None:
+            self.update_status("Apply cancelled, nothing was written")
+            return
+        if failed:
+            self.update_status(f"Applied config to card, {len(failed)} of {len(writes)} writes failed")
+        else:
+            self.update_status("Successfully applied config to card :)")
 
 
     def load_values(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
             return
 
-        threading.Thread(target=self._load_values_thread, args=(ip,)).start()
-
-    def _load_values_thread(self, ip):
-        self.load_btn.Disable()
-        self.update_status("Loading values from card")
-        for spin, varid in self.spin_inputs.items():
-            url = f"http://{ip}/v.api/apis/EV/GET/parameter/{varid}"
-            op = self.http.get(url, block=True)
-            op_content = json.loads(op.content)
-            try:
-                value = int(op_content.get("value", None))
-            except ValueError as e:
-                self.error_alert("Did not get expected value for System Notify Control.")
-                continue
-            wx.CallAfter(spin.SetValue, int(value))
-
-        for box, varid in self.comboboxes.items():
-            url = f"http://{ip}/v.api/apis/EV/GET/parameter/{varid}"
-            op = self.http.get(url, block=True)
-            op_content = json.loads(op.content)
-            value = op_content.get("value", None)
-            wx.CallAfter(box.SetSelection, int(value))
-        self.load_btn.Enable()
-        self.update_status("Successfully loaded values from card :)")
+        fields = list(self.spin_inputs.items()) + list(self.comboboxes.items())
+        self.stream_load(ip, fields, "values from card")
 
 
-class VideoNotify(wx.ScrolledWindow):
+class VideoNotify(NotifyPage):
     """Video Notify panel (window)"""
 
-    # Video Monitoring Control parameters
-    PICTURE_NOISE_LEVEL = "410.x@i"
-    BLACK_DURATION = "411.x@i"
-    BLACK_RESET_DURATION = "412.x@i"
-    FREEZE_DURATION = "413.x@i"
-    FREEZE_RESET_DURATION = "414.x@i"
-    MOTION_DURATION = "423.x@i"
-    MOTION_RESET_DURATION = "422.x@i"
-    LOSS_DURATION = "415.x@i"
-    LOSS_RESET_DURATION = "416.x@i"
-    FREEZE_BLACK_H_START = "417.x@i"
-    FREEZE_BLACK_H_STOP = "418.x@i"
-    FREEZE_BLACK_V_START = "419.x@i"
-    FREEZE_BLACK_V_STOP = "420.x@i"
-    FREEZE_CHECK_ENABLE = "983.x@i"
-    BLACK_CHECK_ENABLE = "985.x@i"
-
-    # Video Notify parameters
-    VIDEO_NOTIFICATIONS = {
-        "Loss of Video": "400.x.0@i",
-        "Video Frozen": "400.x.1@i",
-        "Video Black": "400.x.2@i",
-        "Motion Detected": "400.x.3@i"
-    }
-
-    def __init__(self, notebook: wx.Notebook, main_frame, wxconfig: wx.ConfigBase, http_thread):
+    SCHEMA_PAGE = "Video Notify"
+
+    def __init__(self, notebook: wx.Notebook, main_frame, wxconfig: wx.ConfigBase, engine: RequestEngine):
         """Initialize our main application frame."""
         wx.ScrolledWindow.__init__(self, parent=notebook)
         self.main_frame = main_frame
-        self.http = http_thread
+        self.engine = engine
         self.wxconfig = wxconfig
         self.SetBackgroundColour(DARK_GRAY)
         self.toggle_flag = True
         self.comboboxes: Dict[wx.ComboBox, str] = {}
         self.spin_inputs: Dict[wx.SpinCtrl, str] = {}
+        self.labels: Dict[wx.Window, str] = {}
+        self.speculation = Speculation()
+        self.watched: Dict[Tuple[str, str], wx.Window] = {}
         self.current_input = 1  # Default to input 1
 
         main_sizer = wx.BoxSizer(wx.VERTICAL)
@@ -509,6 +1552,7 @@ class VideoNotify(wx.ScrolledWindow):
         input_select_sizer.Add(self.apply_input_btn, 0, wx.ALL, 5)
 
         top_vbox.Add(btn_hbox, 0, wx.TOP, 5)
+        top_vbox.Add(self.create_range_row(), 0, wx.TOP, 5)
         top_vbox.Add(input_select_sizer, 0, wx.TOP, 5)
 
         main_sizer.Add(top_vbox, 0, wx.ALL, 25)
@@ -536,58 +1580,34 @@ class VideoNotify(wx.ScrolledWindow):
         # Create a grid for the controls
         grid = wx.GridBagSizer(hgap=10, vgap=10)
 
-        # Parameters and their controls
-        parameters = [
-            ("Picture Noise Level", self.PICTURE_NOISE_LEVEL, 1, 14, "", 8),
-            ("Black Duration", self.BLACK_DURATION, 6, 9000, "frames", 330),
-            ("Black Reset Duration", self.BLACK_RESET_DURATION, 0, 60, "seconds", 3),
-            ("Freeze Duration", self.FREEZE_DURATION, 6, 9000, "frames", 330),
-            ("Freeze Reset Duration", self.FREEZE_RESET_DURATION, 0, 60, "seconds", 3),
-            ("Motion Duration", self.MOTION_DURATION, 6, 9000, "frames", 330),
-            ("Motion Reset Duration", self.MOTION_RESET_DURATION, 0, 60, "seconds", 3),
-            ("Loss Duration", self.LOSS_DURATION, 6, 9000, "frames", 6),
-            ("Loss Reset Duration", self.LOSS_RESET_DURATION, 0, 60, "seconds", 3),
-            ("Freeze Black Horizontal Start Percent", self.FREEZE_BLACK_H_START, 0, 100, "%", 0),
-            ("Freeze Black Horizontal Stop Percent", self.FREEZE_BLACK_H_STOP, 0, 100, "%", 100),
-            ("Freeze Black Vertical Start Percent", self.FREEZE_BLACK_V_START, 0, 100, "%", 0),
-            ("Freeze Black Vertical Stop Percent", self.FREEZE_BLACK_V_STOP, 0, 100, "%", 100),
-        ]
-
         # Add parameter rows
-        for row, (param_name, var_id, min_val, max_val, unit, default_val) in enumerate(parameters):
-            label = wx.StaticText(self, label=param_name)
+        parameters = self.schema.group("Video Monitoring Control").parameters
+        for row, parameter in enumerate(parameters):
+            label = wx.StaticText(self, label=parameter.label)
             label.SetForegroundColour(WHITE)
             grid.Add(label, pos=(row, 0), flag=wx.ALL | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=5)
 
-            spin = wx.SpinCtrl(self, min=min_val, max=max_val, initial=default_val)
-            spin.SetBackgroundColour(DARK_GRAY)
-            spin.SetForegroundColour(WHITE)
+            spin = self.spin_control(parameter)
             grid.Add(spin, pos=(row, 1), flag=wx.ALL, border=5)
 
-            range_label = wx.StaticText(self, label=f"({min_val} to {max_val}) {unit}")
+            range_label = wx.StaticText(self, label=parameter.range_text)
             range_label.SetForegroundColour(WHITE)
             grid.Add(range_label, pos=(row, 2), flag=wx.ALL | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=5)
 
-            self.spin_inputs[spin] = var_id
-
-        enable_params = [
-            ("Freeze Check Enable", self.FREEZE_CHECK_ENABLE),
-            ("Black Check Enable", self.BLACK_CHECK_ENABLE)
-        ]
+            self.spin_inputs[spin] = parameter.template
+            self.labels[spin] = parameter.label
 
         row = len(parameters)
-        for param_name, var_id in enable_params:
-            label = wx.StaticText(self, label=param_name)
+        for parameter in self.schema.group("Video Monitoring Enables").parameters:
+            label = wx.StaticText(self, label=parameter.label)
             label.SetForegroundColour(WHITE)
             grid.Add(label, pos=(row, 0), flag=wx.ALL | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=5)
 
-            combobox = wx.ComboBox(self, choices=["Disable", "Enable"], style=wx.CB_READONLY)
-            combobox.SetSelection(0)
-            combobox.SetBackgroundColour(DARK_GRAY)
-            combobox.SetForegroundColour(WHITE)
+            combobox = self.choice_control(parameter)
             grid.Add(combobox, pos=(row, 1), flag=wx.ALL, border=5)
 
-            self.comboboxes[combobox] = var_id
+            self.comboboxes[combobox] = parameter.template
+            self.labels[combobox] = parameter.label
             row += 1
 
         main_sizer.Add(grid, 0, wx.ALL | wx.LEFT, 25)
@@ -623,23 +1643,29 @@ class VideoNotify(wx.ScrolledWindow):
         faults_label.SetForegroundColour(WHITE)
         grid.Add(faults_label, pos=(0, 1), flag=wx.ALL, border=5)
 
-        for row, (notification_type, var_id) in enumerate(self.VIDEO_NOTIFICATIONS.items()):
-            type_label = wx.StaticText(self, label=notification_type)
+        for row, parameter in enumerate(self.schema.group("Video Notify").parameters):
+            type_label = wx.StaticText(self, label=parameter.label)
             type_label.SetForegroundColour(WHITE)
             grid.Add(type_label, pos=(row+1, 0), flag=wx.ALL | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=5)
 
-            combobox = wx.ComboBox(self, choices=["False", "True"], style=wx.CB_READONLY)
-            combobox.SetSelection(1)  # Default to True
-            combobox.SetBackgroundColour(DARK_GRAY)
-            combobox.SetForegroundColour(WHITE)
+            combobox = self.choice_control(parameter)
 
             # Store the combobox with its var id
-            self.comboboxes[combobox] = var_id
+            self.comboboxes[combobox] = parameter.template
+            self.labels[combobox] = parameter.label
 
             grid.Add(combobox, pos=(row+1, 1), flag=wx.ALL, border=5)
 
         main_sizer.Add(grid, 0, wx.ALL | wx.LEFT, 25)
 
+    def table_columns(self):
+        widgets = list(self.spin_inputs.items()) + list(self.comboboxes.items())
+        return [(self.labels[widget], widget, var_id) for widget, var_id in widgets]
+
+    def load_fields(self, input_num):
+        widgets = list(self.spin_inputs.items()) + list(self.comboboxes.items())
+        return [(widget, var_id.replace("x", str(input_num - 1))) for widget, var_id in widgets]
+
     def update_status(self, message, pane=0):
         self.main_frame.SetStatusText(message, pane)
 
@@ -659,7 +1685,7 @@ class VideoNotify(wx.ScrolledWindow):
         dlg.Destroy()
 
     def on_apply_to_inputs(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
@@ -674,30 +1700,37 @@ class VideoNotify(wx.ScrolledWindow):
 
         threading.Thread(target=self._apply_to_inputs_thread, args=(ip, from_input, to_input)).start()
 
-    def _apply_to_inputs_thread(self, ip, from_input, to_input):
-        self.apply_input_btn.Disable()
-        self.update_status(f"Applying config to inputs {from_input} to {to_input}")
-
+    def plan_all(self, from_input, to_input):
+        writes = []
         for input_num in range(from_input, to_input + 1):
             for spinctrl, var_id in self.spin_inputs.items():
                 value = spinctrl.GetValue()
                 var_id = var_id.replace("x", str(input_num-1))
-                url = f"http://{ip}/v.api/apis/EV/SET/parameter/{var_id}/{value}"
-                self.http.get(url)
+                writes.append((var_id, value))
 
             for combobox, var_id in self.comboboxes.items():
                 value = combobox.GetSelection()
-                #print(value)
                 var_id = var_id.replace("x", str(input_num-1))
-                #print(var_id)
-                url = f"http://{ip}/v.api/apis/EV/SET/parameter/{var_id}/{value}"
-                self.http.get(url)
+                writes.append((var_id, value))
+        return writes
 
+    def _apply_to_inputs_thread(self, ip, from_input, to_input):
+        self.apply_input_btn.Disable()
+        self.update_status(f"Applying config to inputs {from_input} to {to_input}")
+
+        writes = self.plan_all(from_input, to_input)
+        failed = self.apply_writes(ip, writes)
         self.apply_input_btn.Enable()
-        self.update_status(f"Successfully applied config to inputs {from_input} to {to_input} :)")
+        if failed is None:
+            self.update_status("Apply cancelled, nothing was written")
+            return
+        if failed:
+            self.update_status(f"Applied config to inputs {from_input} to {to_input}, {len(failed)} of {len(writes)} writes failed")
+        else:
+            self.update_status(f"Successfully applied config to inputs {from_input} to {to_input} :)")
 
     def load_values(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
@@ -705,154 +1738,30 @@ class VideoNotify(wx.ScrolledWindow):
 
         # Get the current input number
         input_num = self.input.GetValue()
-        threading.Thread(target=self._load_values_thread, args=(ip, input_num)).start()
+        self.stream_load(ip, self.load_fields(input_num), f"values from card for input {input_num}",
+                         self.neighbour_var_ids(input_num))
 
-    def _load_values_thread(self, ip, input_num):
-        self.load_btn.Disable()
-        self.update_status(f"Loading values from card for input {input_num}")
-
-        # Load spin control values
-        for i, (spin, varid) in enumerate(self.spin_inputs.items()):
-            varid = varid.replace("x", str(input_num-1))
-            url = f"http://{ip}/v.api/apis/EV/GET/parameter/{varid}"
-            op = self.http.get(url, block=True)
-            #print(op.content)
-            op_content = json.loads(op.content)
-            try:
-                value = int(op_content.get("value", None))
-                wx.CallAfter(spin.SetValue, value)
-            except (ValueError, TypeError) as e:
-                self.error_alert(f"Did not get expected value for parameter {varid}.")
-                continue
 
-        # Load combobox values
-        for box, varid in self.comboboxes.items():
-            varid = varid.replace("x", str(input_num))
-            url = f"http://{ip}/v.api/apis/EV/GET/parameter/{varid}"
-            op = self.http.get(url, block=True)
-            op_content = json.loads(op.content)
-            try:
-                value = int(op_content.get("value", None))
-                wx.CallAfter(box.SetSelection, value)
-            except (ValueError, TypeError) as e:
-                self.error_alert(f"Did not get expected value for parameter {varid}.")
-                continue
-
-        self.load_btn.Enable()
-        self.update_status(f"Successfully loaded values from card for input {input_num} :)")
-
-
-class AudioNotify(wx.ScrolledWindow):
+class AudioNotify(NotifyPage):
     """Audio Notify panel (window)"""
 
-    # Audio Monitoring Control parameters for individual channels
-    # Format: parameter.input.channel@i
-    AUDIO_OVER_LEVEL = "511.x.y@i"
-    AUDIO_OVER_DURATION = "512.x.y@i"
-    AUDIO_OVER_RESET_DURATION = "513.x.y@i"
-    AUDIO_SILENCE_LEVEL = "514.x.y@i"
-    AUDIO_SILENCE_DURATION = "515.x.y@i"
-    AUDIO_SILENCE_RESET_DURATION = "516.x.y@i"
-    AUDIO_LOSS_DURATION = "517.x.y@i"
-    AUDIO_LOSS_RESET_DURATION = "518.x.y@i"
-
-    # Audio Monitoring Control parameters for pairs
-    # Format: parameter.input.pair@i
-    MONO_DETECTION_LEVEL = "521.x.y@i"
-    MONO_DETECTION_DURATION = "522.x.y@i"
-    MONO_DETECTION_RESET_DURATION = "523.x.y@i"
-    PHASE_REVERSE_LEVEL = "524.x.y@i"
-    PHASE_REVERSE_DURATION = "525.x.y@i"
-    PHASE_REVERSE_RESET_DURATION = "526.x.y@i"
-
-    # Audio Notify parameters
-    # Dictionary mapping notification types to their var_ids
-    AUDIO_NOTIFICATIONS = {
-        # Channel Loss
-        "Channel 1 Audio Loss": "530.x.0@i",
-        "Channel 2 Audio Loss": "530.x.1@i",
-        "Channel 3 Audio Loss": "530.x.2@i",
-        "Channel 4 Audio Loss": "530.x.3@i",
-        "Channel 5 Audio Loss": "530.x.4@i",
-        "Channel 6 Audio Loss": "530.x.5@i",
-        "Channel 7 Audio Loss": "530.x.6@i",
-        "Channel 8 Audio Loss": "530.x.7@i",
-        "Channel 9 Audio Loss": "530.x.8@i",
-        "Channel 10 Audio Loss": "530.x.9@i",
-        "Channel 11 Audio Loss": "530.x.10@i",
-        "Channel 12 Audio Loss": "530.x.11@i",
-        "Channel 13 Audio Loss": "530.x.12@i",
-        "Channel 14 Audio Loss": "530.x.13@i",
-        "Channel 15 Audio Loss": "530.x.14@i",
-        "Channel 16 Audio Loss": "530.x.15@i",
-        # Channel Over
-        "Channel 1 Audio Over": "530.x.16@i",
-        "Channel 2 Audio Over": "530.x.17@i",
-        "Channel 3 Audio Over": "530.x.18@i",
-        "Channel 4 Audio Over": "530.x.19@i",
-        "Channel 5 Audio Over": "530.x.20@i",
-        "Channel 6 Audio Over": "530.x.21@i",
-        "Channel 7 Audio Over": "530.x.22@i",
-        "Channel 8 Audio Over": "530.x.23@i",
-        "Channel 9 Audio Over": "530.x.24@i",
-        "Channel 10 Audio Over": "530.x.25@i",
-        "Channel 11 Audio Over": "530.x.26@i",
-        "Channel 12 Audio Over": "530.x.27@i",
-        "Channel 13 Audio Over": "530.x.28@i",
-        "Channel 14 Audio Over": "530.x.29@i",
-        "Channel 15 Audio Over": "530.x.30@i",
-        "Channel 16 Audio Over": "530.x.31@i",
-        # Channel Silence
-        "Channel 1 Audio Silence": "530.x.32@i",
-        "Channel 2 Audio Silence": "530.x.33@i",
-        "Channel 3 Audio Silence": "530.x.34@i",
-        "Channel 4 Audio Silence": "530.x.35@i",
-        "Channel 5 Audio Silence": "530.x.36@i",
-        "Channel 6 Audio Silence": "530.x.37@i",
-        "Channel 7 Audio Silence": "530.x.38@i",
-        "Channel 8 Audio Silence": "530.x.39@i",
-        "Channel 9 Audio Silence": "530.x.40@i",
-        "Channel 10 Audio Silence": "530.x.41@i",
-        "Channel 11 Audio Silence": "530.x.42@i",
-        "Channel 12 Audio Silence": "530.x.43@i",
-        "Channel 13 Audio Silence": "530.x.44@i",
-        "Channel 14 Audio Silence": "530.x.45@i",
-        "Channel 15 Audio Silence": "530.x.46@i",
-        "Channel 16 Audio Silence": "530.x.47@i",
-        # Group Mono
-        "Group 1 Audio Mono 1 and 2": "530.x.48@i",
-        "Group 1 Audio Mono 3 and 4": "530.x.49@i",
-        "Group 2 Audio Mono 1 and 2": "530.x.50@i",
-        "Group 2 Audio Mono 3 and 4": "530.x.51@i",
-        "Group 3 Audio Mono 1 and 2": "530.x.52@i",
-        "Group 3 Audio Mono 3 and 4": "530.x.53@i",
-        "Group 4 Audio Mono 1 and 2": "530.x.54@i",
-        "Group 4 Audio Mono 3 and 4": "530.x.55@i",
-        # Group Phase Reverse
-        "Group 1 Audio PhaseRev 1 and 2": "530.x.56@i",
-        "Group 1 Audio PhaseRev 3 and 4": "530.x.57@i",
-        "Group 2 Audio PhaseRev 1 and 2": "530.x.58@i",
-        "Group 2 Audio PhaseRev 3 and 4": "530.x.59@i",
-        "Group 3 Audio PhaseRev 1 and 2": "530.x.60@i",
-        "Group 3 Audio PhaseRev 3 and 4": "530.x.61@i",
-        "Group 4 Audio PhaseRev 1 and 2": "530.x.62@i",
-        "Group 4 Audio PhaseRev 3 and 4": "530.x.63@i",
-    }
-
-    PAIRS = ["Audio 1 and 2", "Audio 3 and 4", "Audio 5 and 6", "Audio 7 and 8",
-     "Audio 9 and 10", "Audio 11 and 12", "Audio 13 and 14", "Audio 15 and 16"]
-
-    def __init__(self, notebook: wx.Notebook, main_frame, wxconfig: wx.ConfigBase, http_thread):
+    SCHEMA_PAGE = "Audio Notify"
+    PAIRS = SCHEMA.pair_labels
+
+    def __init__(self, notebook: wx.Notebook, main_frame, wxconfig: wx.ConfigBase, engine: RequestEngine):
         """Initialize our main application frame."""
         wx.ScrolledWindow.__init__(self, parent=notebook)
         self.main_frame = main_frame
-        self.http = http_thread
+        self.engine = engine
         self.wxconfig = wxconfig
         self.SetBackgroundColour(DARK_GRAY)
         self.toggle_flag = True
         self.comboboxes: Dict[wx.ComboBox, str] = {}
         self.channel_controls: Dict[wx.SpinCtrl, str] = {}
         self.pair_controls: Dict[wx.SpinCtrl, str] = {}
+        self.labels: Dict[wx.Window, str] = {}
+        self.speculation = Speculation()
+        self.watched: Dict[Tuple[str, str], wx.Window] = {}
 
         main_sizer = wx.BoxSizer(wx.VERTICAL)
 
@@ -865,7 +1774,7 @@ class AudioNotify(wx.ScrolledWindow):
 
         channel_label = wx.StaticText(self, label="Channel:")
         channel_label.SetForegroundColour(WHITE)
-        self.channel = wx.SpinCtrl(self, min=1, max=16, initial=1)
+        self.channel = wx.SpinCtrl(self, min=1, max=self.channel_count, initial=1)
         self.channel.SetBackgroundColour(DARK_GRAY)
         self.channel.SetForegroundColour(WHITE)
 
@@ -911,6 +1820,7 @@ class AudioNotify(wx.ScrolledWindow):
 
         top_vbox = wx.BoxSizer(wx.VERTICAL)
         top_vbox.Add(btn_hbox, 0, wx.TOP, 5)
+        top_vbox.Add(self.create_range_row(), 0, wx.TOP, 5)
         top_vbox.Add(input_select_sizer, 0, wx.TOP, 5)
 
         main_sizer.Add(top_vbox, 0, wx.ALL, 25)
@@ -942,12 +1852,12 @@ class AudioNotify(wx.ScrolledWindow):
         channel_label.SetForegroundColour(WHITE)
         channel_select_sizer.Add(channel_label, 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
 
-        self.channel_start = wx.SpinCtrl(self, min=1, max=16, initial=1)
+        self.channel_start = wx.SpinCtrl(self, min=1, max=self.channel_count, initial=1)
         self.channel_start.SetBackgroundColour(DARK_GRAY)
         self.channel_start.SetForegroundColour(WHITE)
         to_text = wx.StaticText(self, label="to")
         to_text.SetForegroundColour(WHITE)
-        self.channel_end = wx.SpinCtrl(self, min=1, max=16, initial=16)
+        self.channel_end = wx.SpinCtrl(self, min=1, max=self.channel_count, initial=self.channel_count)
         self.channel_end.SetBackgroundColour(DARK_GRAY)
         self.channel_end.SetForegroundColour(WHITE)
         channel_select_sizer.Add(self.channel_start, 0, wx.ALL, 5)
@@ -958,42 +1868,7 @@ class AudioNotify(wx.ScrolledWindow):
         grid = wx.GridBagSizer(hgap=10, vgap=10)
         grid.Add(channel_select_sizer, pos=(0, 0), span=(0,2), flag=wx.ALL | wx.ALIGN_LEFT, border=5)
 
-        headers = ["Audio Over Level", "Audio Over Duration", "Audio Over Reset Duration",
-                   "Audio Silence Level", "Audio Silence Duration", "Audio Silence Reset Duration",
-                   "Audio Loss Duration", "Audio Loss Reset Duration"]
-
-        ranges = ["(-30 to 0) dBFS", "(1 to 3600) seconds", "(0 to 60) seconds",
-                  "(-96 to -20) dBFS", "(1 to 3600) seconds", "(0 to 60) seconds",
-                  "(1 to 300) seconds", "(0 to 60) seconds"]
-
-        for col, header in enumerate(headers):
-            header_label = wx.StaticText(self, label=header)
-            header_label.SetForegroundColour(WHITE)
-            grid.Add(header_label, pos=(1, col), flag=wx.ALL | wx.ALIGN_LEFT, border=5)
-
-            range_label = wx.StaticText(self, label=ranges[col])
-            range_label.SetForegroundColour(WHITE)
-            grid.Add(range_label, pos=(2, col), flag=wx.ALL | wx.ALIGN_LEFT, border=5)
-
-        # Parameters for the selected channel
-        parameters = [
-            (self.AUDIO_OVER_LEVEL, -30, 0, -24),
-            (self.AUDIO_OVER_DURATION, 1, 3600, 10),
-            (self.AUDIO_OVER_RESET_DURATION, 0, 60, 3),
-            (self.AUDIO_SILENCE_LEVEL, -96, -20, -60),
-            (self.AUDIO_SILENCE_DURATION, 1, 3600, 10),
-            (self.AUDIO_SILENCE_RESET_DURATION, 0, 60, 3),
-            (self.AUDIO_LOSS_DURATION, 1, 300, 1),
-            (self.AUDIO_LOSS_RESET_DURATION, 0, 60, 3)
-        ]
-
-        # Add spin controls for the parameters
-        for col, (var_id, min_val, max_val, default_val) in enumerate(parameters):
-            spin = wx.SpinCtrl(self, min=min_val, max=max_val, initial=default_val)
-            spin.SetBackgroundColour(DARK_GRAY)
-            spin.SetForegroundColour(WHITE)
-            grid.Add(spin, pos=(3, col), flag=wx.ALL, border=5)
-            self.channel_controls[spin] = var_id
+        self.add_spin_columns(grid, self.schema.group("Audio Monitoring Control"), self.channel_controls)
 
         main_sizer.Add(grid, 0, wx.ALL | wx.LEFT, 25)
 
@@ -1025,40 +1900,26 @@ class AudioNotify(wx.ScrolledWindow):
         # Create a grid for the controls
         grid = wx.GridBagSizer(hgap=10, vgap=10)
         grid.Add(pair_select_sizer, pos=(0, 0), span=(0, 3), flag=wx.ALL | wx.ALIGN_LEFT, border=5)
-        # Headers for the grid
-        headers = ["Mono Detection Level", "Mono Detection Duration", "Mono Detection Reset Duration",
-                   "Phase Reverse Level", "Phase Reverse Duration", "Phase Reverse Reset Duration"]
+        self.add_spin_columns(grid, self.schema.group("Audio Monitoring Control Pair"), self.pair_controls)
 
-        ranges = ["(20 to 50)", "(0 to 127) seconds", "(0 to 60) seconds",
-                  "(50 to 100)", "(0 to 127) seconds", "(0 to 60) seconds"]
+        main_sizer.Add(grid, 0, wx.ALL | wx.LEFT, 25)
 
-        for col, header in enumerate(headers):
-            header_label = wx.StaticText(self, label=header)
+    def add_spin_columns(self, grid: wx.GridBagSizer, group: nexxschema.Group,
+                         controls: Dict[wx.SpinCtrl, str]) -> None:
+        """One column per parameter of the group: header, range and spin control in rows 1 to 3."""
+        for col, parameter in enumerate(group.parameters):
+            header_label = wx.StaticText(self, label=parameter.label)
             header_label.SetForegroundColour(WHITE)
             grid.Add(header_label, pos=(1, col), flag=wx.ALL | wx.ALIGN_LEFT, border=5)
 
-            range_label = wx.StaticText(self, label=ranges[col])
+            range_label = wx.StaticText(self, label=parameter.range_text)
             range_label.SetForegroundColour(WHITE)
             grid.Add(range_label, pos=(2, col), flag=wx.ALL | wx.ALIGN_LEFT, border=5)
 
-        parameters = [
-            (self.MONO_DETECTION_LEVEL, 20, 50, 20),
-            (self.MONO_DETECTION_DURATION, 0, 127, 1),
-            (self.MONO_DETECTION_RESET_DURATION, 0, 60, 3),
-            (self.PHASE_REVERSE_LEVEL, 50, 100, 50),
-            (self.PHASE_REVERSE_DURATION, 0, 127, 1),
-            (self.PHASE_REVERSE_RESET_DURATION, 0, 60, 3)
-        ]
-
-        # Add spin controls for the parameters
-        for col, (var_id, min_val, max_val, default_val) in enumerate(parameters):
-            spin = wx.SpinCtrl(self, min=min_val, max=max_val, initial=default_val)
-            spin.SetBackgroundColour(DARK_GRAY)
-            spin.SetForegroundColour(WHITE)
+            spin = self.spin_control(parameter)
             grid.Add(spin, pos=(3, col), flag=wx.ALL, border=5)
-            self.pair_controls[spin] = var_id
-
-        main_sizer.Add(grid, 0, wx.ALL | wx.LEFT, 25)
+            controls[spin] = parameter.template
+            self.labels[spin] = parameter.label
 
     def create_audio_notify(self, main_sizer):
         # Audio Notify header
@@ -1115,70 +1976,87 @@ class AudioNotify(wx.ScrolledWindow):
         faults_label.SetForegroundColour(WHITE)
         grid.Add(faults_label, pos=(1, 1), flag=wx.ALL, border=5)
 
-        # Group notifications by type for better organization
-        notification_groups = [
-            # Channel Loss
-            ["Channel 1 Audio Loss", "Channel 2 Audio Loss", "Channel 3 Audio Loss", "Channel 4 Audio Loss",
-             "Channel 5 Audio Loss", "Channel 6 Audio Loss", "Channel 7 Audio Loss", "Channel 8 Audio Loss",
-             "Channel 9 Audio Loss", "Channel 10 Audio Loss", "Channel 11 Audio Loss", "Channel 12 Audio Loss",
-             "Channel 13 Audio Loss", "Channel 14 Audio Loss", "Channel 15 Audio Loss", "Channel 16 Audio Loss"],
-
-            # Channel Over
-            ["Channel 1 Audio Over", "Channel 2 Audio Over", "Channel 3 Audio Over", "Channel 4 Audio Over",
-             "Channel 5 Audio Over", "Channel 6 Audio Over", "Channel 7 Audio Over", "Channel 8 Audio Over",
-             "Channel 9 Audio Over", "Channel 10 Audio Over", "Channel 11 Audio Over", "Channel 12 Audio Over",
-             "Channel 13 Audio Over", "Channel 14 Audio Over", "Channel 15 Audio Over", "Channel 16 Audio Over"],
-
-            # Channel Silence
-            ["Channel 1 Audio Silence", "Channel 2 Audio Silence", "Channel 3 Audio Silence", "Channel 4 Audio Silence",
-             "Channel 5 Audio Silence", "Channel 6 Audio Silence", "Channel 7 Audio Silence", "Channel 8 Audio Silence",
-             "Channel 9 Audio Silence", "Channel 10 Audio Silence", "Channel 11 Audio Silence",
-             "Channel 12 Audio Silence",
-             "Channel 13 Audio Silence", "Channel 14 Audio Silence", "Channel 15 Audio Silence",
-             "Channel 16 Audio Silence"],
-
-            # Group Mono
-            ["Group 1 Audio Mono 1 and 2", "Group 1 Audio Mono 3 and 4",
-             "Group 2 Audio Mono 1 and 2", "Group 2 Audio Mono 3 and 4",
-             "Group 3 Audio Mono 1 and 2", "Group 3 Audio Mono 3 and 4",
-             "Group 4 Audio Mono 1 and 2", "Group 4 Audio Mono 3 and 4"],
-
-            # Group Phase Reverse
-            ["Group 1 Audio PhaseRev 1 and 2", "Group 1 Audio PhaseRev 3 and 4",
-             "Group 2 Audio PhaseRev 1 and 2", "Group 2 Audio PhaseRev 3 and 4",
-             "Group 3 Audio PhaseRev 1 and 2", "Group 3 Audio PhaseRev 3 and 4",
-             "Group 4 Audio PhaseRev 1 and 2", "Group 4 Audio PhaseRev 3 and 4"]
-        ]
-
+        # Notifications of the same type are grouped between separators
         row = 1
-        for group in notification_groups:
-            for notification_type in group:
-                type_label = wx.StaticText(self, label=notification_type)
-                type_label.SetForegroundColour(WHITE)
-                grid.Add(type_label, pos=(row+1, 0), flag=wx.ALL | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=5)
+        subgroup = None
+        for parameter in self.schema.group("Audio Notify").parameters:
+            if subgroup is not None and parameter.subgroup != subgroup:
+                separator = wx.StaticLine(self, style=wx.LI_HORIZONTAL)
+                grid.Add(separator, pos=(row+1, 0), span=(1, 2), flag=wx.EXPAND | wx.ALL, border=5)
+                row += 1
+            subgroup = parameter.subgroup
 
-                combobox = wx.ComboBox(self, choices=["False", "True"], style=wx.CB_READONLY)
-                combobox.SetSelection(1)  # Default to True
-                combobox.SetBackgroundColour(DARK_GRAY)
-                combobox.SetForegroundColour(WHITE)
+            type_label = wx.StaticText(self, label=parameter.label)
+            type_label.SetForegroundColour(WHITE)
+            grid.Add(type_label, pos=(row+1, 0), flag=wx.ALL | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=5)
 
-                # Store the combobox with its var id
-                self.comboboxes[combobox] = self.AUDIO_NOTIFICATIONS[notification_type]
+            combobox = self.choice_control(parameter)
 
-                grid.Add(combobox, pos=(row+1, 1), flag=wx.ALL, border=5)
-                row += 1
+            # Store the combobox with its var id
+            self.comboboxes[combobox] = parameter.template
+            self.labels[combobox] = parameter.label
 
-            # Add a separator between groups
-            if group != notification_groups[-1]:
-                separator = wx.StaticLine(self, style=wx.LI_HORIZONTAL)
-                grid.Add(separator, pos=(row+1, 0), span=(1, 2), flag=wx.EXPAND | wx.ALL, border=5)
-                row += 1
+            grid.Add(combobox, pos=(row+1, 1), flag=wx.ALL, border=5)
+            row += 1
 
         main_sizer.Add(grid, 0, wx.ALL | wx.LEFT, 25)
 
+    def table_columns(self):
+        channel = self.channel.GetValue()
+        pair = self.pair.GetSelection()
+        columns = []
+        for spin, var_id in self.channel_controls.items():
+            columns.append((f"{self.labels[spin]} Ch {channel}", spin, var_id.replace("y", str(channel - 1))))
+        for spin, var_id in self.pair_controls.items():
+            columns.append((f"{self.labels[spin]} {self.PAIRS[pair]}", spin, var_id.replace("y", str(pair))))
+        for box, var_id in self.comboboxes.items():
+            columns.append((self.labels[box], box, var_id))
+        return columns
+
+    def load_fields(self, input_num, channel=1, pair=1):
+        fields = [(spin, var_id.replace("y", str(channel - 1))) for spin, var_id in self.channel_controls.items()]
+        fields += [(spin, var_id.replace("y", str(pair - 1))) for spin, var_id in self.pair_controls.items()]
+        fields += self.comboboxes.items()
+        return [(widget, var_id.replace("x", str(input_num - 1))) for widget, var_id in fields]
+
+    @property
+    def channel_count(self) -> int:
+        """Channels in the schema, or on the connected card if it has fewer."""
+        channels = SCHEMA.dimensions["channel"]
+        if self.capabilities is not None:
+            channels = min(channels, self.capabilities.channels)
+        return channels
+
+    @property
+    def pair_count(self) -> int:
+        return min(len(self.PAIRS), SCHEMA.dimensions["pair"], self.channel_count // 2)
+
+    def neighbour_var_ids(self, input_num, channel=1, pair=1):
+        """Neighbouring inputs at the same channel and pair, then the adjacent channels and pairs."""
+        var_ids = [var_id for neighbour in (input_num + 1, input_num - 1) if 1 <= neighbour <= MAX_INPUTS
+                   for var_id in self.input_var_ids(neighbour, channel, pair)]
+        x = str(input_num - 1)
+        for neighbour in (channel + 1, channel - 1):
+            if 1 <= neighbour <= self.channel_count:
+                var_ids += [var_id.replace("x", x).replace("y", str(neighbour - 1))
+                            for var_id in self.channel_controls.values()]
+        for neighbour in (pair + 1, pair - 1):
+            if 1 <= neighbour <= self.pair_count:
+                var_ids += [var_id.replace("x", x).replace("y", str(neighbour - 1))
+                            for var_id in self.pair_controls.values()]
+        return var_ids
+
+    def template_labels(self):
+        suffixes = {"channel": " (per channel)", "pair": " (per pair)"}
+        return {parameter.template: parameter.label + suffixes.get(group.index, "")
+                for group in self.schema.groups for parameter in group.parameters}
+
     def update_status(self, message, pane=0):
         self.main_frame.SetStatusText(message, pane)
 
+    def on_apply_progress(self, done, total):
+        wx.CallAfter(self.update_status, f"Applied {done} / {total} writes")
+
     def on_toggle_all(self, evt):
         for combobox in self.comboboxes:
             if self.toggle_flag:
@@ -1193,7 +2071,7 @@ class AudioNotify(wx.ScrolledWindow):
         dlg.Destroy()
 
     def on_apply_to_inputs(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
@@ -1216,33 +2094,50 @@ class AudioNotify(wx.ScrolledWindow):
             return
         threading.Thread(target=self._apply_to_inputs_thread, args=(ip, from_input, to_input, from_channel, to_channel, from_pair, to_pair)).start()
 
-    def _apply_to_inputs_thread(self, ip, from_input, to_input, from_channel, to_channel, from_pair, to_pair):
-        self.apply_input_btn.Disable()
-        self.update_status(f"Applying config to inputs {from_input} / {to_input}")
-
+    def plan_controls(self, from_input, to_input, from_channel, to_channel, from_pair, to_pair):
+        writes = []
         for input_num in range(from_input, to_input + 1):
-            self.update_status(f"Applying configuration to input {input_num} / {to_input}")
             for channel_num in range(from_channel, to_channel + 1):
                 for spinctrl, var_id in self.channel_controls.items():
                     value = spinctrl.GetValue()
                     var_id = var_id.replace("x", str(input_num - 1)).replace("y", str(channel_num-1)) # -1 due to 0 indexed var ids
-                    #print(var_id)
-                    url = f"http://{ip}/v.api/apis/EV/SET/parameter/{var_id}/{value}"
-                    self.http.get(url,)
+                    writes.append((var_id, value))
 
             for pair_num in range(from_pair, to_pair + 1):
                 for spinctrl, var_id in self.pair_controls.items():
                     value = spinctrl.GetValue()
                     var_id = var_id.replace("x", str(input_num - 1)).replace("y", str(pair_num)) # No -1 as combobox is 0 indexed
-                    #print(var_id)
-                    url = f"http://{ip}/v.api/apis/EV/SET/parameter/{var_id}/{value}"
-                    self.http.get(url)
+                    writes.append((var_id, value))
+        return writes
+
+    def plan_toggles(self, from_input, to_input):
+        golden = TrapMatrix.from_row(list(self.comboboxes.values()),
+                                     [combobox.GetSelection() for combobox in self.comboboxes], from_input, to_input)
+        return golden.writes()
+
+    def plan_all(self, from_input, to_input):
+        """Monitoring controls over the page's channel and pair ranges, then the notify toggles."""
+        return (self.plan_controls(from_input, to_input, self.channel_start.GetValue(), self.channel_end.GetValue(),
+                                   self.pair_start.GetSelection(), self.pair_end.GetSelection()) +
+                self.plan_toggles(from_input, to_input))
+
+    def _apply_to_inputs_thread(self, ip, from_input, to_input, from_channel, to_channel, from_pair, to_pair):
+        self.apply_input_btn.Disable()
+        self.update_status(f"Applying config to inputs {from_input} / {to_input}")
 
+        writes = self.plan_controls(from_input, to_input, from_channel, to_channel, from_pair, to_pair)
+        failed = self.apply_writes(ip, writes, self.on_apply_progress)
         self.apply_input_btn.Enable()
-        self.update_status(f"Successfully applied config to inputs {from_input} to {to_input} :)")
+        if failed is None:
+            self.update_status("Apply cancelled, nothing was written")
+            return
+        if failed:
+            self.update_status(f"Applied config to inputs {from_input} to {to_input}, {len(failed)} of {len(writes)} writes failed")
+        else:
+            self.update_status(f"Successfully applied config to inputs {from_input} to {to_input} :)")
 
     def on_apply_to_toggle_inputs(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
@@ -1259,20 +2154,20 @@ class AudioNotify(wx.ScrolledWindow):
         self.apply_toggle_input_btn.Disable()
         self.update_status(f"Applying config to inputs {from_input} / {to_input}")
 
-        for input_num in range(from_input, to_input + 1):
-            self.update_status(f"Applying configuration to input {input_num} / {to_input}")
-            for combobox, var_id in self.comboboxes.items():
-                value = combobox.GetSelection()
-                var_id = var_id.replace("x", str(input_num - 1))
-                #print(var_id)
-                url = f"http://{ip}/v.api/apis/EV/SET/parameter/{var_id}/{value}"
-                self.http.get(url)
+        writes = self.plan_toggles(from_input, to_input)
 
+        failed = self.apply_writes(ip, writes, self.on_apply_progress)
         self.apply_toggle_input_btn.Enable()
-        self.update_status(f"Successfully applied config to inputs {from_input} to {to_input} :)")
+        if failed is None:
+            self.update_status("Apply cancelled, nothing was written")
+            return
+        if failed:
+            self.update_status(f"Applied config to inputs {from_input} to {to_input}, {len(failed)} of {len(writes)} writes failed")
+        else:
+            self.update_status(f"Successfully applied config to inputs {from_input} to {to_input} :)")
 
     def load_values(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
@@ -1282,145 +2177,27 @@ class AudioNotify(wx.ScrolledWindow):
         input_num = self.input.GetValue()
         channel = self.channel.GetValue()
         pair = self.pair.GetSelection() + 1 # As selection starts from 0
-        threading.Thread(target=self._load_values_thread, args=(ip, input_num, channel, pair)).start()
+        self.stream_load(ip, self.load_fields(input_num, channel, pair), f"values from card for input {input_num}",
+                         self.neighbour_var_ids(input_num, channel, pair))
 
-    def _load_values_thread(self, ip, input_num, channel, pair):
-        self.load_btn.Disable()
-        self.update_status(f"Loading values from card for input {input_num}")
-
-        # Load channel settings for the selected input's selected channel
-        for i, (spin, var_id) in enumerate(self.channel_controls.items()):
-            var_id_formatted = var_id.replace("x", str(input_num - 1)).replace("y", str(channel - 1))
-            url = f"http://{ip}/v.api/apis/EV/GET/parameter/{var_id_formatted}"
-            op = self.http.get(url, block=True)
-            op_content = json.loads(op.content)
-            try:
-                value = int(op_content.get("value", None))
-                wx.CallAfter(spin.SetValue, value)
-            except (ValueError, TypeError) as e:
-                self.error_alert(f"Did not get expected value for parameter {var_id_formatted}.")
-                continue
 
-        # Load pair settings for the selected input's selected pair
-        for i, (spin, var_id) in enumerate(self.pair_controls.items()):
-            var_id_formatted = var_id.replace("x", str(input_num - 1)).replace("y", str(pair - 1))
-            url = f"http://{ip}/v.api/apis/EV/GET/parameter/{var_id_formatted}"
-            op = self.http.get(url, block=True)
-            op_content = json.loads(op.content)
-            try:
-                value = int(op_content.get("value", None))
-                wx.CallAfter(spin.SetValue, value)
-            except (ValueError, TypeError) as e:
-                self.error_alert(f"Did not get expected value for parameter {var_id_formatted}.")
-                continue
-
-        # Load Values for combobox
-        for box, varid in self.comboboxes.items():
-            varid = varid.replace("x", str(input_num))
-            url = f"http://{ip}/v.api/apis/EV/GET/parameter/{varid}"
-            op = self.http.get(url, block=True)
-            op_content = json.loads(op.content)
-            try:
-                value = int(op_content.get("value", None))
-                wx.CallAfter(box.SetSelection, value)
-            except (ValueError, TypeError) as e:
-                self.error_alert(f"Did not get expected value for parameter {varid}.")
-                continue
-        self.load_btn.Enable()
-        self.update_status("Successfully loaded values from Card")
-
-
-class AdvancedNotify(wx.ScrolledWindow):
+class AdvancedNotify(NotifyPage):
     """Advanced Notify panel (window)"""
 
-    # Advanced Notify parameters
-    # Dictionary mapping notification types to their var_ids
-    ADVANCED_NOTIFICATIONS = {
-        # Advanced Video Traps
-        "APL Above Max": "560.x.0@i",
-        "APL Below Min": "560.x.1@i",
-        "PPL Max above Threshold": "560.x.2@i",
-        "PPL Min below Threshold": "560.x.3@i",
-        "Loss of Closed Caption 1": "560.x.4@i",
-        "Loss of Closed Caption 2": "560.x.5@i",
-        "Loss of Closed Caption 3": "560.x.6@i",
-        "Loss of Closed Caption 4": "560.x.7@i",
-        "Loss of Text 1": "560.x.8@i",
-        "Loss of Text 2": "560.x.9@i",
-        "Loss of Text 3": "560.x.10@i",
-        "Loss of Text 4": "560.x.11@i",
-        "Loss of 708 Service 1": "560.x.12@i",
-        "Loss of 708 Service 2": "560.x.13@i",
-        "Loss of 708 Service 3": "560.x.14@i",
-        "Loss of 708 Service 4": "560.x.15@i",
-        "Loss of 708 Service 5": "560.x.16@i",
-        "Loss of 708 Service 6": "560.x.17@i",
-        "Loss of 708 Service 7": "560.x.18@i",
-        "Loss of 708 Service 8": "560.x.19@i",
-        "Loss of 708 Service 9": "560.x.20@i",
-        "Loss of 708 Service 10": "560.x.21@i",
-        "Loss of 708 Service 11": "560.x.22@i",
-        "Loss of 708 Service 12": "560.x.23@i",
-        "Loss of 708 Service 13": "560.x.24@i",
-        "Loss of 708 Service 14": "560.x.25@i",
-        "Loss of 708 Service 15": "560.x.26@i",
-        "Loss of 708 Service 16": "560.x.27@i",
-        "Loss of SMPTE AFD": "560.x.28@i",
-        "SMPTE AFD Value Change": "560.x.29@i",
-        "Loss of Video Index": "560.x.30@i",
-        "Video Index Value Change": "560.x.31@i",
-        "Loss of CC Waveform": "560.x.32@i",
-        "Loss of Program Rating": "560.x.33@i",
-        "Change of Program Rating": "560.x.34@i",
-        "Loss of SID": "560.x.35@i",
-        "Loss of VITC": "560.x.36@i",
-        "Loss of VITC Waveform": "560.x.37@i",
-        "Loss of WSS": "560.x.38@i",
-        "Loss of Extended Data Services": "560.x.39@i",
-        "Loss of World Standard Teletext": "560.x.40@i",
-        "SCTE 104 Program Start": "560.x.41@i",
-        "SCTE 104 Program End": "560.x.42@i",
-        "SCTE 104 Chapter Start": "560.x.43@i",
-        "SCTE 104 Chapter End": "560.x.44@i",
-        "SCTE 104 Provider Ad Start": "560.x.45@i",
-        "SCTE 104 Provider Ad End": "560.x.46@i",
-        "SCTE 104 Distributor Ad Start": "560.x.47@i",
-        "SCTE 104 Distributor Ad End": "560.x.48@i",
-        "SCTE 104 Placement Op Start": "560.x.49@i",
-        "SCTE 104 Placement Op End": "560.x.50@i",
-        "SCTE 104 Break Start": "560.x.51@i",
-        "SCTE 104 Break End": "560.x.52@i",
-        "SCTE 104 Web Restrict": "560.x.53@i",
-        "SCTE 104 Region Blackout": "560.x.54@i",
-        "SCTE 104 Splice Start Normal": "560.x.55@i",
-        "SCTE 104 Splice Start Immediate": "560.x.56@i",
-        "SCTE 104 Splice End Normal": "560.x.57@i",
-        "SCTE 104 Splice End Immediate": "560.x.58@i",
-        "SCTE 104 Splice Cancel": "560.x.59@i",
-        "Video Standard Change": "560.x.60@i",
-        "Video Standard Mismatch": "560.x.61@i",
-        "SCTE 104 Content Identification": "560.x.62@i",
-        "Loss of LTC": "560.x.63@i",
-        "LTC Frozen": "560.x.64@i",
-        "LTC Jumping": "560.x.65@i",
-        "Chroma Subsampling Mismatch": "560.x.66@i",
-        "Loss of DVB": "560.x.67@i",
-        "Loss of SCTE 27": "560.x.68@i",
-        "Storage Aspect Ratio Mismatch": "560.x.69@i",
-        "Display Aspect Ratio Mismatch": "560.x.70@i",
-        "Loss of Caption Data": "560.x.71@i",
-        "Loss of Caption Content": "560.x.72@i",
-    }
-
-    def __init__(self, notebook: wx.Notebook, main_frame, wxconfig: wx.ConfigBase, http_thread):
+    SCHEMA_PAGE = "Advanced Notify"
+
+    def __init__(self, notebook: wx.Notebook, main_frame, wxconfig: wx.ConfigBase, engine: RequestEngine):
         """Initialize our main application frame."""
         wx.ScrolledWindow.__init__(self, parent=notebook)
         self.main_frame = main_frame
-        self.http = http_thread
+        self.engine = engine
         self.wxconfig = wxconfig
         self.SetBackgroundColour(DARK_GRAY)
         self.toggle_flag = True
         self.comboboxes: Dict[wx.ComboBox, str] = {}
+        self.labels: Dict[wx.Window, str] = {}
+        self.speculation = Speculation()
+        self.watched: Dict[Tuple[str, str], wx.Window] = {}
 
         main_sizer = wx.BoxSizer(wx.VERTICAL)
 
@@ -1463,6 +2240,7 @@ class AdvancedNotify(wx.ScrolledWindow):
         input_select_sizer.Add(self.apply_input_btn, 0, wx.ALL, 5)
 
         top_vbox.Add(btn_hbox, 0, wx.TOP, 5)
+        top_vbox.Add(self.create_range_row(), 0, wx.TOP, 5)
         top_vbox.Add(input_select_sizer, 0, wx.TOP, 5)
 
         main_sizer.Add(top_vbox, 0, wx.ALL, 25)
@@ -1505,27 +2283,34 @@ class AdvancedNotify(wx.ScrolledWindow):
 
         # Add all notifications to the grid
         row = 1
-        for notification_type, var_id in self.ADVANCED_NOTIFICATIONS.items():
-            type_label = wx.StaticText(self, label=notification_type)
+        for parameter in self.schema.group("Advanced Notify").parameters:
+            type_label = wx.StaticText(self, label=parameter.label)
             type_label.SetForegroundColour(WHITE)
             grid.Add(type_label, pos=(row, 0), flag=wx.ALL | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=5)
 
-            combobox = wx.ComboBox(self, choices=["False", "True"], style=wx.CB_READONLY)
-            combobox.SetSelection(1)  # Default to True
-            combobox.SetBackgroundColour(DARK_GRAY)
-            combobox.SetForegroundColour(WHITE)
+            combobox = self.choice_control(parameter)
 
             # Store the combobox with its var id
-            self.comboboxes[combobox] = var_id
+            self.comboboxes[combobox] = parameter.template
+            self.labels[combobox] = parameter.label
 
             grid.Add(combobox, pos=(row, 1), flag=wx.ALL, border=5)
             row += 1
 
         main_sizer.Add(grid, 0, wx.ALL | wx.LEFT, 25)
 
+    def table_columns(self):
+        return [(self.labels[box], box, var_id) for box, var_id in self.comboboxes.items()]
+
+    def load_fields(self, input_num):
+        return [(box, var_id.replace("x", str(input_num - 1))) for box, var_id in self.comboboxes.items()]
+
     def update_status(self, message, pane=0):
         self.main_frame.SetStatusText(message, pane)
 
+    def on_apply_progress(self, done, total):
+        wx.CallAfter(self.update_status, f"Applied {done} / {total} writes")
+
     def on_toggle_all(self, evt):
         for combobox in self.comboboxes:
             if self.toggle_flag:
@@ -1540,7 +2325,7 @@ class AdvancedNotify(wx.ScrolledWindow):
         dlg.Destroy()
 
     def on_apply_to_inputs(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
@@ -1555,23 +2340,29 @@ class AdvancedNotify(wx.ScrolledWindow):
 
         threading.Thread(target=self._apply_to_inputs_thread, args=(ip, from_input, to_input)).start()
 
+    def plan_all(self, from_input, to_input):
+        golden = TrapMatrix.from_row(list(self.comboboxes.values()),
+                                     [combobox.GetSelection() for combobox in self.comboboxes], from_input, to_input)
+        return golden.writes()
+
     def _apply_to_inputs_thread(self, ip, from_input, to_input):
         self.apply_input_btn.Disable()
         self.update_status(f"Applying config to inputs {from_input} / {to_input}")
 
-        for input_num in range(from_input, to_input + 1):
-            self.update_status(f"Applying configuration to input {input_num} / {to_input}")
-            for combobox, var_id in self.comboboxes.items():
-                value = combobox.GetSelection()
-                var_id = var_id.replace("x", str(input_num - 1))  # -1 due to 0 indexed var ids
-                url = f"http://{ip}/v.api/apis/EV/SET/parameter/{var_id}/{value}"
-                self.http.get(url)
+        writes = self.plan_all(from_input, to_input)
 
+        failed = self.apply_writes(ip, writes, self.on_apply_progress)
         self.apply_input_btn.Enable()
-        self.update_status(f"Successfully applied config to inputs {from_input} to {to_input} :)")
+        if failed is None:
+            self.update_status("Apply cancelled, nothing was written")
+            return
+        if failed:
+            self.update_status(f"Applied config to inputs {from_input} to {to_input}, {len(failed)} of {len(writes)} writes failed")
+        else:
+            self.update_status(f"Successfully applied config to inputs {from_input} to {to_input} :)")
 
     def load_values(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
@@ -1579,100 +2370,28 @@ class AdvancedNotify(wx.ScrolledWindow):
 
         # Get the input number
         input_num = self.input.GetValue()
-        threading.Thread(target=self._load_values_thread, args=(ip, input_num)).start()
-
-    def _load_values_thread(self, ip, input_num):
-        self.load_btn.Disable()
-        self.update_status(f"Loading values from card for input {input_num}")
-
-        # Load values for comboboxes
-        for box, var_id in self.comboboxes.items():
-            var_id = var_id.replace("x", str(input_num - 1))  # -1 due to 0 indexed var ids
-            url = f"http://{ip}/v.api/apis/EV/GET/parameter/{var_id}"
-            op = self.http.get(url, block=True)
-            op_content = json.loads(op.content)
-            try:
-                value = int(op_content.get("value", None))
-                wx.CallAfter(box.SetSelection, value)
-            except (ValueError, TypeError) as e:
-                self.error_alert(f"Did not get expected value for parameter {var_id}.")
-                continue
-
-        self.load_btn.Enable()
-        self.update_status("Successfully loaded values from Card")
+        self.stream_load(ip, self.load_fields(input_num), f"values from card for input {input_num}",
+                         self.neighbour_var_ids(input_num))
 
-class AdvancedAudioNotify(wx.ScrolledWindow):
+class AdvancedAudioNotify(NotifyPage):
     """Advanced Audio Notify panel (window)"""
 
-    # Advanced Audio Notify parameters
-    # Dictionary mapping notification types to their var_ids
-    ADVANCED_AUDIO_NOTIFICATIONS = {
-        # Audio Loudness Traps
-        "Audio Loudness Over Group 1 and 2 Program 1": "840.x.0@i",
-        "Audio Loudness Over Group 1 and 2 Program 2": "840.x.1@i",
-        "Audio Loudness Over Group 1 and 2 Program 3": "840.x.2@i",
-        "Audio Loudness Over Group 1 and 2 Program 4": "840.x.3@i",
-        "Audio Loudness Over Group 1 and 2 Program 5": "840.x.4@i",
-        "Audio Loudness Over Group 1 and 2 Program 6": "840.x.5@i",
-        "Audio Loudness Over Group 1 and 2 Program 7": "840.x.6@i",
-        "Audio Loudness Over Group 1 and 2 Program 8": "840.x.7@i",
-        "Audio Loudness Over Group 3 and 4 Program 1": "840.x.8@i",
-        "Audio Loudness Over Group 3 and 4 Program 2": "840.x.9@i",
-        "Audio Loudness Over Group 3 and 4 Program 3": "840.x.10@i",
-        "Audio Loudness Over Group 3 and 4 Program 4": "840.x.11@i",
-        "Audio Loudness Over Group 3 and 4 Program 5": "840.x.12@i",
-        "Audio Loudness Over Group 3 and 4 Program 6": "840.x.13@i",
-        "Audio Loudness Over Group 3 and 4 Program 7": "840.x.14@i",
-        "Audio Loudness Over Group 3 and 4 Program 8": "840.x.15@i",
-        "Audio Loudness Silence Group 1 and 2 Program 1": "840.x.16@i",
-        "Audio Loudness Silence Group 1 and 2 Program 2": "840.x.17@i",
-        "Audio Loudness Silence Group 1 and 2 Program 3": "840.x.18@i",
-        "Audio Loudness Silence Group 1 and 2 Program 4": "840.x.19@i",
-        "Audio Loudness Silence Group 1 and 2 Program 5": "840.x.20@i",
-        "Audio Loudness Silence Group 1 and 2 Program 6": "840.x.21@i",
-        "Audio Loudness Silence Group 1 and 2 Program 7": "840.x.22@i",
-        "Audio Loudness Silence Group 1 and 2 Program 8": "840.x.23@i",
-        "Audio Loudness Silence Group 3 and 4 Program 1": "840.x.24@i",
-        "Audio Loudness Silence Group 3 and 4 Program 2": "840.x.25@i",
-        "Audio Loudness Silence Group 3 and 4 Program 3": "840.x.26@i",
-        "Audio Loudness Silence Group 3 and 4 Program 4": "840.x.27@i",
-        "Audio Loudness Silence Group 3 and 4 Program 5": "840.x.28@i",
-        "Audio Loudness Silence Group 3 and 4 Program 6": "840.x.29@i",
-        "Audio Loudness Silence Group 3 and 4 Program 7": "840.x.30@i",
-        "Audio Loudness Silence Group 3 and 4 Program 8": "840.x.31@i",
-    }
-
-    # Compressed Audio Notifications
-    COMPRESSED_AUDIO_NOTIFICATIONS = {
-        "Compressed Audio Loss Ch1/2 Grp1": "1009.x.4@i",
-        "Compressed Audio Loss Ch3/4 Grp1": "1009.x.5@i",
-        "Compressed Audio Loss Ch1/2 Grp2": "1009.x.6@i",
-        "Compressed Audio Loss Ch3/4 Grp2": "1009.x.7@i",
-        "Compressed Audio Loss Ch1/2 Grp3": "1009.x.8@i",
-        "Compressed Audio Loss Ch3/4 Grp3": "1009.x.9@i",
-        "Compressed Audio Loss Ch1/2 Grp4": "1009.x.10@i",
-        "Compressed Audio Loss Ch3/4 Grp4": "1009.x.11@i",
-        "Audio Type Change Ch1/2 Grp1": "1009.x.12@i",
-        "Audio Type Change Ch3/4 Grp1": "1009.x.13@i",
-        "Audio Type Change Ch1/2 Grp2": "1009.x.14@i",
-        "Audio Type Change Ch3/4 Grp2": "1009.x.15@i",
-        "Audio Type Change Ch1/2 Grp3": "1009.x.16@i",
-        "Audio Type Change Ch3/4 Grp3": "1009.x.17@i",
-        "Audio Type Change Ch1/2 Grp4": "1009.x.18@i",
-        "Audio Type Change Ch3/4 Grp4": "1009.x.19@i",
-    }
-
-    def __init__(self, notebook: wx.Notebook, main_frame, wxconfig: wx.ConfigBase, http_thread):
+    SCHEMA_PAGE = "Advanced Audio Notify"
+
+    def __init__(self, notebook: wx.Notebook, main_frame, wxconfig: wx.ConfigBase, engine: RequestEngine):
         """Initialize our audio notify panel."""
         wx.ScrolledWindow.__init__(self, parent=notebook)
         self.main_frame = main_frame
-        self.http = http_thread
+        self.engine = engine
         self.wxconfig = wxconfig
         self.SetBackgroundColour(DARK_GRAY)
         self.toggle_flag_loudness = True
         self.toggle_flag_compressed = True
         self.loudness_comboboxes: Dict[wx.ComboBox, str] = {}
         self.compressed_comboboxes: Dict[wx.ComboBox, str] = {}
+        self.labels: Dict[wx.Window, str] = {}
+        self.speculation = Speculation()
+        self.watched: Dict[Tuple[str, str], wx.Window] = {}
 
         main_sizer = wx.BoxSizer(wx.VERTICAL)
 
@@ -1694,6 +2413,7 @@ class AdvancedAudioNotify(wx.ScrolledWindow):
 
 
         top_vbox.Add(btn_hbox, 0, wx.TOP, 5)
+        top_vbox.Add(self.create_range_row(), 0, wx.TOP, 5)
 
         main_sizer.Add(top_vbox, 0, wx.ALL, 25)
 
@@ -1762,18 +2482,16 @@ class AdvancedAudioNotify(wx.ScrolledWindow):
 
         # Add all notifications to the grid
         row = 1
-        for notification_type, var_id in self.ADVANCED_AUDIO_NOTIFICATIONS.items():
-            type_label = wx.StaticText(self, label=notification_type)
+        for parameter in self.schema.group("Audio Loudness Notify").parameters:
+            type_label = wx.StaticText(self, label=parameter.label)
             type_label.SetForegroundColour(WHITE)
             grid.Add(type_label, pos=(row+1, 0), flag=wx.ALL | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=5)
 
-            combobox = wx.ComboBox(self, choices=["False", "True"], style=wx.CB_READONLY)
-            combobox.SetSelection(1)  # Default to True
-            combobox.SetBackgroundColour(DARK_GRAY)
-            combobox.SetForegroundColour(WHITE)
+            combobox = self.choice_control(parameter)
 
             # Store the combobox with its var id
-            self.loudness_comboboxes[combobox] = var_id
+            self.loudness_comboboxes[combobox] = parameter.template
+            self.labels[combobox] = parameter.label
 
             grid.Add(combobox, pos=(row+1, 1), flag=wx.ALL, border=5)
             row += 1
@@ -1837,27 +2555,36 @@ class AdvancedAudioNotify(wx.ScrolledWindow):
 
         # Add all notifications to the grid
         row = 1
-        for notification_type, var_id in self.COMPRESSED_AUDIO_NOTIFICATIONS.items():
-            type_label = wx.StaticText(self, label=notification_type)
+        for parameter in self.schema.group("Compressed Audio Notify").parameters:
+            type_label = wx.StaticText(self, label=parameter.label)
             type_label.SetForegroundColour(WHITE)
             grid.Add(type_label, pos=(row+1, 0), flag=wx.ALL | wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL, border=5)
 
-            combobox = wx.ComboBox(self, choices=["False", "True"], style=wx.CB_READONLY)
-            combobox.SetSelection(1)  # Default to True
-            combobox.SetBackgroundColour(DARK_GRAY)
-            combobox.SetForegroundColour(WHITE)
+            combobox = self.choice_control(parameter)
 
             # Store the combobox with its var id
-            self.compressed_comboboxes[combobox] = var_id
+            self.compressed_comboboxes[combobox] = parameter.template
+            self.labels[combobox] = parameter.label
 
             grid.Add(combobox, pos=(row+1, 1), flag=wx.ALL, border=5)
             row += 1
 
         main_sizer.Add(grid, 0, wx.ALL | wx.LEFT, 25)
 
+    def table_columns(self):
+        boxes = list(self.loudness_comboboxes.items()) + list(self.compressed_comboboxes.items())
+        return [(self.labels[box], box, var_id) for box, var_id in boxes]
+
+    def load_fields(self, input_num):
+        boxes = list(self.loudness_comboboxes.items()) + list(self.compressed_comboboxes.items())
+        return [(box, var_id.replace("x", str(input_num - 1))) for box, var_id in boxes]
+
     def update_status(self, message, pane=0):
         self.main_frame.SetStatusText(message, pane)
 
+    def on_apply_progress(self, done, total):
+        wx.CallAfter(self.update_status, f"Applied {done} / {total} writes")
+
     def on_toggle_all_loudness(self, evt):
         for combobox in self.loudness_comboboxes:
             if self.toggle_flag_loudness:
@@ -1880,7 +2607,7 @@ class AdvancedAudioNotify(wx.ScrolledWindow):
         dlg.Destroy()
 
     def on_apply_to_loudness_inputs(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
@@ -1895,25 +2622,40 @@ class AdvancedAudioNotify(wx.ScrolledWindow):
 
         threading.Thread(target=self._apply_to_loudness_inputs_thread, args=(ip, from_input, to_input)).start()
 
+    def plan_loudness(self, from_input, to_input):
+        golden = TrapMatrix.from_row(list(self.loudness_comboboxes.values()),
+                                     [combobox.GetSelection() for combobox in self.loudness_comboboxes],
+                                     from_input, to_input)
+        return golden.writes()
+
+    def plan_compressed(self, from_input, to_input):
+        golden = TrapMatrix.from_row(list(self.compressed_comboboxes.values()),
+                                     [combobox.GetSelection() for combobox in self.compressed_comboboxes],
+                                     from_input, to_input)
+        return golden.writes()
+
+    def plan_all(self, from_input, to_input):
+        return self.plan_loudness(from_input, to_input) + self.plan_compressed(from_input, to_input)
+
     def _apply_to_loudness_inputs_thread(self, ip, from_input, to_input):
         self.apply_loudness_input_btn.Disable()
         self.update_status(f"Applying config to input {from_input} / {to_input}")
 
-        for input_num in range(from_input, to_input + 1):
-            self.update_status(f"Applying configuration to input {input_num} / {to_input}")
-
-            # Apply loudness settings
-            for combobox, var_id in self.loudness_comboboxes.items():
-                value = combobox.GetSelection()
-                var_id = var_id.replace("x", str(input_num - 1))  # -1 due to 0 indexed var ids
-                url = f"http://{ip}/v.api/apis/EV/SET/parameter/{var_id}/{value}"
-                self.http.get(url)
+        # Apply loudness settings
+        writes = self.plan_loudness(from_input, to_input)
 
+        failed = self.apply_writes(ip, writes, self.on_apply_progress)
         self.apply_loudness_input_btn.Enable()
-        self.update_status(f"Successfully applied audio config to inputs {from_input} to {to_input} :)")
+        if failed is None:
+            self.update_status("Apply cancelled, nothing was written")
+            return
+        if failed:
+            self.update_status(f"Applied audio config to inputs {from_input} to {to_input}, {len(failed)} of {len(writes)} writes failed")
+        else:
+            self.update_status(f"Successfully applied audio config to inputs {from_input} to {to_input} :)")
 
     def on_apply_to_compressed_inputs(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
@@ -1932,20 +2674,21 @@ class AdvancedAudioNotify(wx.ScrolledWindow):
         self.apply_loudness_input_btn.Disable()
         self.update_status(f"Applying config to inputs {from_input} / {to_input}")
 
-        for input_num in range(from_input, to_input + 1):
-            self.update_status(f"Applying configuration to input {input_num} / {to_input}")
-            # Apply compressed audio settings
-            for combobox, var_id in self.compressed_comboboxes.items():
-                value = combobox.GetSelection()
-                var_id = var_id.replace("x", str(input_num - 1))  # -1 due to 0 indexed var ids
-                url = f"http://{ip}/v.api/apis/EV/SET/parameter/{var_id}/{value}"
-                self.http.get(url)
+        # Apply compressed audio settings
+        writes = self.plan_compressed(from_input, to_input)
 
+        failed = self.apply_writes(ip, writes, self.on_apply_progress)
         self.apply_loudness_input_btn.Enable()
-        self.update_status(f"Successfully applied audio config to inputs {from_input} to {to_input} :)")
+        if failed is None:
+            self.update_status("Apply cancelled, nothing was written")
+            return
+        if failed:
+            self.update_status(f"Applied audio config to inputs {from_input} to {to_input}, {len(failed)} of {len(writes)} writes failed")
+        else:
+            self.update_status(f"Successfully applied audio config to inputs {from_input} to {to_input} :)")
 
     def load_values(self, evt):
-        ip = self.wxconfig.Read(IP_LOC, defaultVal="")  # Get IP from registry
+        ip = self.current_ip()
 
         if ip == "":
             self.error_alert("IP not set. Try connecting first.")
@@ -1953,44 +2696,28 @@ class AdvancedAudioNotify(wx.ScrolledWindow):
 
         # Get the input number
         input_num = self.input.GetValue()
-        threading.Thread(target=self._load_values_thread, args=(ip, input_num)).start()
-
-    def _load_values_thread(self, ip, input_num):
-        self.load_btn.Disable()
-        self.update_status(f"Loading audio values from card for input {input_num}")
-
-        # Load values for loudness comboboxes
-        for box, var_id in self.loudness_comboboxes.items():
-            var_id = var_id.replace("x", str(input_num - 1))  # -1 due to 0 indexed var ids
-            url = f"http://{ip}/v.api/apis/EV/GET/parameter/{var_id}"
-            op = self.http.get(url, block=True)
-            op_content = json.loads(op.content)
-            try:
-                value = int(op_content.get("value", None))
-                wx.CallAfter(box.SetSelection, value)
-            except (ValueError, TypeError) as e:
-                self.error_alert(f"Did not get expected value for parameter {var_id}.")
-                continue
-
-        # Load values for compressed audio comboboxes
-        for box, var_id in self.compressed_comboboxes.items():
-            var_id = var_id.replace("x", str(input_num - 1))  # -1 due to 0 indexed var ids
-            url = f"http://{ip}/v.api/apis/EV/GET/parameter/{var_id}"
-            op = self.http.get(url, block=True)
-            op_content = json.loads(op.content)
-            try:
-                value = int(op_content.get("value", None))
-                wx.CallAfter(box.SetSelection, value)
-            except (ValueError, TypeError) as e:
-                self.error_alert(f"Did not get expected value for parameter {var_id}.")
-                continue
-
-        self.load_btn.Enable()
-        self.update_status("Successfully loaded audio values from Card")
+        self.stream_load(ip, self.load_fields(input_num), f"audio values from card for input {input_num}",
+                         self.neighbour_var_ids(input_num))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=PRODUCTNAME)
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), default="ahttp",
+                        help="HTTP backend used to talk to the cards (default: ahttp)")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE,
+                        help="Keep-alive connections per card for the asyncio transport")
+    parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help="Seconds before an idle pooled connection is closed")
+    args = parser.parse_args()
+    options = {}
+    if args.transport == "asyncio":
+        options = {"pool_size": args.pool_size, "idle_timeout": args.idle_timeout}
+    try:
+        transport = create_transport(args.transport, **options)
+    except ImportError as err:
+        print("ahttp required: http://stash/projects/DVG/repos/ahttp/browse")
+        sys.exit(1)
     app = WIT.InspectableApp(DEBUG)
     app.SetAppName(APPNAME)
     app.SetVendorName(VENDORNAME)
-    frame = AppFrame(DEBUG)
+    frame = AppFrame(DEBUG, transport=transport)
     app.MainLoop()
@@ -0,0 +1,227 @@
+"""Throughput benchmark for the card transports.
+
+Starts a local stand-in NEXX card that answers the GET/SET parameter API
+with a configurable delay, then runs the same bulk apply and load through
+each transport and prints requests per second.
+
+With --fleet it instead starts that many stand-in cards in processes of
+their own and snapshots all of them through FleetExecutor with more and
+more worker processes, to show how fleet throughput scales with cores.
+
+With --decode it times decoding that many GET response bodies with each
+response decoder, e.g. 12181 per card for a full snapshot of 20 cards.
+
+    python benchmark.py --requests 2000 --delay 5 --transport asyncio ahttp
+    python benchmark.py --fleet 200 --processes 1 2 4 8 --requests 500
+    python benchmark.py --decode 243620
+"""
+import argparse
+import json
+import multiprocessing
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from nexxclient import BASE_API, DECODERS, TRANSPORTS, RequestEngine, create_decoder, create_transport
+from nexxfleet import FleetExecutor
+
+
+class StandInCardHandler(BaseHTTPRequestHandler):
+    """Answers /v.api/apis/EV/GET|SET/parameter/... like a NEXX card."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the card's web server
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+    def do_GET(self):
+        parts = self.path.split("/")
+        # ["", "v.api", "apis", "EV", "GET", "parameter", varid(, value)]
+        if len(parts) < 7 or "/" + "/".join(parts[1:4]) + "/" != "/" + BASE_API or parts[5] != "parameter":
+            self.send_error(404)
+            return
+        time.sleep(self.server.delay)
+        card = self.server
+        if parts[4] == "SET" and len(parts) == 8:
+            with card.lock:
+                card.values[parts[6]] = parts[7]
+            body = b""
+        elif parts[4] == "GET":
+            with card.lock:
+                value = card.values.get(parts[6], "1")
+            body = json.dumps({"value": value}).encode()
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInCard(ThreadingHTTPServer):
+    """A local HTTP server holding one card's parameter values."""
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0, port: int = 0):
+        super().__init__(("127.0.0.1", port), StandInCardHandler)
+        self.delay = delay
+        self.values: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def address(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> "StandInCard":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def _serve_cards(count: int, delay: float, addresses, stop) -> None:
+    """Serve count stand-in cards in this (child) process until stop is set."""
+    cards = [StandInCard(delay=delay).start() for _ in range(count)]
+    for card in cards:
+        addresses.put(card.address)
+    stop.wait()
+    for card in cards:
+        card.stop()
+
+
+class StandInFleet:
+    """Many stand-in cards, served from several processes so serving them is not the bottleneck."""
+
+    def __init__(self, cards: int, delay: float = 0.0, processes: int = 4):
+        context = multiprocessing.get_context("spawn")
+        self._addresses = context.Queue()
+        self._stop = context.Event()
+        self.cards = cards
+        counts = [cards // processes + (i < cards % processes) for i in range(processes)]
+        self._processes = [context.Process(target=_serve_cards, args=(count, delay, self._addresses, self._stop),
+                                           daemon=True) for count in counts if count]
+        self.addresses: List[str] = []
+
+    def start(self) -> "StandInFleet":
+        for process in self._processes:
+            process.start()
+        self.addresses = [self._addresses.get(timeout=60) for _ in range(self.cards)]
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        for process in self._processes:
+            process.join()
+
+
+def bench_transport(name: str, card: StandInCard, requests: int) -> Dict[str, float]:
+    transport = create_transport(name)
+    engine = RequestEngine(transport)
+    client = engine.client(card.address)
+    writes = [(f"530.{i // 64}.{i % 64}@i", i % 2) for i in range(requests)]
+    try:
+        start = time.perf_counter()
+        failed = client.set_many(writes)
+        set_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = client.get_many(var_id for var_id, _ in writes)
+        get_time = time.perf_counter() - start
+        pool = transport.stats(card.address)
+    finally:
+        engine.stop()
+    errors = len(failed) + sum(isinstance(value, Exception) for value in results.values())
+    return {"set_rps": requests / set_time, "get_rps": requests / get_time, "errors": errors,
+            "reuse_rate": pool.get("reuse_rate")}
+
+
+def bench_fleet(cards: List[str], processes: int, requests: int, transport: str) -> Dict[str, float]:
+    var_ids = [f"530.{i // 64}.{i % 64}@i" for i in range(requests)]
+    with FleetExecutor(processes, transport) as fleet:
+        fleet.snapshot(cards, var_ids[:1])  # Spawn and import in the workers before timing
+        result = fleet.snapshot(cards, var_ids)
+    metrics = result.metrics()
+    return {"rps": metrics["requests_per_second"], "errors": metrics["errors"], "elapsed": result.elapsed}
+
+
+def bench_decoders(bodies: int) -> Dict[str, float]:
+    """Bodies decoded per second by each decoder, for bodies like the stand-in card's."""
+    contents = [json.dumps({"value": str(i % 1000 - 100)}).encode() for i in range(bodies)]
+    rates = {}
+    for name in DECODERS:
+        try:
+            decode = create_decoder(name).decode
+        except ImportError:
+            continue
+        start = time.perf_counter()
+        for content in contents:
+            decode(content)
+        rates[name] = bodies / (time.perf_counter() - start)
+    return rates
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="SETs and GETs per transport")
+    parser.add_argument("--delay", type=float, default=2.0, help="Stand-in card response delay in ms")
+    parser.add_argument("--transport", nargs="+", choices=sorted(TRANSPORTS), default=sorted(TRANSPORTS))
+    parser.add_argument("--fleet", type=int, default=0, help="Stand-in cards for the fleet scaling run (with "
+                                                             "--requests GETs per card)")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Worker process counts the fleet run compares")
+    parser.add_argument("--decode", type=int, default=0, help="Response bodies for the decoder run")
+    args = parser.parse_args(argv)
+
+    if args.decode:
+        rates = bench_decoders(args.decode)
+        for name, rate in rates.items():
+            print(f"{name:>8}: {rate:10.0f} bodies/s  x{rate / rates['json']:.2f}  "
+                  f"{args.decode / rate * 1000:7.1f} ms")
+        for name in DECODERS.keys() - rates.keys():
+            print(f"{name:>8}: skipped (not installed)")
+        return
+
+    if args.fleet:
+        fleet = StandInFleet(args.fleet, args.delay / 1000, max(1, multiprocessing.cpu_count() // 2)).start()
+        try:
+            for name in args.transport:
+                base = None
+                for processes in args.processes:
+                    try:
+                        result = bench_fleet(fleet.addresses, processes, args.requests, name)
+                    except ImportError as e:
+                        print(f"{name:>8}: skipped ({e})")
+                        break
+                    base = base or result["rps"]
+                    print(f"{name:>8} {processes:>3} processes: {result['rps']:8.0f} req/s  {result['elapsed']:6.1f} s  "
+                          f"x{result['rps'] / base:.2f}  errors {result['errors']}")
+        finally:
+            fleet.stop()
+        return
+
+    card = StandInCard(delay=args.delay / 1000).start()
+    try:
+        for name in args.transport:
+            try:
+                result = bench_transport(name, card, args.requests)
+            except ImportError as e:
+                print(f"{name:>8}: skipped ({e})")
+                continue
+            reuse = "n/a" if result["reuse_rate"] is None else f"{result['reuse_rate']:.1%}"
+            print(f"{name:>8}: SET {result['set_rps']:8.0f} req/s  GET {result['get_rps']:8.0f} req/s  "
+                  f"errors {result['errors']}  connection reuse {reuse}")
+    finally:
+        card.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Local HTTP/JSON control API for bulk jobs.
+
+Orchestration submits snapshot, diff, apply and restore jobs here. They go
+to the same Scheduler (nexxscheduler) that runs maintenance-window jobs, so
+they run concurrently across cards and can have windows of their own. The
+server is a single asyncio loop: any number of clients and open progress
+streams cost no threads, and the little blocking work (job files, plans)
+goes to the loop's default executor.
+
+    GET    /jobs                  progress of every job
+    POST   /jobs                  {"kind": "apply", "cards": ["10.20.0.11"], "plan": {"400.0.0@i": 1}}
+                                  ("snapshot": path instead of "plan", optional "window" and "name";
+                                  "reject_locked": true answers 409 if another instance holds a card)
+    GET    /jobs/<id>             the job's report
+    DELETE /jobs/<id>             cancel the job
+    GET    /jobs/<id>/progress    progress and card request metrics as JSON lines while the job runs
+    GET    /metrics               request metrics of every card
+    GET    /locks                 card locks held by any instance
+
+    python nexxapi.py --port 8470
+"""
+import argparse
+import asyncio
+import http
+import json
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+from nexxclient import TRANSPORTS, RequestEngine, create_transport
+from nexxlock import DEFAULT_DIRECTORY as DEFAULT_LOCK_DIRECTORY, CardLocked, LockManager
+from nexxscheduler import (APPLY, CANCELLED, DEFAULT_DIRECTORY, DEFAULT_INTERVAL, DONE, FAILED, PAUSED, Job,
+                           Scheduler, Window, load_plan)
+
+DEFAULT_HOST = "127.0.0.1"  # Local only: the API can write to any card the host can reach
+DEFAULT_PORT = 8470
+MAX_BODY = 16 * 1024 * 1024  # bytes
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ControlServer:
+    """Serves the control API for a scheduler on its own event loop."""
+
+    def __init__(self, scheduler: Scheduler, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.scheduler = scheduler
+        self.host = host
+        self.port = port  # The port listened on once started, if 0 was asked for
+        self._streams: Dict[str, List[asyncio.Queue]] = {}  # Job id: queues of the open progress streams
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._error: Optional[OSError] = None
+        self._thread: Optional[threading.Thread] = None
+        scheduler.listeners.append(self._on_progress)
+
+    def progress(self, job: Job) -> Dict:
+        """A job's progress with the request metrics of its cards."""
+        event = job.progress()
+        event["elapsed"] = time.time() - job.started if job.started else 0.0
+        event["metrics"] = {client.ip: client.metrics() for client in self.scheduler.engine.clients()
+                            if client.ip in job.cards}
+        return event
+
+    def serve_forever(self) -> None:
+        asyncio.run(self._serve())
+
+    def start(self) -> "ControlServer":
+        """Serve on a background thread. Returns once the server is listening.
+
+        Raises OSError if the port cannot be listened on.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="nexx-api", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            raise self._error
+        return self
+
+    def stop(self) -> None:
+        """Close the server and end the open progress streams."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join()
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            await self._stopping.wait()
+        finally:
+            server.close()
+            for queues in self._streams.values():
+                for queue in queues:
+                    queue.put_nowait(None)
+            await server.wait_closed()
+
+    def _on_progress(self, job: Job) -> None:
+        """Scheduler listener, called from job worker threads."""
+        loop = self._loop
+        if loop is None or not self._streams.get(job.id):
+            return
+        event = self.progress(job)
+        try:
+            loop.call_soon_threadsafe(self._publish, job.id, event)
+        except RuntimeError:
+            pass  # The loop closed in the meantime
+
+    def _publish(self, job_id: str, event: Dict) -> None:
+        for queue in self._streams.get(job_id, ()):
+            queue.put_nowait(event)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, body = await self._read_request(reader)
+                parts = path.split("?")[0].strip("/").split("/")
+                if method == "GET" and len(parts) == 3 and parts[0] == "jobs" and parts[2] == "progress":
+                    await self._stream(writer, parts[1])
+                    return
+                status, payload = await self._route(method, parts, body)
+            except ApiError as e:
+                status, payload = e.status, {"error": str(e)}
+            except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            except Exception as e:
+                traceback.print_exc()
+                status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+            data = json.dumps(payload).encode()
+            writer.write(self._head(status, len(data)) + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        request_line = (await reader.readuntil(b"\r\n")).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise ApiError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise ApiError(400, "Content-Length is not a number")
+        if length < 0:
+            raise ApiError(400, "Content-Length is negative")
+        if length > MAX_BODY:
+            raise ApiError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return request_line[0].upper(), request_line[1], body
+
+    @staticmethod
+    def _head(status: int, length: Optional[int] = None, content_type: str = "application/json") -> bytes:
+        lines = [f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}", f"Content-Type: {content_type}",
+                 "Cache-Control: no-cache", "Connection: close"]
+        if length is not None:
+            lines.append(f"Content-Length: {length}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+    async def _call(self, function, *args):
+        """Run blocking scheduler work off the loop."""
+        return await self._loop.run_in_executor(None, function, *args)
+
+    async def _job(self, job_id: str) -> Job:
+        try:
+            return await self._call(self.scheduler.job, job_id)
+        except KeyError:
+            raise ApiError(404, f"No job {job_id}")
+
+    async def _route(self, method: str, parts: List[str], body: bytes) -> Tuple[int, object]:
+        if parts == ["metrics"]:
+            if method != "GET":
+                raise ApiError(405, "Use GET")
+            return 200, {client.ip: client.metrics() for client in self.scheduler.engine.clients()}
+        if parts == ["locks"]:
+            if method != "GET":
+                raise ApiError(405, "Use GET")
+            return 200, [holder.to_dict() for holder in await self._call(self.scheduler.locks.locks)]
+        if parts == ["jobs"]:
+            if method == "GET":
+                jobs = await self._call(self.scheduler.jobs)
+                return 200, [job.progress() for job in jobs]
+            if method == "POST":
+                job = await self._call(self._submit, body)
+                return 201, job.progress()
+            raise ApiError(405, "Use GET or POST")
+        if len(parts) == 2 and parts[0] == "jobs":
+            if method == "GET":
+                return 200, (await self._job(parts[1])).report()
+            if method == "DELETE":
+                await self._job(parts[1])
+                job = await self._call(self.scheduler.cancel, parts[1])
+                return 200, job.progress()
+            raise ApiError(405, "Use GET or DELETE")
+        raise ApiError(404, f"No such resource /{'/'.join(parts)}")
+
+    def _submit(self, body: bytes) -> Job:
+        try:
+            request = json.loads(body)
+            if not isinstance(request, dict):
+                raise ValueError("Expected a JSON object")
+            cards = request.get("cards")
+            if not cards or not isinstance(cards, list):
+                raise ValueError("cards must be a list of card IPs")
+            if "snapshot" in request:
+                writes = load_plan(request["snapshot"])
+            else:
+                plan = request.get("plan", {})
+                writes = [(str(var_id), value) for var_id, value in (plan.items() if isinstance(plan, dict) else plan)]
+            window = Window.parse(request["window"]) if request.get("window") else None
+            kind = request.get("kind", APPLY)
+            return self.scheduler.submit(writes, [str(ip) for ip in cards], window, request.get("name", kind), kind,
+                                         bool(request.get("reject_locked")))
+        except CardLocked as e:
+            raise ApiError(409, str(e))
+        except (ValueError, TypeError) as e:
+            raise ApiError(400, str(e))
+        except OSError as e:
+            raise ApiError(400, f"Cannot read snapshot: {e}")
+
+    async def _stream(self, writer: asyncio.StreamWriter, job_id: str) -> None:
+        """Send the job's progress as a JSON line now and on every update until it stops running.
+
+        A job that is waiting for its window sends its current state first
+        and then stays open until that run ends too.
+        """
+        queue = asyncio.Queue()
+        self._streams.setdefault(job_id, []).append(queue)
+        try:
+            try:
+                event = self.progress(await self._job(job_id))
+            except ApiError as e:
+                data = json.dumps({"error": str(e)}).encode()
+                writer.write(self._head(e.status, len(data)) + data)
+                return
+            writer.write(self._head(200, content_type="application/x-ndjson"))
+            first = True
+            while event is not None:
+                writer.write(json.dumps(event).encode() + b"\n")
+                await writer.drain()
+                if event["status"] in FINISHED or (event["status"] == PAUSED and not first):
+                    break
+                first = False
+                event = await queue.get()
+        except ConnectionError:
+            pass
+        finally:
+            self._streams[job_id].remove(queue)
+            if not self._streams[job_id]:
+                del self._streams[job_id]
+            writer.close()
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the NEXX bulk job API on this machine")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--dir", default=DEFAULT_DIRECTORY, help="Job queue directory")
+    parser.add_argument("--locks", default=DEFAULT_LOCK_DIRECTORY, help="Card lock directory shared by all instances")
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), default="asyncio")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help="Seconds between checks for jobs whose window opened")
+    args = parser.parse_args(argv)
+
+    engine = RequestEngine(create_transport(args.transport))
+    scheduler = Scheduler(engine, args.dir, locks=LockManager(args.locks)).start(args.interval)
+    server = ControlServer(scheduler, args.host, args.port)
+    print(f"Serving the job API on http://{args.host}:{args.port}/jobs")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.stop()
+        scheduler.locks.close()
+        engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Card capability probe.
+
+Card variants have fewer than 32 inputs or 16 audio channels, and older
+firmware lacks some parameter families (such as some 560.x.* or 1009.x.*
+traps). probe() finds out with one concurrent burst of GETs the first
+time a card and firmware is seen, and the result is kept in a small JSON
+cache. Only an empty or error reply means a parameter is absent: probes
+lost to timeouts or dropped connections are asked again, and if some are
+still unanswered their parameters count as present and the result is not
+cached. Once a CardClient has capabilities, it skips requests the card
+cannot answer instead of sending them.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import nexxschema
+from nexxclient import CardClient, ErrorResponse
+from nexxstate import MAX_INPUTS, parse_var_ids
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".nexx_capabilities.json")
+IDENTITY_VAR_ID = "1"  # Card type and firmware, as shown on connect
+INPUT_PROBE = "400.x.0@i"  # Loss of Video trap, present on every input
+CHANNEL_PROBE = "511.0.y@i"  # Audio over level of input 1, one per channel
+MAX_CHANNELS = 16
+PROBE_ATTEMPTS = 3  # Tries per probe var id the card does not answer at all
+
+
+def responded(value) -> bool:
+    """Whether a GET result means the parameter exists on the card."""
+    return not isinstance(value, Exception) and value is not None and value != ""
+
+
+def answered(value) -> bool:
+    """Whether a GET result came from the card, rather than the request failing on the way."""
+    return not isinstance(value, Exception) or isinstance(value, ErrorResponse)
+
+
+def absent(value) -> bool:
+    """Whether a GET result means the card does not have the parameter."""
+    return answered(value) and not responded(value)
+
+
+def family(template: str) -> str:
+    """Parameter family of a var id template, e.g. "560" for "560.x.4@i"."""
+    return template.split("@")[0].split(".")[0]
+
+
+class Capabilities:
+    """What one card (at one firmware) answers to."""
+
+    def __init__(self, identity, inputs: int, channels: int, missing: Sequence[str],
+                 templates: Sequence[Tuple[str, int]] = (), indexes: Optional[Mapping[str, Optional[str]]] = None):
+        self.identity = identity
+        self.inputs = inputs
+        self.channels = channels
+        self.missing = set(missing)
+        self._subs = dict(templates)
+        self._parsed = parse_var_ids(templates)
+        # What "y" stands for in each template: "channel", "pair" or None; by default as in the schema
+        self._indexes = indexes if indexes is not None else nexxschema.load().indexes()
+
+    def missing_families(self) -> List[str]:
+        """Families with no template the card answers to."""
+        families: Dict[str, bool] = {}
+        for template in self._subs:
+            families[family(template)] = families.get(family(template), False) or template not in self.missing
+        return sorted(name for name, present in families.items() if not present)
+
+    def supports(self, var_id: str) -> bool:
+        """False for var ids of missing templates or beyond the card's inputs and channels.
+
+        Var ids the templates do not cover are assumed to be supported.
+        """
+        parsed = self._parsed.get(var_id)
+        if parsed is None:
+            return True
+        template, input_num, sub = parsed
+        if template in self.missing or input_num > self.inputs:
+            return False
+        index = self._indexes.get(template)
+        if index == "channel":
+            return sub < self.channels
+        if index == "pair":
+            return sub < self.channels // 2
+        return True
+
+    def to_dict(self) -> Dict:
+        return {"identity": self.identity, "inputs": self.inputs, "channels": self.channels,
+                "missing": sorted(self.missing), "probed": time.time()}
+
+
+class CapabilityCache:
+    """Probe results on disk, keyed by card IP and identity (firmware)."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self._entries: Dict[str, Dict] = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    @staticmethod
+    def key(ip: str, identity) -> str:
+        return f"{ip}|{identity}"
+
+    def get(self, ip: str, identity, templates: Sequence[Tuple[str, int]],
+            indexes: Optional[Mapping[str, Optional[str]]] = None) -> Optional[Capabilities]:
+        entry = self._entries.get(self.key(ip, identity))
+        if entry is None:
+            return None
+        return Capabilities(identity, entry["inputs"], entry["channels"], entry["missing"], templates, indexes)
+
+    def put(self, ip: str, capabilities: Capabilities) -> None:
+        with self._lock:
+            self._entries[self.key(ip, capabilities.identity)] = capabilities.to_dict()
+            try:
+                with open(self.path, "w") as f:
+                    json.dump(self._entries, f, indent=1)
+            except OSError:
+                pass  # The probe is only repeated next time
+
+
+def highest_responding(results: Dict[str, object], var_ids: Sequence[str]) -> int:
+    """How many of var_ids, in order, come before the first the card does not have."""
+    for count, var_id in enumerate(var_ids):
+        if absent(results[var_id]):
+            return count
+    return len(var_ids)
+
+
+def probe(client: CardClient, templates: Sequence[Tuple[str, int]],
+          cache: Optional[CapabilityCache] = None,
+          indexes: Optional[Mapping[str, Optional[str]]] = None) -> Tuple[Capabilities, bool]:
+    """Capabilities of a card, from the cache or by probing it.
+
+    Reads the card identity, then (on a cache miss) the input and channel
+    probes and one var id of every template on input 1, all concurrently,
+    asking again up to PROBE_ATTEMPTS times for those the card did not
+    answer. Returns the capabilities and whether they came from the cache.
+    indexes is passed on to Capabilities.
+    """
+    identity = client.get(IDENTITY_VAR_ID)
+    if cache is not None:
+        capabilities = cache.get(client.ip, identity, templates, indexes)
+        if capabilities is not None:
+            return capabilities, True
+
+    input_ids = [INPUT_PROBE.replace("x", str(input_num - 1)) for input_num in range(1, MAX_INPUTS + 1)]
+    channel_ids = [CHANNEL_PROBE.replace("y", str(channel)) for channel in range(MAX_CHANNELS)]
+    template_ids = {template: template.replace("x", "0").replace("y", "0") for template, _ in templates}
+    results = client.get_many(dict.fromkeys(input_ids + channel_ids + list(template_ids.values())))
+    for _ in range(PROBE_ATTEMPTS - 1):
+        unanswered = [var_id for var_id, value in results.items() if not answered(value)]
+        if not unanswered:
+            break
+        results.update(client.get_many(unanswered))
+
+    missing = [template for template, var_id in template_ids.items() if absent(results[var_id])]
+    capabilities = Capabilities(identity, highest_responding(results, input_ids) or MAX_INPUTS,
+                                highest_responding(results, channel_ids) or MAX_CHANNELS, missing, templates, indexes)
+    if cache is not None and all(answered(value) for value in results.values()):
+        cache.put(client.ip, capabilities)  # Unanswered probes are only guesses, so probe again next time
+    return capabilities, False
@@ -0,0 +1,828 @@
+"""Request engine for talking to NEXX cards.
+
+Every GET/SET for a card goes through a CardClient. The client queues the
+requests and hands them to a fixed set of worker threads, but only lets as
+many requests be in flight as its AdaptiveWindow allows. The window grows
+while the card answers quickly and is halved when responses get slower than
+the latency ceiling or start failing, so bulk applies back off before they
+starve the card's web server.
+
+Requests are either interactive or background. Background requests (such
+as prefetches) only use window capacity that no interactive request wants,
+and their results land in the engine's StateCache.
+
+The HTTP itself is done by a pluggable Transport, either ahttp or the
+built-in asyncio one (see create_transport), and GET responses are turned
+into values by a pluggable Decoder (see create_decoder).
+"""
+import abc
+import asyncio
+import collections
+import json
+import re
+import socket
+import threading
+import time
+import traceback
+import urllib.parse
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+BASE_API = "v.api/apis/EV/"
+
+DEFAULT_LATENCY_CEILING = 0.25  # seconds
+DEFAULT_TIMEOUT = 5.0  # seconds
+DEFAULT_POOL_SIZE = 16  # Keep-alive connections per card
+DEFAULT_IDLE_TIMEOUT = 30.0  # seconds
+MIN_WINDOW = 1
+MAX_WINDOW = 16
+INITIAL_WINDOW = 4
+CACHE_MAX_AGE = 120.0  # seconds a cached value is used instead of asking the card
+
+
+def get_url(ip: str, var_id: str) -> str:
+    return f"http://{ip}/{BASE_API}GET/parameter/{var_id}"
+
+
+def set_url(ip: str, var_id: str, value) -> str:
+    return f"http://{ip}/{BASE_API}SET/parameter/{var_id}/{value}"
+
+
+class RequestError(Exception):
+    """A request to the card failed or returned something unusable."""
+
+
+class Unsupported(RequestError):
+    """The card does not have this parameter, so the request was not sent."""
+
+
+class ErrorResponse(RequestError):
+    """The card answered, with an HTTP error status."""
+
+
+class Transport(abc.ABC):
+    """Blocking HTTP GET used by the CardClient workers.
+
+    fetch() is called from many worker threads at once and must be thread
+    safe. It returns the response body, or raises RequestError.
+    """
+
+    name = ""
+
+    @abc.abstractmethod
+    def fetch(self, url: str, timeout: float = DEFAULT_TIMEOUT) -> bytes:
+        ...
+
+    def stats(self, ip: str) -> Dict[str, float]:
+        """Connection metrics for a card, if the transport keeps any."""
+        return {}
+
+    def stop(self) -> None:
+        pass
+
+
+class AhttpTransport(Transport):
+    """Transport backed by the ahttp module's own request thread."""
+
+    name = "ahttp"
+
+    def __init__(self):
+        import ahttp
+        self.http = ahttp.start()
+
+    def fetch(self, url: str, timeout: float = DEFAULT_TIMEOUT) -> bytes:
+        op = self.http.get(url, block=True)
+        if op.content is None:
+            raise RequestError(f"No response from {url}")
+        return op.content
+
+    def stop(self) -> None:
+        self.http.stop()
+
+
+class ConnectionPool:
+    """Keep-alive connections to one card, owned by the transport's event loop.
+
+    At most `size` connections are open at once; callers beyond that wait in
+    acquire(). Idle connections are handed out most recently used first and
+    are health checked before reuse: one the card has closed (EOF) is dropped
+    instead of failing the request. Connections idle for longer than
+    `idle_timeout` are closed by reap().
+    """
+
+    def __init__(self, host: str, port: int, size: int = DEFAULT_POOL_SIZE,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.opened = 0
+        self.reused = 0
+        self.reaped = 0
+        self.unhealthy = 0
+        self._idle = collections.deque()  # (reader, writer, last used)
+        self._slots = asyncio.Semaphore(size)
+
+    @property
+    def reuse_rate(self) -> float:
+        total = self.opened + self.reused
+        return self.reused / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {"size": self.size, "idle": len(self._idle), "opened": self.opened, "reused": self.reused,
+                "reaped": self.reaped, "unhealthy": self.unhealthy, "reuse_rate": self.reuse_rate}
+
+    async def acquire(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        """Return (reader, writer, reused). Must be paired with release()."""
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                reader, writer, _ = self._idle.pop()
+                if self._healthy(reader, writer):
+                    self.reused += 1
+                    return reader, writer, True
+                self.unhealthy += 1
+                writer.close()
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except BaseException:
+            self._slots.release()
+            raise
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.opened += 1
+        return reader, writer, False
+
+    def release(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, reusable: bool) -> None:
+        if reusable and self._healthy(reader, writer):
+            self._idle.append((reader, writer, time.monotonic()))
+        else:
+            writer.close()
+        self._slots.release()
+
+    def reap(self) -> None:
+        """Close idle connections that timed out or were closed by the card."""
+        now = time.monotonic()
+        keep = collections.deque()
+        for reader, writer, last_used in self._idle:
+            if not self._healthy(reader, writer):
+                self.unhealthy += 1
+                writer.close()
+            elif now - last_used > self.idle_timeout:
+                self.reaped += 1
+                writer.close()
+            else:
+                keep.append((reader, writer, last_used))
+        self._idle = keep
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop()[1].close()
+
+    @staticmethod
+    def _healthy(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        return not reader.at_eof() and not writer.is_closing()
+
+
+class AsyncioTransport(Transport):
+    """Transport running asyncio on its own event-loop thread.
+
+    Requests go out over HTTP/1.1 keep-alive connections from a
+    ConnectionPool per card (host, port), so a bulk apply pays for the TCP
+    handshake once per connection instead of once per parameter.
+    """
+
+    name = "asyncio"
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self._pools: Dict[Tuple[str, int], ConnectionPool] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="asyncio-transport", daemon=True)
+        self._thread.start()
+        self._reaper = asyncio.run_coroutine_threadsafe(self._reap_forever(), self._loop)
+
+    def fetch(self, url: str, timeout: float = DEFAULT_TIMEOUT) -> bytes:
+        future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(self._fetch(url), timeout), self._loop)
+        try:
+            return future.result()
+        except asyncio.TimeoutError:
+            raise RequestError(f"Timed out fetching {url}")
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            raise RequestError(f"{url}: {e}")
+
+    def stats(self, ip: str) -> Dict[str, float]:
+        """Connection pool metrics for a card, keyed like the card's IP."""
+        parts = urllib.parse.urlsplit(f"http://{ip}")
+        pool = self._pools.get((parts.hostname, parts.port or 80))
+        return pool.stats() if pool is not None else {}
+
+    def stop(self) -> None:
+        if self._loop.is_closed():
+            return
+        self._reaper.cancel()
+        asyncio.run_coroutine_threadsafe(self._close_all(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _pool(self, host: str, port: int) -> ConnectionPool:
+        pool = self._pools.get((host, port))
+        if pool is None:
+            pool = ConnectionPool(host, port, self.pool_size, self.idle_timeout)
+            self._pools[(host, port)] = pool
+        return pool
+
+    async def _fetch(self, url: str) -> bytes:
+        parts = urllib.parse.urlsplit(url)
+        pool = self._pool(parts.hostname, parts.port or 80)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        request = (f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                   f"Connection: keep-alive\r\n\r\n").encode()
+        while True:
+            reader, writer, reused = await pool.acquire()
+            keep_alive = False
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, keep_alive, body = await self._read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if reused:
+                    continue  # The card dropped a pooled connection, retry on a fresh one
+                raise
+            finally:
+                pool.release(reader, writer, keep_alive)
+            if status >= 400:
+                raise ErrorResponse(f"HTTP {status} from {url}")
+            return body
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bool, bytes]:
+        status_line = await reader.readuntil(b"\r\n")
+        version, status = status_line.split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        keep_alive = headers.get("connection", "").lower() != "close" and version != b"HTTP/1.0"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                body += chunk[:-2]
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return int(status), keep_alive, body
+
+    async def _reap_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            for pool in list(self._pools.values()):
+                pool.reap()
+
+    async def _close_all(self) -> None:
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
+
+
+TRANSPORTS = {
+    AhttpTransport.name: AhttpTransport,
+    AsyncioTransport.name: AsyncioTransport,
+}
+
+
+def create_transport(name: str, **options) -> Transport:
+    """Create a transport by name ("ahttp" or "asyncio").
+
+    Options are passed to the transport, e.g. pool_size and idle_timeout for
+    the asyncio transport.
+    """
+    try:
+        transport_class = TRANSPORTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transport {name!r}, expected one of {', '.join(TRANSPORTS)}")
+    return transport_class(**options)
+
+
+class Decoder(abc.ABC):
+    """Turns the body of a GET response, {"value": ...}, into the value.
+
+    decode() is called from many worker threads at once. It raises
+    ValueError for a body that is not JSON, or AttributeError for JSON that
+    is not an object, like json.loads(content).get("value") does.
+    """
+
+    name = ""
+
+    @abc.abstractmethod
+    def decode(self, content: bytes):
+        ...
+
+
+class JsonDecoder(Decoder):
+    """The standard library's json module."""
+
+    name = "json"
+
+    def decode(self, content: bytes):
+        return json.loads(content).get("value", None)
+
+
+class OrjsonDecoder(Decoder):
+    """orjson, a compiled JSON parser, if it is installed."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._loads = orjson.loads
+
+    def decode(self, content: bytes):
+        return self._loads(content).get("value", None)  # orjson.JSONDecodeError is a ValueError
+
+
+class FastDecoder(Decoder):
+    """Matches a plain string or integer straight out of {"value": ...}.
+
+    A snapshot is tens of thousands of tiny bodies that almost all look
+    like {"value": "12"}; one regex match is several times faster than a
+    JSON parse. Anything else (escapes, floats, nesting, other keys) goes
+    to the fallback decoder.
+    """
+
+    name = "fast"
+    _match = re.compile(rb'\{"value": ?(?:"([^"\\]*)"|(0|[1-9][0-9]*))\}').fullmatch
+
+    def __init__(self, fallback: Optional[Decoder] = None):
+        self.fallback = fallback if fallback is not None else JsonDecoder()
+
+    def decode(self, content: bytes):
+        if isinstance(content, str):
+            content = content.encode()
+        match = self._match(content)
+        if match is None:
+            return self.fallback.decode(content)
+        text, digits = match.groups()
+        return text.decode() if digits is None else int(digits)
+
+
+DECODERS = {
+    JsonDecoder.name: JsonDecoder,
+    OrjsonDecoder.name: OrjsonDecoder,
+    FastDecoder.name: FastDecoder,
+}
+
+
+def create_decoder(name: Optional[str] = None) -> Decoder:
+    """Create a decoder by name ("fast", "json" or "orjson").
+
+    Without a name, orjson where it is installed (it parses faster still
+    than the fast path matches), else fast. Raises ImportError for orjson
+    if it is not installed.
+    """
+    if name is None:
+        try:
+            return OrjsonDecoder()
+        except ImportError:
+            return FastDecoder()
+    try:
+        decoder_class = DECODERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown decoder {name!r}, expected one of {', '.join(DECODERS)}")
+    return decoder_class()
+
+
+class AdaptiveWindow:
+    """AIMD controller for the number of requests allowed in flight.
+
+    Each completion under the latency ceiling grows the window by 1/window,
+    i.e. by one request per round trip. A completion over the ceiling, or an
+    error, halves it - at most once per smoothed round trip, so a whole window
+    of slow replies only counts as a single congestion signal.
+    """
+
+    def __init__(self, latency_ceiling: float = DEFAULT_LATENCY_CEILING,
+                 initial: int = INITIAL_WINDOW, minimum: int = MIN_WINDOW,
+                 maximum: int = MAX_WINDOW):
+        self.latency_ceiling = latency_ceiling
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency = 0.0  # Smoothed latency in seconds
+        self._window = float(max(minimum, min(initial, maximum)))
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return int(self._window)
+
+    def on_success(self, latency: float) -> None:
+        with self._lock:
+            if self.latency:
+                self.latency += (latency - self.latency) / 8
+            else:
+                self.latency = latency
+            if latency > self.latency_ceiling:
+                self._decrease()
+            else:
+                self._window = min(self.maximum, self._window + 1 / self._window)
+
+    def on_error(self) -> None:
+        with self._lock:
+            self._decrease()
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < max(self.latency, self.latency_ceiling):
+            return
+        self._last_decrease = now
+        self._window = max(self.minimum, self._window / 2)
+
+
+class Request:
+    """A single queued GET (value is None) or SET.
+
+    merged holds the futures of later SETs of the same var id that were
+    coalesced into this one; they get its result.
+    """
+
+    __slots__ = ("var_id", "value", "future", "merged")
+
+    def __init__(self, var_id: str, value=None):
+        self.var_id = var_id
+        self.value = value
+        self.future = Future()
+        self.merged: List[Future] = []
+
+    @property
+    def futures(self) -> List[Future]:
+        return [self.future, *self.merged]
+
+    @property
+    def is_set(self) -> bool:
+        return self.value is not None
+
+
+class StateCache:
+    """Last value seen for every (card, var id), fed as a RequestEngine listener."""
+
+    def __init__(self, max_age: float = CACHE_MAX_AGE):
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._values: Dict[Tuple[str, str], Tuple[object, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, ip: str, var_id: str, value) -> None:
+        with self._lock:
+            self._values[(ip, var_id)] = (value, time.monotonic())
+
+    def fresh(self, ip: str, var_id: str, max_age: Optional[float] = None) -> bool:
+        entry = self._values.get((ip, var_id))
+        max_age = self.max_age if max_age is None else max_age
+        return entry is not None and time.monotonic() - entry[1] <= max_age
+
+    def get(self, ip: str, var_id: str, max_age: Optional[float] = None):
+        """Cached value of a parameter. Raises KeyError if it is missing or older than max_age."""
+        with self._lock:
+            if not self.fresh(ip, var_id, max_age):
+                self.misses += 1
+                raise KeyError(var_id)
+            self.hits += 1
+            return self._values[(ip, var_id)][0]
+
+    def clear(self, ip: Optional[str] = None) -> None:
+        with self._lock:
+            if ip is None:
+                self._values.clear()
+            else:
+                for key in [key for key in self._values if key[0] == ip]:
+                    del self._values[key]
+
+
+class CardClient:
+    """Queue and dispatch requests for one card within an adaptive window."""
+
+    def __init__(self, ip: str, transport: Transport, latency_ceiling: float = DEFAULT_LATENCY_CEILING,
+                 max_window: int = MAX_WINDOW, listeners: Optional[List[Callable[[str, str, object], None]]] = None,
+                 cache: Optional[StateCache] = None, decoder: Optional[Decoder] = None):
+        self.ip = ip
+        self.transport = transport
+        self.decoder = decoder if decoder is not None else create_decoder()
+        # Called as listener(ip, var_id, value) for every successful GET and SET
+        self.listeners = listeners if listeners is not None else []
+        self.cache = cache
+        # Set after a capability probe; anything with supports(var_id)
+        self.capabilities = None
+        self.window = AdaptiveWindow(latency_ceiling, maximum=max_window)
+        self.sent = 0
+        self.errors = 0
+        self.skipped = 0
+        self.coalesced = 0  # SETs merged into a queued SET of the same var id, so never sent
+        self._pending = collections.deque()
+        self._background = collections.deque()
+        # Last queued interactive SET per var id with no GET of that var id queued after it
+        self._queued_sets: Dict[str, Request] = {}
+        self._in_flight = 0
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._workers = []
+        for _ in range(max_window):
+            worker = threading.Thread(target=self._worker, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def supports(self, var_id: str) -> bool:
+        return self.capabilities is None or self.capabilities.supports(var_id)
+
+    def metrics(self) -> Dict[str, object]:
+        """Request counters and window state, with the transport's connection metrics for the card."""
+        return {"window": self.window.size, "in_flight": self._in_flight, "queued": len(self._pending),
+                "latency_ms": self.window.latency * 1000, "sent": self.sent, "errors": self.errors,
+                "skipped": self.skipped, "coalesced": self.coalesced, "connections": self.transport.stats(self.ip)}
+
+    def submit(self, var_id: str, value=None, background: bool = False) -> Future:
+        """Queue a GET (no value) or SET and return a future for its result.
+
+        Background requests are only dispatched while no interactive request
+        is waiting, and never take the last free slot of the window.
+        Requests for parameters the card lacks fail with Unsupported
+        without being sent.
+
+        An interactive SET of a var id that already has a SET waiting in the
+        queue replaces that SET's value instead of being queued, and both
+        futures get the one result (last writer wins). A GET queued in
+        between is never overtaken, because it ends coalescing for its var id.
+        """
+        request = Request(var_id, value)
+        if not self.supports(var_id):
+            self.skipped += 1
+            request.future.set_exception(Unsupported(f"{var_id} is not supported by this card"))
+            return request.future
+        with self._cond:
+            if not request.is_set:
+                self._queued_sets.pop(var_id, None)
+            elif not background:
+                queued = self._queued_sets.get(var_id)
+                if queued is not None:
+                    queued.value = value
+                    queued.merged.append(request.future)
+                    self.coalesced += 1
+                    return request.future
+                self._queued_sets[var_id] = request
+            (self._background if background else self._pending).append(request)
+            self._cond.notify()
+        return request.future
+
+    def get(self, var_id: str, timeout: Optional[float] = None):
+        """Blocking GET of a single parameter. Returns the raw "value" field."""
+        return self.submit(var_id).result(timeout)
+
+    def submit_cached(self, var_id: str) -> Future:
+        """Like submit() for a GET, but already resolved if the value was seen recently."""
+        if self.cache is not None:
+            try:
+                value = self.cache.get(self.ip, var_id)
+            except KeyError:
+                pass
+            else:
+                future = Future()
+                future.set_result(value)
+                return future
+        return self.submit(var_id)
+
+    def get_cached(self, var_id: str, timeout: Optional[float] = None):
+        """Like get(), but answered from the cache if the value was seen recently."""
+        return self.submit_cached(var_id).result(timeout)
+
+    def prefetch(self, var_ids: Iterable[str]) -> Dict[str, Future]:
+        """Queue background GETs for the var ids that are not already cached."""
+        return {var_id: self.submit(var_id, background=True) for var_id in var_ids
+                if self.supports(var_id) and (self.cache is None or not self.cache.fresh(self.ip, var_id))}
+
+    def cancel_background(self) -> int:
+        """Drop every queued background request. Returns how many were dropped."""
+        with self._cond:
+            cancelled = sum(request.future.cancel() for request in self._background)
+            self._background.clear()
+        return cancelled
+
+    def get_many(self, var_ids: Iterable[str], cached: bool = False) -> Dict[str, object]:
+        """GET several parameters concurrently, from the cache where recent enough if cached.
+
+        Returns a dict of var id to value, or to the exception raised for it.
+        """
+        submit = self.submit_cached if cached else self.submit
+        futures = {var_id: submit(var_id) for var_id in var_ids}
+        results = {}
+        for var_id, future in futures.items():
+            try:
+                results[var_id] = future.result()
+            except Exception as e:
+                results[var_id] = e
+        return results
+
+    def set_many(self, writes: Iterable[Tuple[str, object]],
+                 progress: Optional[Callable[[int, int], None]] = None) -> List[Tuple[str, Exception]]:
+        """SET several parameters concurrently and wait for all of them.
+
+        Writes to parameters the card lacks are skipped (and counted in
+        self.skipped). progress(done, total) is called from worker threads
+        as writes finish. Returns the (var id, exception) pairs of the
+        writes that failed.
+        """
+        writes = list(writes)
+        supported = [(var_id, value) for var_id, value in writes if self.supports(var_id)]
+        self.skipped += len(writes) - len(supported)
+        futures = [(var_id, self.submit(var_id, value)) for var_id, value in supported]
+        total = len(futures)
+        done = [0]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                done[0] += 1
+                count = done[0]
+            if progress is not None:
+                progress(count, total)
+
+        for _, future in futures:
+            future.add_done_callback(on_done)
+        failed = []
+        for var_id, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                failed.append((var_id, e))
+        return failed
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            for queue in (self._pending, self._background):
+                while queue:
+                    for future in queue.popleft().futures:
+                        future.cancel()
+            self._queued_sets.clear()
+            self._cond.notify_all()
+
+    def _next_request(self) -> Optional[Request]:
+        if self._pending:
+            if self._in_flight < self.window.size:
+                request = self._pending.popleft()
+                if self._queued_sets.get(request.var_id) is request:
+                    del self._queued_sets[request.var_id]
+                return request
+        elif self._background and self._in_flight < max(1, self.window.size - 1):
+            return self._background.popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                request = None
+                while not self._stopped:
+                    request = self._next_request()
+                    if request is not None:
+                        break
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                self._in_flight += 1
+            try:
+                self._execute(request)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _execute(self, request: Request) -> None:
+        futures = [future for future in request.futures if future.set_running_or_notify_cancel()]
+        if not futures:
+            return
+        if request.is_set:
+            url = set_url(self.ip, request.var_id, request.value)
+        else:
+            url = get_url(self.ip, request.var_id)
+        start = time.monotonic()
+        try:
+            content = self.transport.fetch(url)
+            result = None
+            if not request.is_set:
+                result = self.decoder.decode(content)
+        except Exception as e:
+            self.errors += 1
+            self.window.on_error()
+            if not isinstance(e, RequestError):
+                e = RequestError(f"{request.var_id}: {e}")
+            for future in futures:
+                future.set_exception(e)
+            return
+        self.sent += 1
+        self.window.on_success(time.monotonic() - start)
+        for future in futures:
+            future.set_result(result)
+        for listener in self.listeners:
+            try:
+                listener(self.ip, request.var_id, request.value if request.is_set else result)
+            except Exception:
+                traceback.print_exc()
+
+
+class Speculation:
+    """Speculative prefetches for one view, with hit accounting.
+
+    guess() queues background GETs for what the user will probably load next.
+    claim() is called with what they actually load; it counts the guesses
+    that were used and cancels the ones still queued for anything else.
+    """
+
+    def __init__(self):
+        self.issued = 0
+        self.hits = 0
+        self.cancelled = 0
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        """Fraction of the speculative reads that were later loaded."""
+        return self.hits / self.issued if self.issued else None
+
+    def guess(self, client: CardClient, var_ids: Iterable[str]) -> None:
+        futures = client.prefetch(var_ids)
+        with self._lock:
+            self._futures.update(futures)
+            self.issued += len(futures)
+
+    def claim(self, var_ids: Iterable[str]) -> int:
+        """Settle the outstanding guesses against a load. Returns how many were used."""
+        wanted = set(var_ids)
+        hits = 0
+        with self._lock:
+            for var_id, future in self._futures.items():
+                if var_id not in wanted:
+                    self.cancelled += future.cancel()
+                elif future.done() and not future.cancelled() and future.exception() is None:
+                    hits += 1
+            self._futures = {}
+            self.hits += hits
+        return hits
+
+
+class RequestEngine:
+    """Hands out one CardClient per card IP, all sharing one transport."""
+
+    def __init__(self, transport: Transport, latency_ceiling: float = DEFAULT_LATENCY_CEILING,
+                 decoder: Optional[Decoder] = None):
+        self.transport = transport
+        self.latency_ceiling = latency_ceiling
+        self.decoder = decoder if decoder is not None else create_decoder()
+        self.cache = StateCache()
+        self.listeners: List[Callable[[str, str, object], None]] = [self.cache.record]
+        self._clients: Dict[str, CardClient] = {}
+        self._lock = threading.Lock()
+
+    def client(self, ip: str) -> CardClient:
+        with self._lock:
+            client = self._clients.get(ip)
+            if client is None:
+                client = CardClient(ip, self.transport, self.latency_ceiling, listeners=self.listeners,
+                                    cache=self.cache, decoder=self.decoder)
+                self._clients[ip] = client
+            return client
+
+    def clients(self) -> List[CardClient]:
+        """The clients of every card talked to so far."""
+        with self._lock:
+            return list(self._clients.values())
+
+    def add_listener(self, listener: Callable[[str, str, object], None]) -> None:
+        """Call listener(ip, var_id, value) for every successful GET and SET on any card."""
+        self.listeners.append(listener)
+
+    def set_latency_ceiling(self, latency_ceiling: float) -> None:
+        self.latency_ceiling = latency_ceiling
+        with self._lock:
+            for client in self._clients.values():
+                client.window.latency_ceiling = latency_ceiling
+
+    def stop(self) -> None:
+        with self._lock:
+            for client in self._clients.values():
+                client.stop()
+            self._clients.clear()
+        self.transport.stop()
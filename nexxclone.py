@@ -0,0 +1,167 @@
+"""Copy parameter values between inputs or cards without going through the widgets.
+
+clone_input() reads an input's parameters and every target input's in one
+concurrent burst, then writes only the target values that differ.
+clone_card() does the same from one card to several others, writing to all
+of them in parallel and reading the written values back to verify them.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from nexxclient import CardClient, RequestEngine, Unsupported
+from nexxstate import MAX_INPUTS, expand, expand_templates
+
+
+class CloneReport:
+    """What a clone wrote, left alone and could not do."""
+
+    def __init__(self, writes: List[Tuple[str, object]], unchanged: int, unreadable: List[str]):
+        self.writes = writes
+        self.unchanged = unchanged  # Target values that already matched
+        self.unreadable = unreadable  # Source var ids that could not be read, so were not copied
+        self.unsupported = 0  # Target parameters the destination card does not have
+        self.failed: Optional[List[Tuple[str, Exception]]] = None  # None until written, or if cancelled
+        self.mismatched: Optional[List[str]] = None  # Written var ids that read back differently, once verified
+        self.elapsed = 0.0
+
+    def summary(self) -> str:
+        failed = len(self.failed or [])
+        text = (f"{len(self.writes) - failed} values written, {self.unchanged} already matching, "
+                f"{failed} failed in {self.elapsed:.1f} s")
+        if self.unreadable:
+            text += f", {len(self.unreadable)} source values could not be read"
+        if self.unsupported:
+            text += f", {self.unsupported} not supported by the card"
+        if self.mismatched is not None:
+            text += f", {len(self.mismatched)} differ on read back" if self.mismatched else ", all verified"
+        return text
+
+
+def input_pairs(templates: Sequence[Tuple[str, int]], source: int, targets: Sequence[int]) -> List[Tuple[str, str]]:
+    """(source var id, target var id) for every per-input parameter and target input.
+
+    Card wide templates (no "x") are left out since there is nothing to copy.
+    """
+    pairs = []
+    for template, subs in templates:
+        if "x" not in template:
+            continue
+        subs_ids = [template.replace("y", str(sub)) for sub in range(subs)] if "y" in template else [template]
+        for sub_template in subs_ids:
+            source_id = expand(sub_template, source)
+            pairs.extend((source_id, expand(sub_template, target)) for target in targets if target != source)
+    return pairs
+
+
+def plan_copy(pairs: Sequence[Tuple[str, str]], values: Dict[str, object]) -> CloneReport:
+    """Writes copying source values over target values that differ (or could not be read)."""
+    return plan_writes(pairs, values, values)
+
+
+def plan_writes(pairs: Sequence[Tuple[str, str]], source_values: Dict[str, object],
+                target_values: Dict[str, object]) -> CloneReport:
+    """Like plan_copy(), with the source and target values read from different cards."""
+    writes = []
+    unchanged = 0
+    unsupported = 0
+    unreadable = set()
+    for source_id, target_id in pairs:
+        value = source_values.get(source_id)
+        if isinstance(value, Exception) or value is None:
+            unreadable.add(source_id)
+            continue
+        current = target_values.get(target_id)
+        if isinstance(current, Unsupported):
+            unsupported += 1
+            continue
+        if not isinstance(current, Exception) and current is not None and str(current) == str(value):
+            unchanged += 1
+            continue
+        writes.append((target_id, value))
+    report = CloneReport(writes, unchanged, sorted(unreadable))
+    report.unsupported = unsupported
+    return report
+
+
+def read_cards(engine: RequestEngine, var_ids: Dict[str, List[str]]) -> Dict[str, Dict[str, object]]:
+    """GET var_ids[ip] from every card at once, all cards concurrently.
+
+    Returns ip: var id: value, or the exception raised for it.
+    """
+    futures = {ip: {var_id: engine.client(ip).submit(var_id) for var_id in ids} for ip, ids in var_ids.items()}
+    results = {}
+    for ip, card_futures in futures.items():
+        results[ip] = {}
+        for var_id, future in card_futures.items():
+            try:
+                results[ip][var_id] = future.result()
+            except Exception as e:
+                results[ip][var_id] = e
+    return results
+
+
+def clone_input(client: CardClient, templates: Sequence[Tuple[str, int]], source: int, targets: Sequence[int],
+                write: Optional[Callable[[List[Tuple[str, object]]], Optional[List]]] = None) -> CloneReport:
+    """Copy one input's parameters to other inputs of the same card.
+
+    write(writes) does the writing and returns the failed writes (or None
+    to cancel); it defaults to client.set_many.
+    """
+    start = time.perf_counter()
+    templates = [(template, subs) for template, subs in templates if "x" in template]
+    pairs = input_pairs(templates, source, targets)
+    values = client.get_many(dict.fromkeys(expand_templates(templates, [source, *targets])))
+    report = plan_copy(pairs, values)
+    report.failed = (write or client.set_many)(report.writes) if report.writes else []
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def clone_card(engine: RequestEngine, templates: Sequence[Tuple[str, int]], source_ip: str,
+               destinations: Sequence[str], inputs: int = MAX_INPUTS,
+               write: Optional[Callable[[str, List[Tuple[str, object]]], Optional[List]]] = None,
+               verify: bool = True) -> Dict[str, CloneReport]:
+    """Copy every parameter of templates from one card to other cards.
+
+    The source and all destinations are read in one concurrent burst, each
+    destination gets only the writes that differ, and all destinations are
+    written in parallel. With verify, the written values are read back from
+    every destination (again all at once) and mismatches are reported.
+    write(ip, writes) does the writing for one destination and returns the
+    failed writes (or None to cancel); it defaults to the card's set_many.
+    Returns a report per destination.
+    """
+    start = time.perf_counter()
+    destinations = [ip for ip in dict.fromkeys(destinations) if ip != source_ip]
+    var_ids = expand_templates(templates, range(1, inputs + 1))
+    values = read_cards(engine, {ip: var_ids for ip in [source_ip, *destinations]})
+    pairs = [(var_id, var_id) for var_id in var_ids]
+    reports = {ip: plan_writes(pairs, values[source_ip], values[ip]) for ip in destinations}
+
+    def write_card(ip):
+        writes = reports[ip].writes
+        if not writes:
+            return []
+        return write(ip, writes) if write is not None else engine.client(ip).set_many(writes)
+
+    if destinations:
+        with ThreadPoolExecutor(max_workers=len(destinations)) as executor:
+            for ip, failed in zip(destinations, executor.map(write_card, destinations)):
+                reports[ip].failed = failed
+
+    if verify:
+        written = {}
+        for ip, report in reports.items():
+            if report.failed is not None:
+                failed_ids = {var_id for var_id, _ in report.failed}
+                written[ip] = [var_id for var_id, _ in report.writes if var_id not in failed_ids]
+        read_back = read_cards(engine, written)
+        for ip, ids in written.items():
+            expected = dict(reports[ip].writes)
+            reports[ip].mismatched = [var_id for var_id in ids if str(read_back[ip][var_id]) != str(expected[var_id])]
+
+    elapsed = time.perf_counter() - start
+    for report in reports.values():
+        report.elapsed = elapsed
+    return reports
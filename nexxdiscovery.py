@@ -0,0 +1,133 @@
+"""Discovery scan for NEXX cards on a subnet.
+
+Every address of a CIDR range gets the same GET of parameter 1 that
+connecting does, concurrently on one asyncio loop. Each probe has a strict
+timeout and at most `concurrency` are open at once, so a /24 takes about
+256 / concurrency * timeout seconds even when most addresses are dead.
+Ranges are IPv4 and at most MAX_ADDRESSES (a /16) large, so a typo such as
+/8 is refused instead of queuing millions of probes.
+
+    python nexxdiscovery.py 10.20.0.0/24 --timeout 0.5
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from nexxcapabilities import IDENTITY_VAR_ID
+from nexxclient import BASE_API, AsyncioTransport
+
+DEFAULT_PROBE_TIMEOUT = 0.5  # seconds
+DEFAULT_CONCURRENCY = 128
+MAX_ADDRESSES = 65536  # A /16
+
+
+def network(cidr: str) -> ipaddress.IPv4Network:
+    """The IPv4 range of a CIDR (a single address is allowed).
+
+    Raises ValueError if it is not one or has more than MAX_ADDRESSES addresses.
+    """
+    net = ipaddress.ip_network(cidr, strict=False)
+    if net.version != 4:
+        raise ValueError(f"{cidr} is not an IPv4 range")
+    if net.num_addresses > MAX_ADDRESSES:
+        raise ValueError(f"{cidr} has {net.num_addresses} addresses, more than the {MAX_ADDRESSES} of a /16")
+    return net
+
+
+def host_count(cidr: str) -> int:
+    """How many addresses hosts() gives, without listing them."""
+    net = network(cidr)
+    return net.num_addresses - 2 if net.prefixlen < 31 else net.num_addresses  # Less network and broadcast
+
+
+def hosts(cidr: str) -> Iterator[str]:
+    """Addresses to probe in a CIDR range, generated as they are needed."""
+    return (str(host) for host in network(cidr).hosts())
+
+
+async def probe_card(ip: str, port: int = 80, timeout: float = DEFAULT_PROBE_TIMEOUT) -> Optional[str]:
+    """Identity value of the card at ip, or None if nothing answers like a card in time."""
+    address = ip if port == 80 else f"{ip}:{port}"
+    request = (f"GET /{BASE_API}GET/parameter/{IDENTITY_VAR_ID} HTTP/1.1\r\nHost: {address}\r\n"
+               f"Connection: close\r\n\r\n").encode()
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(ip, port)
+        try:
+            writer.write(request)
+            await writer.drain()
+            return await AsyncioTransport._read_response(reader)
+        finally:
+            writer.close()
+
+    try:
+        status, _, body = await asyncio.wait_for(exchange(), timeout)
+        if status >= 400:
+            return None
+        value = json.loads(body).get("value")
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, AttributeError):
+        return None
+    return None if value is None else str(value)
+
+
+async def scan_async(addresses: Iterable[str], port: int = 80, timeout: float = DEFAULT_PROBE_TIMEOUT,
+                     concurrency: int = DEFAULT_CONCURRENCY,
+                     progress: Optional[Callable[[int, int], None]] = None,
+                     total: Optional[int] = None) -> List[Tuple[str, str]]:
+    """Probe the addresses with `concurrency` probers pulling from them, so they are read lazily.
+
+    total is the address count progress reports, if addresses has no len().
+    """
+    if total is None:
+        total = len(addresses)
+    pending = enumerate(addresses)
+    found = []
+    done = 0
+
+    async def prober():
+        nonlocal done
+        for index, ip in pending:
+            identity = await probe_card(ip, port, timeout)
+            if identity is not None:
+                found.append((index, ip, identity))
+            done += 1
+            if progress is not None:
+                progress(done, total)
+
+    await asyncio.gather(*(prober() for _ in range(max(1, concurrency))))
+    return [(ip, identity) for _, ip, identity in sorted(found)]
+
+
+def scan(cidr: str, port: int = 80, timeout: float = DEFAULT_PROBE_TIMEOUT, concurrency: int = DEFAULT_CONCURRENCY,
+         progress: Optional[Callable[[int, int], None]] = None) -> List[Tuple[str, str]]:
+    """(ip, identity) of every card found in the range, in address order.
+
+    progress(done, total) is called from the scanning thread as probes finish.
+    """
+    return asyncio.run(scan_async(hosts(cidr), port, timeout, concurrency, progress, host_count(cidr)))
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Find NEXX cards on a subnet")
+    parser.add_argument("cidr", help="Range to scan, e.g. 10.20.0.0/24")
+    parser.add_argument("--port", type=int, default=80)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_PROBE_TIMEOUT, help="Seconds per probe")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Probes open at once")
+    args = parser.parse_args(argv)
+    try:
+        count = host_count(args.cidr)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    found = scan(args.cidr, args.port, args.timeout, args.concurrency)
+    for ip, identity in found:
+        print(f"{ip:<15} {identity}")
+    print(f"{len(found)} cards in {count} addresses, {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
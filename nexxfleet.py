@@ -0,0 +1,229 @@
+"""Fleet reads and writes sharded across processes.
+
+One process runs out of CPU long before hundreds of cards run out of
+answers: building URLs, parsing responses and the window bookkeeping all
+hold the GIL. FleetExecutor splits the cards into one shard per process of
+a process pool. Every worker runs its own RequestEngine, with a CardClient
+per card as usual, and works its cards concurrently; the parent only
+collects each card's results and request metrics. Workers are spawned, not
+forked, so the pool is safe to start from the GUI's threads.
+
+The executor is deliberately separate from the Scheduler (nexxscheduler)
+and the GUI. Those write in chunks between window checks and save their
+progress so that jobs can pause and resume, while a fleet operation runs
+every card straight through in one go. It is meant for one-off snapshots
+and applies across hundreds of cards, from this command line or a script.
+
+    python nexxfleet.py snapshot --cards 10.20.0.11,10.20.0.12 --out snapshots --processes 8
+    python nexxfleet.py apply --cards 10.20.0.11,10.20.0.12 --plan plan.json
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import nexxschema
+from nexxclient import TRANSPORTS, RequestEngine, create_transport
+from nexxlock import DEFAULT_DIRECTORY as DEFAULT_LOCK_DIRECTORY, CardLocked, LockManager
+from nexxscheduler import load_plan
+from nexxstate import MAX_INPUTS, Snapshot, expand_templates
+
+DEFAULT_PROCESSES = os.cpu_count() or 1
+DEFAULT_MAX_CARDS = 64  # Cards worked at once by one process
+
+SNAPSHOT = "snapshot"
+APPLY = "apply"
+
+
+class CardResult:
+    """What one card returned, as sent back from a worker process."""
+
+    def __init__(self, ip: str):
+        self.ip = ip
+        self.values: Dict[str, object] = {}  # Values read, unless saved to a snapshot file
+        self.failed: List[Tuple[str, str]] = []  # (var id, error) of requests that failed
+        self.error = ""  # Set if the card could not be worked at all
+        self.snapshot = ""  # Path of the saved snapshot
+        self.metrics: Dict[str, object] = {}
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.error and not self.failed
+
+
+class FleetResult:
+    """The results of every card of one fleet operation."""
+
+    def __init__(self, operation: str, processes: int):
+        self.operation = operation
+        self.processes = processes
+        self.cards: Dict[str, CardResult] = {}
+        self.elapsed = 0.0
+
+    def metrics(self) -> Dict[str, object]:
+        """Request counters summed over the cards, with fleet throughput."""
+        totals = {"cards": len(self.cards), "processes": self.processes, "sent": 0, "errors": 0, "skipped": 0,
+                  "coalesced": 0}
+        latencies = []
+        for card in self.cards.values():
+            for key in ("sent", "errors", "skipped", "coalesced"):
+                totals[key] += card.metrics.get(key, 0)
+            if card.metrics:
+                latencies.append(card.metrics["latency_ms"])
+        totals["latency_ms"] = sum(latencies) / len(latencies) if latencies else 0.0
+        totals["requests_per_second"] = totals["sent"] / self.elapsed if self.elapsed else 0.0
+        return totals
+
+    def summary(self) -> str:
+        metrics = self.metrics()
+        failed = sum(not card.ok for card in self.cards.values())
+        return (f"{self.operation} of {metrics['cards']} cards in {self.elapsed:.1f} s on {self.processes} processes: "
+                f"{metrics['sent']} requests ({metrics['requests_per_second']:.0f}/s), {metrics['errors']} errors, "
+                f"{failed} cards with failures")
+
+
+def _work_card(engine: RequestEngine, ip: str, operation: str, var_ids: Sequence[str],
+               writes: Sequence[Tuple[str, object]], directory: Optional[str]) -> CardResult:
+    result = CardResult(ip)
+    client = engine.client(ip)
+    start = time.monotonic()
+    try:
+        if operation == SNAPSHOT:
+            values = client.get_many(var_ids)
+            result.failed = [(var_id, str(value)) for var_id, value in values.items() if isinstance(value, Exception)]
+            if directory is not None:
+                result.snapshot = os.path.join(directory, ip.replace(":", "_") + ".nxs")
+                Snapshot.from_results(values, {"ip": ip, "taken": time.time()}).save(result.snapshot)
+            else:
+                result.values = {var_id: value for var_id, value in values.items()
+                                 if not isinstance(value, Exception)}
+        else:
+            result.failed = [(var_id, str(e)) for var_id, e in client.set_many(writes)]
+    except Exception as e:
+        result.error = str(e)
+    result.elapsed = time.monotonic() - start
+    result.metrics = client.metrics()
+    return result
+
+
+def _run_shard(transport: str, cards: Sequence[str], operation: str, var_ids: Sequence[str],
+               writes: Sequence[Tuple[str, object]], directory: Optional[str]) -> List[CardResult]:
+    """Work one shard of cards in a worker process, on an engine of its own."""
+    engine = RequestEngine(create_transport(transport))
+    try:
+        with ThreadPoolExecutor(max_workers=min(len(cards), DEFAULT_MAX_CARDS)) as pool:
+            return list(pool.map(lambda ip: _work_card(engine, ip, operation, var_ids, writes, directory), cards))
+    finally:
+        engine.stop()
+
+
+class FleetExecutor:
+    """A pool of worker processes that snapshots or applies to many cards at once."""
+
+    def __init__(self, processes: int = DEFAULT_PROCESSES, transport: str = "asyncio",
+                 locks: Optional[LockManager] = None):
+        self.processes = max(1, processes)
+        self.transport = transport
+        self.locks = locks
+        self._pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def shards(self, cards: Sequence[str]) -> List[List[str]]:
+        """The cards split round robin into at most one shard per process."""
+        cards = list(dict.fromkeys(cards))
+        return [shard for shard in (cards[i::self.processes] for i in range(self.processes)) if shard]
+
+    def snapshot(self, cards: Sequence[str], var_ids: Sequence[str], directory: Optional[str] = None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> FleetResult:
+        """Read var_ids from every card.
+
+        With a directory each card's values are saved there as <ip>.nxs by
+        the worker, instead of being sent back.
+        """
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        return self._run(SNAPSHOT, cards, var_ids, (), directory, progress)
+
+    def apply(self, cards: Sequence[str], writes: Sequence[Tuple[str, object]],
+              progress: Optional[Callable[[int, int], None]] = None) -> FleetResult:
+        """Write the same values to every card, holding the cards' locks if there are locks.
+
+        Raises CardLocked (writing nothing) if another instance holds a card.
+        """
+        if self.locks is None:
+            return self._run(APPLY, cards, (), writes, None, progress)
+        with self.locks.hold(cards, "fleet apply"):
+            return self._run(APPLY, cards, (), writes, None, progress)
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "FleetExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run(self, operation: str, cards: Sequence[str], var_ids: Sequence[str], writes: Sequence[Tuple[str, object]],
+             directory: Optional[str], progress: Optional[Callable[[int, int], None]]) -> FleetResult:
+        """progress(done, total) counts cards, as each shard comes back."""
+        result = FleetResult(operation, self.processes)
+        shards = self.shards(cards)
+        total = sum(len(shard) for shard in shards)
+        start = time.monotonic()
+        futures = [self._pool.submit(_run_shard, self.transport, shard, operation, list(var_ids), list(writes),
+                                     directory) for shard in shards]
+        for future in as_completed(futures):
+            for card in future.result():
+                result.cards[card.ip] = card
+            if progress is not None:
+                progress(len(result.cards), total)
+        result.elapsed = time.monotonic() - start
+        return result
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Snapshot or apply to many NEXX cards across processes")
+    parser.add_argument("operation", choices=(SNAPSHOT, APPLY))
+    parser.add_argument("--cards", required=True, help="Comma separated card IPs")
+    parser.add_argument("--plan", help="Snapshot (.nxs) or JSON object of var id to value to apply")
+    parser.add_argument("--out", default=".", help="Directory the snapshots are saved in")
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES)
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), default="asyncio")
+    parser.add_argument("--locks", default=DEFAULT_LOCK_DIRECTORY, help="Card lock directory shared by all instances")
+    args = parser.parse_args(argv)
+
+    cards = [ip.strip() for ip in args.cards.split(",") if ip.strip()]
+    schema = nexxschema.load()
+    if args.operation == APPLY:
+        if not args.plan:
+            parser.error("apply needs --plan")
+        writes = load_plan(args.plan)
+        violations = schema.range_table().check(writes)
+        if violations:
+            var_id, value, low, high = violations[0]
+            parser.error(f"{len(violations)} values are out of range, e.g. {var_id}: {value} is not in {low} to {high}")
+    locks = LockManager(args.locks)
+    try:
+        with FleetExecutor(args.processes, args.transport, locks) as fleet:
+            if args.operation == SNAPSHOT:
+                var_ids = expand_templates(schema.templates(), range(1, MAX_INPUTS + 1))
+                result = fleet.snapshot(cards, var_ids, args.out)
+            else:
+                result = fleet.apply(cards, writes)
+    except CardLocked as e:
+        holders = [holder for holder in map(locks.check, cards) if holder is not None] or [e.holder]
+        parser.exit(1, "Nothing was applied, cards are locked by other instances:\n" +
+                    "".join(f"{holder.ip}: {holder.describe()}\n" for holder in holders))
+    finally:
+        locks.close()
+    for ip, card in sorted(result.cards.items()):
+        if not card.ok:
+            print(f"{ip}: {card.error or f'{len(card.failed)} requests failed, e.g. {card.failed[0][0]}: {card.failed[0][1]}'}")
+    print(result.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Local SQLite inventory of parameter values seen on the fleet.
+
+Every value read from (or successfully written to) a card is recorded with
+the time it was seen, keyed by (card, var id template, input, sub index).
+Fleet audits such as "which cards have Loss of Video traps disabled on any
+input" then run against the local index instead of polling every card.
+
+    python nexxinventory.py query 400.x.0@i --value 0
+    python nexxinventory.py cards
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from nexxstate import parse_var_ids
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".nexx_inventory.sqlite")
+FLUSH_INTERVAL = 1.0  # seconds
+FLUSH_SIZE = 1000  # Recorded values buffered before a flush is forced
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS params (
+    card TEXT NOT NULL,
+    template TEXT NOT NULL,
+    input INTEGER NOT NULL,  -- 1 based, 0 for card wide parameters
+    sub INTEGER NOT NULL,  -- "y" index, 0 if the template has none
+    var_id TEXT NOT NULL,
+    value,
+    updated REAL NOT NULL,
+    PRIMARY KEY (card, template, input, sub)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS params_by_template ON params (template, value, input, sub);
+CREATE TABLE IF NOT EXISTS cards (
+    card TEXT PRIMARY KEY,
+    updated REAL NOT NULL
+);
+"""
+
+
+class Inventory:
+    """SQLite store of the last known value of every parameter on every card.
+
+    record() only buffers; a background thread writes the buffer in batches
+    so it can be called from request worker threads. Queries flush first.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, templates: Sequence[Tuple[str, int]] = ()):
+        self.path = path
+        self._parsed = parse_var_ids(templates)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._buffer: List[Tuple[str, str, object, float]] = []
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_forever, name="inventory", daemon=True)
+        self._flusher.start()
+
+    def record(self, card: str, var_id: str, value, when: Optional[float] = None) -> None:
+        """Remember a value seen on a card. Usable as a RequestEngine listener."""
+        with self._lock:
+            self._buffer.append((card, var_id, value, time.time() if when is None else when))
+            full = len(self._buffer) >= FLUSH_SIZE
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            buffer, self._buffer = self._buffer, []
+            if not buffer:
+                return
+            rows = []
+            cards: Dict[str, float] = {}
+            for card, var_id, value, when in buffer:
+                template, input_num, sub = self._parsed.get(var_id, (var_id, 0, 0))
+                try:
+                    value = int(value)
+                except (ValueError, TypeError):
+                    pass
+                rows.append((card, template, input_num, sub, var_id, value, when))
+                cards[card] = max(when, cards.get(card, 0))
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO params VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self._db.executemany("INSERT INTO cards VALUES (?, ?) ON CONFLICT(card) DO UPDATE SET "
+                                     "updated = max(updated, excluded.updated)", cards.items())
+
+    def query(self, template: str, value=None, input_num: Optional[int] = None, card: Optional[str] = None,
+              max_age: Optional[float] = None) -> List[Tuple[str, int, int, object, float]]:
+        """(card, input, sub, value, updated) rows for a template, optionally filtered."""
+        self.flush()
+        sql = "SELECT card, input, sub, value, updated FROM params WHERE template = ?"
+        args: List[object] = [template]
+        if value is not None:
+            sql += " AND value = ?"
+            args.append(value)
+        if input_num is not None:
+            sql += " AND input = ?"
+            args.append(input_num)
+        if card is not None:
+            sql += " AND card = ?"
+            args.append(card)
+        if max_age is not None:
+            sql += " AND updated >= ?"
+            args.append(time.time() - max_age)
+        sql += " ORDER BY card, input, sub"
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def cards(self) -> List[Tuple[str, float]]:
+        """(card, last updated) for every card in the inventory."""
+        self.flush()
+        with self._lock:
+            return self._db.execute("SELECT card, updated FROM cards ORDER BY card").fetchall()
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._flusher.join()
+        self.flush()
+        self._db.close()
+
+    def _flush_forever(self) -> None:
+        while not self._stopped.wait(FLUSH_INTERVAL):
+            self.flush()
+
+
+def format_age(updated: float) -> str:
+    age = max(0, time.time() - updated)
+    if age < 120:
+        return f"{age:.0f} s"
+    if age < 7200:
+        return f"{age / 60:.0f} min"
+    if age < 172800:
+        return f"{age / 3600:.0f} h"
+    return f"{age / 86400:.0f} days"
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Query the local NEXX fleet inventory")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="Inventory database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    query = commands.add_parser("query", help="Cards and inputs for a var id template, e.g. 400.x.0@i")
+    query.add_argument("template")
+    query.add_argument("--value", type=int, help="Only rows with this value")
+    query.add_argument("--input", type=int, help="Only this input (1 based)")
+    query.add_argument("--card", help="Only this card")
+    query.add_argument("--max-age", type=float, help="Ignore values older than this many seconds")
+    commands.add_parser("cards", help="Known cards and when they were last seen")
+    args = parser.parse_args(argv)
+
+    inventory = Inventory(args.db)
+    try:
+        if args.command == "cards":
+            for card, updated in inventory.cards():
+                print(f"{card:<21} {format_age(updated)} ago")
+            return
+        start = time.perf_counter()
+        rows = inventory.query(args.template, args.value, args.input, args.card, args.max_age)
+        elapsed = (time.perf_counter() - start) * 1000
+        for card, input_num, sub, value, updated in rows:
+            print(f"{card:<21} input {input_num:>2} sub {sub:>2} = {value!s:<6} ({format_age(updated)} ago)")
+        print(f"{len(rows)} rows on {len({row[0] for row in rows})} cards in {elapsed:.1f} ms")
+    finally:
+        inventory.close()
+
+
+if __name__ == "__main__":
+    main()
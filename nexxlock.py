@@ -0,0 +1,268 @@
+"""Advisory per-card locks, so two instances never write to one card at once.
+
+Whoever applies to a card first takes its lock: a small JSON file named
+after the card in a lock directory that every instance uses (a network
+share for operators on different machines). The file is created with
+os.link, which fails if it exists, so exactly one instance wins. A lock is
+a lease: the holder refreshes it while it holds it, and a lock whose
+holder stopped refreshing (crashed, unplugged) expires and may be taken
+over. Replacing or removing a lock file (refresh, release, taking over an
+expired lease) is only done while holding the card's guard file, so an
+instance never removes a lease another instance has just taken. Nothing
+stops a writer that ignores the locks; the tool's own applies, the GUI's
+and the scheduler's, all check them.
+
+check() is the fast test before an apply starts: no I/O for cards this
+instance holds, one small read otherwise.
+"""
+import getpass
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from nexxclient import RequestError
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".nexx_locks")
+DEFAULT_TTL = 60.0  # seconds a lock lasts without being refreshed
+DEFAULT_POLL = 0.5  # seconds between attempts while waiting for a lock
+GUARD_TIMEOUT = 10.0  # seconds after which a guard file is taken to be left by a dead instance
+
+
+class LockHolder:
+    """Who holds a card's lock, as read from its lock file."""
+
+    def __init__(self, ip: str, owner: str, token: str, job: str, acquired: float, expires: float):
+        self.ip = ip
+        self.owner = owner  # user@host:pid
+        self.token = token  # Unique per LockManager
+        self.job = job
+        self.acquired = acquired
+        self.expires = expires
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires
+
+    def describe(self) -> str:
+        since = time.strftime("%H:%M:%S", time.localtime(self.acquired))
+        return f"{self.owner} since {since}" + (f" ({self.job})" if self.job else "")
+
+    def to_dict(self) -> Dict:
+        return {"ip": self.ip, "owner": self.owner, "token": self.token, "job": self.job,
+                "acquired": self.acquired, "expires": self.expires}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LockHolder":
+        return cls(data["ip"], data["owner"], data["token"], data["job"], data["acquired"], data["expires"])
+
+
+class CardLocked(RequestError):
+    """The card is locked by another instance."""
+
+    def __init__(self, holder: LockHolder):
+        super().__init__(f"{holder.ip} is locked by {holder.describe()}")
+        self.holder = holder
+
+
+class LockManager:
+    """The card locks of one instance.
+
+    Locks are reentrant within an instance: acquiring a card it already
+    holds counts up, and the lock file goes once every acquire is released.
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, ttl: float = DEFAULT_TTL, owner: Optional[str] = None):
+        self.directory = directory
+        self.ttl = ttl
+        self.owner = owner or f"{getpass.getuser()}@{socket.gethostname()}:{os.getpid()}"
+        self.token = uuid.uuid4().hex
+        self._held: Dict[str, int] = {}  # ip: acquire count
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, ip: str) -> str:
+        return os.path.join(self.directory, ip.replace(":", "_") + ".lock")
+
+    def holds(self, ip: str) -> bool:
+        return ip in self._held
+
+    def holder(self, ip: str) -> Optional[LockHolder]:
+        """The current holder of a card's lock, or None if it is free or expired."""
+        holder = self._read(ip)
+        return None if holder is None or holder.expired else holder
+
+    def check(self, ip: str) -> Optional[LockHolder]:
+        """The other instance holding a card, or None if this instance may write to it."""
+        if ip in self._held:
+            return None
+        holder = self.holder(ip)
+        return None if holder is None or holder.token == self.token else holder
+
+    def acquire(self, ip: str, job: str = "", wait: float = 0.0) -> bool:
+        """Take a card's lock, waiting up to wait seconds for another holder to let go.
+
+        Returns whether the lock is now held.
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            with self._lock:
+                if ip in self._held:
+                    self._held[ip] += 1
+                    return True
+                if self._create(ip, job):
+                    self._held[ip] = 1
+                    self._start_heartbeat()
+                    return True
+            if time.monotonic() >= deadline or self._stopped.is_set():
+                return False
+            time.sleep(min(DEFAULT_POLL, max(0.0, deadline - time.monotonic())))
+
+    def release(self, ip: str) -> None:
+        with self._lock:
+            count = self._held.get(ip, 0) - 1
+            if count > 0:
+                self._held[ip] = count
+                return
+            self._held.pop(ip, None)
+            self._remove(ip)
+
+    @contextmanager
+    def hold(self, ips: Sequence[str], job: str = "", wait: float = 0.0) -> Iterator[None]:
+        """Hold the locks of several cards, taken in address order so two instances cannot deadlock.
+
+        Raises CardLocked (releasing what it took) if a card stays locked.
+        """
+        taken: List[str] = []
+        try:
+            for ip in sorted(set(ips)):
+                if not self.acquire(ip, job, wait):
+                    raise CardLocked(self.holder(ip) or LockHolder(ip, "another instance", "", "", time.time(), 0))
+                taken.append(ip)
+            yield
+        finally:
+            for ip in taken:
+                self.release(ip)
+
+    def locks(self) -> List[LockHolder]:
+        """Every unexpired lock in the directory."""
+        holders = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".lock"):
+                holder = self._read_path(os.path.join(self.directory, name))
+                if holder is not None and not holder.expired:
+                    holders.append(holder)
+        return holders
+
+    def close(self) -> None:
+        """Release every lock and stop refreshing."""
+        self._stopped.set()
+        with self._lock:
+            for ip in list(self._held):
+                del self._held[ip]
+                self._remove(ip)
+
+    def _remove(self, ip: str) -> None:
+        """Delete a card's lock file if it is still ours. Called holding self._lock."""
+        with self._guard(ip):
+            holder = self._read(ip)
+            if holder is not None and holder.token == self.token:
+                os.unlink(self.path(ip))
+
+    def _create(self, ip: str, job: str) -> bool:
+        path = self.path(ip)
+        now = time.time()
+        holder = LockHolder(ip, self.owner, self.token, job, now, now + self.ttl)
+        temporary = f"{path}.{self.token}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(holder.to_dict(), f)
+        try:
+            for _ in range(2):
+                try:
+                    os.link(temporary, path)  # Fails if the lock exists; never leaves a half written lock
+                    return True
+                except FileExistsError:
+                    current = self._read(ip)
+                    if current is not None and not current.expired:
+                        return current.token == self.token
+                    self._break(ip)
+            return False
+        finally:
+            os.unlink(temporary)
+
+    def _break(self, ip: str) -> None:
+        """Remove a card's lock if it is still expired or unreadable once the guard is held."""
+        with self._guard(ip):
+            current = self._read(ip)
+            if current is not None and current.expired:
+                os.unlink(self.path(ip))
+
+    @contextmanager
+    def _guard(self, ip: str) -> Iterator[None]:
+        """The right to replace or remove a card's lock file, exclusive among every instance.
+
+        Creating a lock needs no guard, since os.link only succeeds while
+        there is no lock file; so while the guard is held the lock file read
+        is the lock file replaced or removed.
+        """
+        path = self.path(ip) + ".guard"
+        while True:
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.stat(path).st_mtime > GUARD_TIMEOUT:
+                        os.unlink(path)  # Left by an instance that died while holding it
+                except FileNotFoundError:
+                    pass
+                time.sleep(0.005)
+        try:
+            yield
+        finally:
+            os.unlink(path)
+
+    def _read(self, ip: str) -> Optional[LockHolder]:
+        return self._read_path(self.path(ip))
+
+    @staticmethod
+    def _read_path(path: str) -> Optional[LockHolder]:
+        try:
+            with open(path) as f:
+                return LockHolder.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            # Unreadable: treat as expired so a corrupt file cannot lock a card forever
+            return LockHolder("", "unknown", "", "", 0.0, 0.0)
+
+    def _start_heartbeat(self) -> None:
+        if self._heartbeat is None:
+            self._heartbeat = threading.Thread(target=self._refresh_forever, name="nexx-locks", daemon=True)
+            self._heartbeat.start()
+
+    def _refresh_forever(self) -> None:
+        while not self._stopped.wait(self.ttl / 3):
+            with self._lock:
+                for ip in list(self._held):
+                    try:
+                        self._refresh(ip)
+                    except OSError:
+                        pass  # Retried on the next beat, well before the lease runs out
+
+    def _refresh(self, ip: str) -> None:
+        with self._guard(ip):
+            holder = self._read(ip)
+            if holder is None or holder.token != self.token:
+                return  # Taken over after we failed to refresh in time; nothing to do but not clobber it
+            holder.expires = time.time() + self.ttl
+            temporary = f"{self.path(ip)}.{self.token}.tmp"
+            with open(temporary, "w") as f:
+                json.dump(holder.to_dict(), f)
+            os.replace(temporary, self.path(ip))
@@ -0,0 +1,155 @@
+"""Drift monitor for parameters changed on a card by someone else.
+
+The values an operator has loaded are watched. While the monitor runs, a
+slow rotating poll re-reads a few of them at a time as background requests
+and reports any whose value on the card no longer matches what was loaded,
+so the tool can highlight them and warn before an apply overwrites them.
+"""
+import collections
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from nexxclient import RequestEngine
+
+DEFAULT_INTERVAL = 2.0  # seconds between polls
+DEFAULT_BUDGET = 8  # GETs per poll across all cards
+
+
+def normalize(value):
+    """Card values arrive as strings or ints; compare them as ints where possible."""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return value
+
+
+class DriftMonitor:
+    """Re-reads watched parameters in rotation with a bounded request budget.
+
+    on_drift(ip, var_id, loaded, current) is called from a request worker
+    thread whenever a watched value is seen to change on the card, including
+    back to its loaded value (current == loaded).
+    """
+
+    def __init__(self, engine: RequestEngine, interval: float = DEFAULT_INTERVAL, budget: int = DEFAULT_BUDGET,
+                 on_drift: Optional[Callable[[str, str, object, object], None]] = None):
+        self.engine = engine
+        self.interval = interval
+        self.budget = budget
+        self.on_drift = on_drift
+        self.polled = 0
+        self._loaded: Dict[Tuple[str, str], object] = {}
+        self._drifted: Dict[Tuple[str, str], object] = {}
+        self._rotation = collections.deque()  # The keys of _loaded, in the order they are polled
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def watch(self, ip: str, var_id: str, value) -> None:
+        """Remember the value a parameter was loaded (or written) with."""
+        key = (ip, var_id)
+        with self._lock:
+            if key not in self._loaded:
+                self._rotation.append(key)
+            self._loaded[key] = normalize(value)
+            self._drifted.pop(key, None)
+
+    def unwatch(self, ip: str, var_ids: Iterable[str]) -> None:
+        with self._lock:
+            watched = len(self._loaded)
+            for var_id in var_ids:
+                self._loaded.pop((ip, var_id), None)
+                self._drifted.pop((ip, var_id), None)
+            if len(self._loaded) < watched:
+                self._rotation = collections.deque(key for key in self._rotation if key in self._loaded)
+
+    def drifted(self, ip: str) -> Dict[str, Tuple[object, object]]:
+        """var id: (loaded value, value now on the card) for every drifted parameter of a card."""
+        with self._lock:
+            return {key[1]: (self._loaded[key], current) for key, current in self._drifted.items() if key[0] == ip}
+
+    def conflicts(self, ip: str, writes: Iterable[Tuple[str, object]]) -> List[Tuple[str, object, object, object]]:
+        """(var id, loaded, current, new) for writes that would overwrite an external change."""
+        drifted = self.drifted(ip)
+        return [(var_id, *drifted[var_id], value) for var_id, value in writes
+                if var_id in drifted and normalize(value) != drifted[var_id][1]]
+
+    def rebase(self, ip: str, writes: Iterable[Tuple[str, object]]) -> List[str]:
+        """Take successfully written values as the new loaded values.
+
+        Returns the var ids among them that had drifted.
+        """
+        cleared = []
+        with self._lock:
+            for var_id, value in writes:
+                key = (ip, var_id)
+                if key in self._loaded:
+                    self._loaded[key] = normalize(value)
+                    if key in self._drifted:
+                        del self._drifted[key]
+                        cleared.append(var_id)
+        return cleared
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._poll_forever, name="drift-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+    def poll(self) -> int:
+        """Queue the next batch of re-reads. Returns how many were sent.
+
+        Reads still outstanding from earlier polls count against the budget,
+        so a slow card never has more than `budget` monitor reads queued.
+        """
+        batch = []
+        with self._lock:
+            for _ in range(len(self._rotation)):
+                if self._outstanding + len(batch) >= self.budget:
+                    break
+                key = self._rotation.popleft()
+                self._rotation.append(key)
+                batch.append(key)
+            self._outstanding += len(batch)
+        for ip, var_id in batch:
+            future = self.engine.client(ip).submit(var_id, background=True)
+            future.add_done_callback(lambda future, key=(ip, var_id): self._check(key, future))
+        self.polled += len(batch)
+        return len(batch)
+
+    def _poll_forever(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.poll()
+
+    def _check(self, key: Tuple[str, str], future: Future) -> None:
+        with self._lock:
+            self._outstanding -= 1
+        if future.cancelled() or future.exception() is not None:
+            return
+        current = normalize(future.result())
+        with self._lock:
+            if key not in self._loaded:
+                return
+            loaded = self._loaded[key]
+            if current == loaded:
+                if key not in self._drifted:
+                    return
+                del self._drifted[key]
+            else:
+                if key in self._drifted and self._drifted[key] == current:
+                    return
+                self._drifted[key] = current
+        if self.on_drift is not None:
+            self.on_drift(key[0], key[1], loaded, current)
@@ -0,0 +1,580 @@
+"""Job scheduler for bulk operations on cards, with maintenance windows.
+
+A job is an operation, the cards to run it on and optionally a daily
+window such as 01:00-04:00. Applies and restores write a plan (var id,
+value writes), snapshots read every schema parameter into a .nxs file per
+card and diffs compare the cards against a plan. Jobs are JSON files in a
+queue directory. The scheduler runs headless (from a service, or behind
+the control API in nexxapi), picks up due jobs and runs several at once,
+each on all of its cards at once through the request engine. Writes go a
+chunk per card at a time and progress is saved after every chunk, so a job
+whose window closes is paused and carries on where it stopped in the next
+window, also after a restart. Every run leaves a report next to the job.
+Applies and restores hold each card's lock (nexxlock) while writing it; a
+card locked by another instance is left for the next pass.
+
+    python nexxscheduler.py submit --plan golden.nxs --cards 10.20.0.11,10.20.0.12 --window 01:00-04:00
+    python nexxscheduler.py run
+"""
+import argparse
+import datetime
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import nexxschema
+from nexxcapabilities import CapabilityCache, probe
+from nexxclient import TRANSPORTS, CardClient, RequestEngine, RequestError, Unsupported, create_transport
+from nexxlock import DEFAULT_DIRECTORY as DEFAULT_LOCK_DIRECTORY, CardLocked, LockManager
+from nexxstate import MAX_INPUTS, Snapshot, expand_templates
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".nexx_jobs")
+DEFAULT_CHUNK = 64  # Writes per card between window checks and progress saves
+DEFAULT_INTERVAL = 30.0  # seconds between looks at the queue
+DEFAULT_MAX_JOBS = 8  # Jobs run at once
+DEFAULT_MAX_CARDS = 64  # Cards worked on at once, across all running jobs
+READ_CHUNK = 1024  # Reads per card between checks and progress updates
+PROGRESS_INTERVAL = 0.5  # seconds between progress saves and updates of a running job
+QUEUED, RUNNING, PAUSED, DONE, FAILED, CANCELLED = "queued", "running", "paused", "done", "failed", "cancelled"
+RUNNABLE = (QUEUED, RUNNING, PAUSED)  # RUNNING on load means the daemon stopped mid-run
+APPLY, RESTORE, SNAPSHOT, DIFF = "apply", "restore", "snapshot", "diff"
+KINDS = (APPLY, RESTORE, SNAPSHOT, DIFF)
+WRITING = (APPLY, RESTORE)
+
+
+class Window:
+    """A daily time window in local time, which may run past midnight."""
+
+    def __init__(self, start: datetime.time, end: datetime.time):
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def parse(cls, text: str) -> "Window":
+        """A window from "HH:MM-HH:MM"."""
+        try:
+            start, end = (datetime.datetime.strptime(part.strip(), "%H:%M").time() for part in text.split("-"))
+        except ValueError:
+            raise ValueError(f"{text!r} is not a window like 01:00-04:00")
+        if start == end:
+            raise ValueError(f"Window {text} is empty")
+        return cls(start, end)
+
+    def is_open(self, now: datetime.datetime) -> bool:
+        moment = now.time()
+        if self.start < self.end:
+            return self.start <= moment < self.end
+        return moment >= self.start or moment < self.end
+
+    def next_open(self, now: datetime.datetime) -> datetime.datetime:
+        """When the window next opens (now if it is open)."""
+        if self.is_open(now):
+            return now
+        opens = datetime.datetime.combine(now.date(), self.start)
+        return opens if opens > now else opens + datetime.timedelta(days=1)
+
+    def __str__(self) -> str:
+        return f"{self.start:%H:%M}-{self.end:%H:%M}"
+
+
+class CardProgress:
+    """How far a job got on one card."""
+
+    def __init__(self, done: int = 0, skipped: int = 0, failed: Optional[List[Tuple[str, str]]] = None,
+                 error: Optional[str] = None, differences: Optional[List[Tuple[str, object, object]]] = None,
+                 snapshot: Optional[str] = None):
+        self.done = done  # Writes or reads handled so far, in plan order
+        self.skipped = skipped  # Parameters the card does not have
+        self.failed = failed if failed is not None else []  # (var id, error) of requests the card refused
+        self.error = error  # Why the card could not be worked on in the last run, if it could not
+        self.differences = differences  # (var id, planned, on the card) once a diff has read the card
+        self.snapshot = snapshot  # Path of the card's snapshot once taken
+
+    def to_dict(self) -> Dict:
+        return {"done": self.done, "skipped": self.skipped, "failed": self.failed, "error": self.error,
+                "differences": self.differences, "snapshot": self.snapshot}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CardProgress":
+        differences = data.get("differences")
+        return cls(data["done"], data["skipped"], [tuple(item) for item in data["failed"]], data["error"],
+                   [tuple(item) for item in differences] if differences is not None else None,
+                   data.get("snapshot"))
+
+
+class Job:
+    """An operation on some cards inside a window, and how far it got."""
+
+    def __init__(self, job_id: str, name: str, writes: List[Tuple[str, int]], targets: List[str],
+                 window: Optional[Window] = None, kind: str = APPLY, size: Optional[int] = None):
+        self.id = job_id
+        self.kind = kind
+        self.name = name
+        self.writes = writes  # The plan written (apply, restore) or compared against (diff)
+        self.targets = targets
+        self.window = window  # None to run as soon as the scheduler sees the job
+        self.size = len(writes) if size is None else size  # Requests per card
+        self.status = QUEUED
+        self.message = ""
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.cards: Dict[str, CardProgress] = {ip: CardProgress() for ip in targets}
+
+    @property
+    def remaining(self) -> int:
+        return sum(self.size - progress.done for progress in self.cards.values())
+
+    def is_open(self, now: datetime.datetime) -> bool:
+        return self.window is None or self.window.is_open(now)
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "kind": self.kind, "name": self.name, "writes": self.writes, "size": self.size,
+                "targets": self.targets, "window": str(self.window) if self.window else None, "status": self.status,
+                "message": self.message, "created": self.created, "started": self.started,
+                "finished": self.finished, "cards": {ip: progress.to_dict() for ip, progress in self.cards.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Job":
+        window = Window.parse(data["window"]) if data["window"] else None
+        job = cls(data["id"], data["name"], [tuple(write) for write in data["writes"]], data["targets"], window,
+                  data.get("kind", APPLY), data.get("size"))
+        job.status = data["status"]
+        job.message = data["message"]
+        job.created = data["created"]
+        job.started = data["started"]
+        job.finished = data["finished"]
+        job.cards = {ip: CardProgress.from_dict(progress) for ip, progress in data["cards"].items()}
+        return job
+
+    def report(self) -> Dict:
+        """What the job did so far, per card."""
+        cards = {}
+        for ip, progress in self.cards.items():
+            card = {"completed": progress.done - progress.skipped - len(progress.failed),
+                    "skipped": progress.skipped, "failed": progress.failed,
+                    "remaining": self.size - progress.done, "error": progress.error}
+            if self.kind == DIFF:
+                card["differences"] = progress.differences
+            elif self.kind == SNAPSHOT:
+                card["snapshot"] = progress.snapshot
+            cards[ip] = card
+        return {"id": self.id, "kind": self.kind, "name": self.name, "status": self.status,
+                "message": self.message, "window": str(self.window) if self.window else None,
+                "size": self.size, "created": self.created, "started": self.started, "finished": self.finished,
+                "cards": cards}
+
+    def progress(self) -> Dict:
+        """Short form of report() for progress updates: counts only."""
+        return {"id": self.id, "kind": self.kind, "name": self.name, "status": self.status, "message": self.message,
+                "window": str(self.window) if self.window else None,
+                "done": sum(progress.done for progress in self.cards.values()), "total": self.size * len(self.cards),
+                "failed": sum(len(progress.failed) for progress in self.cards.values()),
+                "cards": {ip: {"done": progress.done, "failed": len(progress.failed), "error": progress.error}
+                          for ip, progress in self.cards.items()}}
+
+    def summary(self) -> str:
+        failed = sum(len(progress.failed) for progress in self.cards.values())
+        text = (f"{self.kind} {self.status}, {len(self.targets)} cards, {self.size} requests each, "
+                f"{self.remaining} remaining, {failed} failed")
+        if self.kind == DIFF and self.status == DONE:
+            text += f", {sum(len(progress.differences or []) for progress in self.cards.values())} differences"
+        return f"{text}: {self.message}" if self.message else text
+
+
+def load_plan(path: str) -> List[Tuple[str, int]]:
+    """Writes from a snapshot (.nxs) or a JSON object of var id to value."""
+    if path.endswith(".nxs"):
+        return list(Snapshot.load(path).to_dict().items())
+    with open(path) as f:
+        plan = json.load(f)
+    if isinstance(plan, dict):
+        return [(str(var_id), value) for var_id, value in plan.items()]
+    return [(str(var_id), value) for var_id, value in plan]
+
+
+class Scheduler:
+    """Runs the jobs of a queue directory inside their windows, several at once.
+
+    Listeners are called as listener(job) from worker threads whenever a
+    job's status changes, and at most every PROGRESS_INTERVAL seconds while
+    it makes progress. clock() gives the local time windows are checked
+    against; it is only replaced for testing.
+    """
+
+    def __init__(self, engine: RequestEngine, directory: str = DEFAULT_DIRECTORY, chunk: int = DEFAULT_CHUNK,
+                 capability_cache: Optional[CapabilityCache] = None,
+                 clock: Callable[[], datetime.datetime] = datetime.datetime.now,
+                 max_jobs: int = DEFAULT_MAX_JOBS, max_cards: int = DEFAULT_MAX_CARDS,
+                 locks: Optional[LockManager] = None):
+        self.engine = engine
+        self.directory = directory
+        self.chunk = chunk
+        self.capability_cache = capability_cache if capability_cache is not None else CapabilityCache()
+        self.clock = clock
+        self.locks = locks if locks is not None else LockManager()
+        self.schema = nexxschema.load()
+        self.listeners: List[Callable[[Job], None]] = []
+        self._running: Dict[str, Job] = {}
+        self._cancelled = set()
+        self._saved: Dict[str, float] = {}  # Job id: when its progress was last saved
+        self._lock = threading.Lock()
+        self._jobs = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="nexx-job")
+        self._cards = ThreadPoolExecutor(max_workers=max_cards, thread_name_prefix="nexx-job-card")
+        self._stopped = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, job_id: str, suffix: str = ".json") -> str:
+        return os.path.join(self.directory, job_id + suffix)
+
+    def snapshot_var_ids(self) -> List[str]:
+        """What a snapshot job reads: every schema parameter of every input."""
+        return expand_templates(self.schema.templates(), range(1, MAX_INPUTS + 1))
+
+    def submit(self, writes: Sequence[Tuple[str, int]], targets: Sequence[str], window: Optional[Window] = None,
+               name: str = "", kind: str = APPLY, reject_locked: bool = False) -> Job:
+        """Queue a job. Snapshot jobs take no plan.
+
+        A plan naming a var id more than once keeps its last value, in the
+        place of its first. Raises ValueError for an unknown kind, a missing
+        plan or a plan with out-of-range values to write, and with
+        reject_locked CardLocked if another instance holds a card the job
+        would write (nothing is queued then). Otherwise a locked card waits
+        until its lock is free.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}, expected one of {', '.join(KINDS)}")
+        writes = list(dict(writes).items())
+        size = None
+        if kind == SNAPSHOT:
+            writes = []
+            size = len(self.snapshot_var_ids())
+        elif not writes:
+            raise ValueError(f"A {kind} job needs a plan")
+        if kind in WRITING:
+            violations = self.schema.range_table().check(writes)
+            if violations:
+                var_id, value, low, high = violations[0]
+                raise ValueError(f"{len(violations)} values are out of range, e.g. {var_id}: {value} is not in "
+                                 f"{low} to {high}")
+            if reject_locked:
+                for ip in targets:
+                    holder = self.locks.check(ip)
+                    if holder is not None:
+                        raise CardLocked(holder)
+        job = Job(uuid.uuid4().hex[:12], name, writes, list(dict.fromkeys(targets)), window, kind, size)
+        self.save(job)
+        self._wake.set()
+        return job
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._write(self.path(job.id), job.to_dict())
+            self._saved[job.id] = time.monotonic()
+
+    def save_report(self, job: Job) -> None:
+        with self._lock:
+            self._write(self.path(job.id, ".report.json"), job.report())
+
+    @staticmethod
+    def _write(path: str, data: Dict) -> None:
+        temporary = path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(data, f, indent=1)
+        os.replace(temporary, path)  # A crash mid-write leaves the previous version
+
+    def job(self, job_id: str) -> Job:
+        """A job by id, the live one while it runs. Raises KeyError if there is no such job."""
+        with self._lock:
+            job = self._running.get(job_id)
+        if job is not None:
+            return job
+        try:
+            with open(self.path(job_id)) as f:
+                return Job.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            raise KeyError(job_id)
+
+    def jobs(self) -> List[Job]:
+        """Every job in the queue directory, oldest first."""
+        jobs = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json") and not name.endswith(".report.json"):
+                try:
+                    jobs.append(self.job(name[:-len(".json")]))
+                except KeyError:
+                    continue
+        return sorted(jobs, key=lambda job: job.created)
+
+    def cancel(self, job_id: str) -> Job:
+        """Cancel a job. A running job stops after the chunks in flight. Raises KeyError for unknown jobs."""
+        job = self.job(job_id)
+        with self._lock:
+            self._cancelled.add(job_id)
+            running = job_id in self._running
+        if not running and job.status in RUNNABLE:
+            self._finish(job, CANCELLED, "Cancelled")
+        return job
+
+    def dispatch(self) -> List[Future]:
+        """Start every unfinished job whose window is open and that is not already running."""
+        futures = []
+        for job in self.jobs():
+            if self._stopped.is_set():
+                break
+            if job.status not in RUNNABLE or not job.is_open(self.clock()):
+                continue
+            with self._lock:
+                if job.id in self._running or job.id in self._cancelled:
+                    continue
+                self._running[job.id] = job
+            futures.append(self._jobs.submit(self.run_job, job))
+        return futures
+
+    def run_pending(self) -> List[Job]:
+        """Run every due job and wait for them to finish or pause. Returns the jobs run."""
+        return [future.result() for future in self.dispatch()]
+
+    def run_job(self, job: Job) -> Job:
+        """Run the rest of a job on all of its cards at once until done, cancelled or the window closes."""
+        with self._lock:
+            self._running[job.id] = job
+        try:
+            self._run_job(job)
+        finally:
+            with self._lock:
+                self._running.pop(job.id, None)
+                self._saved.pop(job.id, None)
+        return job
+
+    def _run_job(self, job: Job) -> None:
+        job.status = RUNNING
+        job.message = ""
+        if job.started is None:
+            job.started = time.time()
+        self.save(job)
+        self._notify(job)
+        pending = [ip for ip, progress in job.cards.items() if progress.done < job.size]
+        futures = {ip: self._cards.submit(self._run_card, job, ip) for ip in pending}
+        wait(futures.values())
+        for ip, future in futures.items():
+            if future.exception() is not None:
+                job.cards[ip].error = f"{type(future.exception()).__name__}: {future.exception()}"
+
+        unreachable = [ip for ip, progress in job.cards.items() if progress.error]
+        if job.remaining == 0:
+            self._finish(job, DONE)
+        elif job.id in self._cancelled:
+            self._finish(job, CANCELLED, "Cancelled")
+        else:
+            if unreachable:
+                message = f"{len(unreachable)} cards unreachable or locked, retrying"
+            elif self._stopped.is_set():
+                message = "Scheduler stopped"
+            elif job.window is not None:
+                message = f"Window closed, resuming at {job.window.next_open(self.clock()):%Y-%m-%d %H:%M}"
+            else:
+                message = "Stopped before finishing, retrying"
+            self._finish(job, PAUSED, message)
+
+    def _finish(self, job: Job, status: str, message: str = "") -> None:
+        job.status = status
+        job.message = message
+        if status in (DONE, CANCELLED):
+            job.finished = time.time()
+            with self._lock:
+                self._cancelled.discard(job.id)
+        self.save(job)
+        self.save_report(job)
+        self._notify(job)
+
+    def _may_continue(self, job: Job) -> bool:
+        return not self._stopped.is_set() and job.id not in self._cancelled and job.is_open(self.clock())
+
+    def _run_card(self, job: Job, ip: str) -> None:
+        progress = job.cards[ip]
+        client = self.engine.client(ip)
+        progress.error = None
+        try:
+            if client.capabilities is None:
+                client.capabilities, _ = probe(client, self.schema.templates(), self.capability_cache,
+                                               self.schema.indexes())
+        except RequestError as e:
+            progress.error = f"Could not reach the card: {e}"
+            return
+        if job.kind == SNAPSHOT:
+            self._snapshot_card(job, ip, client)
+        elif job.kind == DIFF:
+            self._diff_card(job, ip, client)
+        elif not self.locks.acquire(ip, f"{job.kind} job {job.id} {job.name}".rstrip()):
+            holder = self.locks.holder(ip)
+            progress.error = f"Locked by {holder.describe() if holder else 'another instance'}"
+        else:
+            try:
+                self._write_card(job, ip, client)
+            finally:
+                self.locks.release(ip)
+
+    def _write_card(self, job: Job, ip: str, client: CardClient) -> None:
+        progress = job.cards[ip]
+        while progress.done < job.size and self._may_continue(job):
+            chunk = job.writes[progress.done:progress.done + self.chunk]
+            skipped = sum(not client.supports(var_id) for var_id, _ in chunk)
+            failed = client.set_many(chunk)
+            progress.done += len(chunk)
+            progress.skipped += skipped
+            progress.failed.extend((var_id, str(e)) for var_id, e in failed)
+            self._progressed(job)
+
+    def _read_card(self, job: Job, ip: str, client: CardClient, var_ids: List[str]) -> Optional[Dict[str, object]]:
+        """GET var_ids from a card, or None if the job had to stop first.
+
+        The values read are only kept in memory, so a card whose reads were
+        interrupted is read again from the start when the job resumes.
+        """
+        progress = job.cards[ip]
+        progress.done = progress.skipped = 0
+        progress.failed = []
+        results = {}
+        for start in range(0, len(var_ids), READ_CHUNK):
+            if not self._may_continue(job):
+                progress.done = progress.skipped = 0
+                progress.failed = []
+                return None
+            piece = var_ids[start:start + READ_CHUNK]
+            chunk = client.get_many(piece)
+            results.update(chunk)
+            progress.done += len(piece)  # get_many answers a repeated var id once
+            progress.skipped += sum(isinstance(value, Unsupported) for value in chunk.values())
+            progress.failed.extend((var_id, str(value)) for var_id, value in chunk.items()
+                                   if isinstance(value, Exception) and not isinstance(value, Unsupported))
+            if progress.done < len(var_ids):
+                self._progressed(job)
+        return results
+
+    def _snapshot_card(self, job: Job, ip: str, client: CardClient) -> None:
+        results = self._read_card(job, ip, client, self.snapshot_var_ids())
+        if results is None:
+            return
+        path = self.path(f"{job.id}-{ip.replace(':', '_')}", ".nxs")
+        Snapshot.from_results(results, {"ip": ip, "card": client.capabilities.identity, "taken": time.time(),
+                                        "job": job.id}).save(path)
+        job.cards[ip].snapshot = path
+        self._progressed(job)
+
+    def _diff_card(self, job: Job, ip: str, client: CardClient) -> None:
+        results = self._read_card(job, ip, client, [var_id for var_id, _ in job.writes])
+        if results is None:
+            return
+        job.cards[ip].differences = [(var_id, value, results[var_id]) for var_id, value in job.writes
+                                     if not isinstance(results[var_id], Exception)
+                                     and str(results[var_id]) != str(value)]
+        self._progressed(job)
+
+    def _progressed(self, job: Job) -> None:
+        """Save and announce progress, at most every PROGRESS_INTERVAL seconds per job.
+
+        Writes lost to a crash in between are sent again on resume, which
+        sets the same values.
+        """
+        with self._lock:
+            due = time.monotonic() - self._saved.get(job.id, 0.0) >= PROGRESS_INTERVAL
+        if due:
+            self.save(job)
+            self._notify(job)
+
+    def _notify(self, job: Job) -> None:
+        for listener in list(self.listeners):
+            try:
+                listener(job)
+            except Exception:
+                traceback.print_exc()
+
+    def run_forever(self, interval: float = DEFAULT_INTERVAL) -> None:
+        """Start due jobs every interval seconds, or as soon as one is submitted, until stop()."""
+        while not self._stopped.is_set():
+            self._wake.clear()
+            self.dispatch()
+            self._wake.wait(interval)
+
+    def start(self, interval: float = DEFAULT_INTERVAL) -> "Scheduler":
+        """Run run_forever() on a background thread."""
+        self._thread = threading.Thread(target=self.run_forever, args=(interval,), name="nexx-scheduler",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Pause running jobs after the chunks in flight, wait for them and end run_forever()."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._jobs.shutdown(wait=True)
+        self._cards.shutdown(wait=True)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run bulk jobs on NEXX cards, in maintenance windows")
+    parser.add_argument("--dir", default=DEFAULT_DIRECTORY, help="Job queue directory")
+    parser.add_argument("--locks", default=DEFAULT_LOCK_DIRECTORY, help="Card lock directory shared by all instances")
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="Queue a job for some cards")
+    submit.add_argument("--kind", choices=KINDS, default=APPLY)
+    submit.add_argument("--plan", help="Snapshot (.nxs) or JSON object of var id to value (not for snapshots)")
+    submit.add_argument("--cards", required=True, help="Comma separated card IPs")
+    submit.add_argument("--window", help="Daily window, e.g. 01:00-04:00 (default: run as soon as possible)")
+    submit.add_argument("--name", default="")
+    submit.add_argument("--reject-locked", action="store_true",
+                        help="Fail if another instance holds a card now, instead of waiting for it")
+    commands.add_parser("list", help="Queued and finished jobs")
+    cancel = commands.add_parser("cancel", help="Cancel a queued or paused job")
+    cancel.add_argument("job")
+    run = commands.add_parser("run", help="Run queued jobs in their windows until interrupted")
+    run.add_argument("--transport", choices=sorted(TRANSPORTS), default="asyncio")
+    run.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Seconds between queue checks")
+    run.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="Writes per card between window checks")
+    run.add_argument("--once", action="store_true", help="Run what is due now and exit")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        engine = RequestEngine(create_transport(args.transport))
+    else:
+        engine = None  # Only running jobs talks to cards
+    scheduler = Scheduler(engine, args.dir, getattr(args, "chunk", DEFAULT_CHUNK), locks=LockManager(args.locks))
+    if args.command == "submit":
+        window = Window.parse(args.window) if args.window else None
+        cards = [ip.strip() for ip in args.cards.split(",") if ip.strip()]
+        writes = load_plan(args.plan) if args.plan else []
+        name = args.name or (os.path.basename(args.plan) if args.plan else args.kind)
+        job = scheduler.submit(writes, cards, window, name, args.kind, args.reject_locked)
+        print(f"Queued {job.kind} job {job.id}: {job.size} requests to each of {len(cards)} cards "
+              f"in window {window or 'any'}")
+    elif args.command == "list":
+        for job in scheduler.jobs():
+            print(f"{job.id}  {job.name:<24} {str(job.window or 'any'):<11} {job.summary()}")
+    elif args.command == "cancel":
+        print(f"{args.job}: {scheduler.cancel(args.job).summary()}")
+    else:
+        try:
+            if args.once:
+                for job in scheduler.run_pending():
+                    print(f"{job.id}  {job.name}: {job.summary()}")
+            else:
+                scheduler.run_forever(args.interval)
+        except KeyboardInterrupt:
+            scheduler.stop()
+        finally:
+            scheduler.locks.close()
+            engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Parameter schema: every var id the tool knows about, as data.
+
+nexx_schema.json lists the pages, their groups and each parameter's var id
+template, label and either a (min, max) range with unit and default or a
+list of choices. Groups indexed by "channel" or "pair" fill "y" with that
+dimension. load() reads the file once and compiles the lookup tables the
+pages, planner, validator and snapshot code share, so supporting new
+firmware is an edit to the JSON file rather than to the code.
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from nexxstate import MAX_INPUTS, RangeTable, parse_var_ids
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nexx_schema.json")
+
+
+class Parameter:
+    """One var id template and how its values are entered."""
+
+    __slots__ = ("label", "template", "subs", "low", "high", "unit", "default", "choices", "subgroup")
+
+    def __init__(self, label: str, template: str, subs: int, low: int, high: int, unit: str = "",
+                 default: int = 0, choices: Optional[List[str]] = None, subgroup: str = ""):
+        self.label = label
+        self.template = template
+        self.subs = subs
+        self.low = low
+        self.high = high
+        self.unit = unit
+        self.default = default
+        self.choices = choices
+        self.subgroup = subgroup
+
+    @property
+    def range_text(self) -> str:
+        """"(min to max) unit", as shown next to spin controls."""
+        return f"({self.low} to {self.high}) {self.unit}".rstrip()
+
+
+class Group:
+    """Parameters laid out together on a page."""
+
+    def __init__(self, name: str, parameters: List[Parameter], index: Optional[str] = None):
+        self.name = name
+        self.parameters = parameters
+        self.index = index  # "channel", "pair" or None for what "y" stands for
+
+    def templates(self) -> List[Tuple[str, int]]:
+        return [(parameter.template, parameter.subs) for parameter in self.parameters]
+
+
+class Page:
+    def __init__(self, name: str, groups: List[Group]):
+        self.name = name
+        self.groups = groups
+
+    def group(self, name: str) -> Group:
+        for group in self.groups:
+            if group.name == name:
+                return group
+        raise KeyError(f"{self.name} has no group {name}")
+
+    def parameters(self) -> List[Parameter]:
+        return [parameter for group in self.groups for parameter in group.parameters]
+
+    def templates(self) -> List[Tuple[str, int]]:
+        return [template for group in self.groups for template in group.templates()]
+
+
+class Schema:
+    """A loaded schema file with its lookup tables."""
+
+    def __init__(self, data: Dict):
+        self.version = data.get("version", 1)
+        self.dimensions: Dict[str, int] = {"input": MAX_INPUTS, **data.get("dimensions", {})}
+        self.pair_labels: List[str] = data.get("pair_labels", [])
+        self.pages: List[Page] = []
+        self.parameters: Dict[str, Parameter] = {}
+        for page_data in data["pages"]:
+            groups = []
+            for group_data in page_data["groups"]:
+                index = group_data.get("index")
+                subs = self.dimensions[index] if index else 1
+                choices = group_data.get("choices")
+                parameters = []
+                for item in group_data["parameters"]:
+                    item_choices = item.get("choices", choices)
+                    if item_choices:
+                        low, high = 0, len(item_choices) - 1
+                    else:
+                        low, high = item["min"], item["max"]
+                    parameter = Parameter(item["label"], item["var_id"], subs, low, high, item.get("unit", ""),
+                                          item.get("default", group_data.get("default", low)), item_choices,
+                                          item.get("subgroup", ""))
+                    if parameter.template in self.parameters:
+                        raise ValueError(f"{parameter.template} is in the schema twice")
+                    self.parameters[parameter.template] = parameter
+                    parameters.append(parameter)
+                groups.append(Group(group_data["name"], parameters, index))
+            self.pages.append(Page(page_data["name"], groups))
+        self._pages = {page.name: page for page in self.pages}
+        self._var_ids = parse_var_ids(self.templates(), self.dimensions["input"])
+        self._range_table: Optional[RangeTable] = None
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH) -> "Schema":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def page(self, name: str) -> Page:
+        return self._pages[name]
+
+    def templates(self) -> List[Tuple[str, int]]:
+        """(var id template, sub count) of every parameter, in schema order."""
+        return [(parameter.template, parameter.subs) for parameter in self.parameters.values()]
+
+    def ranges(self) -> Dict[str, Tuple[int, int]]:
+        return {template: (parameter.low, parameter.high) for template, parameter in self.parameters.items()}
+
+    def indexes(self) -> Dict[str, Optional[str]]:
+        """What "y" stands for in every template: "channel", "pair" or None."""
+        return {parameter.template: group.index for page in self.pages for group in page.groups
+                for parameter in group.parameters}
+
+    def labels(self) -> Dict[str, str]:
+        return {template: parameter.label for template, parameter in self.parameters.items()}
+
+    def lookup(self, var_id: str) -> Tuple[Parameter, int, int]:
+        """(parameter, input, sub) of an expanded var id. Raises KeyError if the schema lacks it."""
+        template, input_num, sub = self._var_ids[var_id]
+        return self.parameters[template], input_num, sub
+
+    def range_table(self) -> RangeTable:
+        if self._range_table is None:
+            self._range_table = RangeTable(self.templates(), self.ranges(), self.dimensions["input"])
+        return self._range_table
+
+
+_schemas: Dict[str, Schema] = {}
+_lock = threading.Lock()
+
+
+def load(path: str = DEFAULT_PATH) -> Schema:
+    """The schema in path, read and compiled on first use and shared after that."""
+    path = os.path.abspath(path)
+    with _lock:
+        schema = _schemas.get(path)
+        if schema is None:
+            schema = _schemas[path] = Schema.load(path)
+        return schema
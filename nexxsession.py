@@ -0,0 +1,113 @@
+"""Open card sessions.
+
+Every card the operator connects to gets a CardSession: its CardClient
+(with its own request window, capabilities and values in the engine's
+StateCache) and a job queue that runs the card's applies one at a time, so
+two applies to one card never interleave while applies to different cards
+run at once. Sessions tracks the open cards, which one the pages show and
+which cards a group apply goes to.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from nexxcapabilities import IDENTITY_VAR_ID
+from nexxclient import CardClient, RequestEngine
+
+
+class CardSession:
+    """One open card."""
+
+    def __init__(self, engine: RequestEngine, ip: str, identity):
+        self.engine = engine
+        self.ip = ip
+        self.identity = identity
+        self.client: CardClient = engine.client(ip)
+        self.opened = time.time()
+        self._jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"nexx-session-{ip}")
+
+    @property
+    def label(self) -> str:
+        return f"{self.ip}  {self.identity}"
+
+    @property
+    def capabilities(self):
+        return self.client.capabilities
+
+    def run(self, function: Callable, *args) -> Future:
+        """Queue function(*args) behind the card's other jobs."""
+        return self._jobs.submit(function, *args)
+
+    def close(self) -> None:
+        """Drop the card's queued jobs, prefetches and cached values. A job already running finishes."""
+        self._jobs.shutdown(wait=False, cancel_futures=True)
+        self.client.cancel_background()
+        self.engine.cache.clear(self.ip)
+
+
+class Sessions:
+    """The open cards, in the order they were opened."""
+
+    def __init__(self, engine: RequestEngine):
+        self.engine = engine
+        self.current: Optional[str] = None  # The card the pages load from and apply to
+        self.group: List[str] = []  # Other cards a group apply also goes to
+        self._sessions: Dict[str, CardSession] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, ip: str) -> bool:
+        return ip in self._sessions
+
+    def sessions(self) -> List[CardSession]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def get(self, ip: str) -> CardSession:
+        """The session of an open card. Raises KeyError if the card is not open."""
+        with self._lock:
+            return self._sessions[ip]
+
+    def open(self, ip: str) -> CardSession:
+        """Open a card (or return its session if it is open) and make it current.
+
+        Reads the card identity, so raises RequestError if the card does not answer.
+        """
+        with self._lock:
+            session = self._sessions.get(ip)
+        if session is None:
+            identity = self.engine.client(ip).get(IDENTITY_VAR_ID)
+            with self._lock:
+                session = self._sessions.setdefault(ip, CardSession(self.engine, ip, identity))
+        self.current = ip
+        return session
+
+    def close(self, ip: str) -> Optional[str]:
+        """Close a card. Returns the card that is current afterwards, if any is left open."""
+        with self._lock:
+            session = self._sessions.pop(ip, None)
+            if ip in self.group:
+                self.group.remove(ip)
+            if self.current == ip:
+                self.current = next(iter(self._sessions), None)
+        if session is not None:
+            session.close()
+        return self.current
+
+    def targets(self, ip: str, group: bool) -> List[str]:
+        """Cards an apply from ip goes to: ip, and with group the open cards of the group."""
+        if not group:
+            return [ip]
+        with self._lock:
+            return list(dict.fromkeys([ip] + [card_ip for card_ip in self.group if card_ip in self._sessions]))
+
+    def run_all(self, ips: List[str], function: Callable, *args) -> Dict[str, Future]:
+        """Queue function(ip, *args) on every card's job queue, so the cards work concurrently."""
+        return {ip: self.get(ip).run(function, ip, *args) for ip in ips}
+
+    def close_all(self) -> None:
+        for session in self.sessions():
+            self.close(session.ip)
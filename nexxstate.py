@@ -0,0 +1,329 @@
+"""Array-backed notification state.
+
+Notification enables are boolean matrices of shape (inputs, traps): one row
+per input and one column per trap var id template such as "560.x.4@i".
+Keeping them as NumPy arrays lets diffs, golden-config checks and write
+plans run as whole-array operations instead of Python loops over widgets.
+
+Snapshot holds every parameter value of a card and has a compact binary file
+format for archiving and comparing card configurations. RangeTable checks
+write plans and snapshots against the parameters' (min, max) ranges.
+"""
+import json
+import struct
+import zlib
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAX_INPUTS = 32
+
+
+def expand(var_id: str, input_num: int) -> str:
+    """Fill in the input of a var id template. Inputs are 1 based, var ids 0 based."""
+    return var_id.replace("x", str(input_num - 1))
+
+
+class TrapMatrix:
+    """Trap enables of one card for one family of var ids.
+
+    `values` holds the enables and `known` marks which cells have actually
+    been read (or set), so comparisons ignore cells nobody has looked at.
+    """
+
+    def __init__(self, var_ids: Sequence[str], inputs: int = MAX_INPUTS):
+        self.var_ids = list(var_ids)
+        self.columns = {var_id: col for col, var_id in enumerate(self.var_ids)}
+        self.values = np.zeros((inputs, len(self.var_ids)), dtype=bool)
+        self.known = np.zeros((inputs, len(self.var_ids)), dtype=bool)
+
+    @property
+    def inputs(self) -> int:
+        return self.values.shape[0]
+
+    @classmethod
+    def from_row(cls, var_ids: Sequence[str], row: Sequence[int], from_input: int = 1,
+                 to_input: Optional[int] = None, inputs: int = MAX_INPUTS) -> "TrapMatrix":
+        """Golden matrix with the same enables on every input in from_input..to_input."""
+        matrix = cls(var_ids, inputs)
+        to_input = inputs if to_input is None else to_input
+        matrix.values[from_input - 1:to_input] = np.asarray(row, dtype=bool)
+        matrix.known[from_input - 1:to_input] = True
+        return matrix
+
+    def set(self, input_num: int, var_id: str, value) -> None:
+        col = self.columns[var_id]
+        self.values[input_num - 1, col] = bool(int(value))
+        self.known[input_num - 1, col] = True
+
+    def update(self, input_num: int, results: Mapping[str, object]) -> None:
+        """Record GET results (expanded var id to value) for one input.
+
+        Failed reads (exceptions) and values that are not 0/1 are left unknown.
+        """
+        for col, var_id in enumerate(self.var_ids):
+            value = results.get(expand(var_id, input_num))
+            try:
+                enabled = int(value)
+            except (ValueError, TypeError):
+                continue
+            if enabled not in (0, 1):
+                continue
+            self.values[input_num - 1, col] = bool(enabled)
+            self.known[input_num - 1, col] = True
+
+    def diff(self, other: "TrapMatrix") -> np.ndarray:
+        """Mask of cells known in both matrices whose enables differ."""
+        return self.known & other.known & (self.values != other.values)
+
+    def differing_inputs(self, golden: "TrapMatrix") -> List[int]:
+        """Inputs (1 based) with at least one trap differing from golden."""
+        return (np.flatnonzero(self.diff(golden).any(axis=1)) + 1).tolist()
+
+    def plan(self, target: "TrapMatrix") -> List[Tuple[str, int]]:
+        """Writes that bring this card to target, ordered by input then trap.
+
+        Cells known here to already match the target are skipped; everything
+        else the target knows is written.
+        """
+        mask = target.known & ~(self.known & (self.values == target.values))
+        rows, cols = np.nonzero(mask)
+        return [(expand(self.var_ids[col], row + 1), int(target.values[row, col]))
+                for row, col in zip(rows.tolist(), cols.tolist())]
+
+    def writes(self) -> List[Tuple[str, int]]:
+        """Every known cell as a write, ordered by input then trap."""
+        return TrapMatrix(self.var_ids, self.inputs).plan(self)
+
+
+class FleetTrapState:
+    """TrapMatrix values of several cards stacked into (cards, inputs, traps)."""
+
+    def __init__(self, matrices: Mapping[str, TrapMatrix]):
+        self.cards = list(matrices)
+        first = matrices[self.cards[0]]
+        for ip, matrix in matrices.items():
+            if matrix.var_ids != first.var_ids or matrix.inputs != first.inputs:
+                raise ValueError(f"Card {ip} has a different trap layout")
+        self.var_ids = first.var_ids
+        self.values = np.stack([matrices[ip].values for ip in self.cards])
+        self.known = np.stack([matrices[ip].known for ip in self.cards])
+
+    def card(self, ip: str) -> TrapMatrix:
+        matrix = TrapMatrix(self.var_ids, self.values.shape[1])
+        index = self.cards.index(ip)
+        matrix.values = self.values[index]
+        matrix.known = self.known[index]
+        return matrix
+
+    def diff(self, golden: TrapMatrix) -> np.ndarray:
+        """(cards, inputs, traps) mask of known cells differing from golden."""
+        return self.known & golden.known & (self.values != golden.values)
+
+    def differing_inputs(self, golden: TrapMatrix) -> Dict[str, List[int]]:
+        """For each card that differs from golden, the inputs (1 based) that do."""
+        per_input = self.diff(golden).any(axis=2)
+        return {self.cards[index]: (np.flatnonzero(per_input[index]) + 1).tolist()
+                for index in np.flatnonzero(per_input.any(axis=1)).tolist()}
+
+    def plans(self, golden: TrapMatrix) -> Dict[str, List[Tuple[str, int]]]:
+        """Writes per card to bring every card to golden; cards already matching are left out."""
+        mask = golden.known & ~(self.known & (self.values == golden.values))
+        plans: Dict[str, List[Tuple[str, int]]] = {}
+        for card, row, col in zip(*(axis.tolist() for axis in np.nonzero(mask))):
+            plans.setdefault(self.cards[card], []).append(
+                (expand(self.var_ids[col], row + 1), int(golden.values[row, col])))
+        return plans
+
+
+def expand_templates(templates: Sequence[Tuple[str, int]], inputs: Sequence[int]) -> List[str]:
+    """Expand (template, sub count) pairs into every var id they cover.
+
+    "x" is filled with each input and "y" with 0..sub count-1. Templates
+    without "x" (system parameters) are expanded once.
+    """
+    var_ids = []
+    for template, subs in templates:
+        input_ids = [expand(template, input_num) for input_num in inputs] if "x" in template else [template]
+        for var_id in input_ids:
+            if "y" in var_id:
+                var_ids.extend(var_id.replace("y", str(sub)) for sub in range(subs))
+            else:
+                var_ids.append(var_id)
+    return var_ids
+
+
+def parse_var_ids(templates: Sequence[Tuple[str, int]], inputs: int = MAX_INPUTS) -> Dict[str, Tuple[str, int, int]]:
+    """Map every var id the templates cover to (template, input, sub)."""
+    parsed = {}
+    for template, subs in templates:
+        input_nums = range(1, inputs + 1) if "x" in template else [0]
+        for input_num in input_nums:
+            var_id = template.replace("x", str(input_num - 1)) if input_num else template
+            if "y" in template:
+                for sub in range(subs):
+                    parsed[var_id.replace("y", str(sub))] = (template, input_num, sub)
+            else:
+                parsed[var_id] = (template, input_num, 0)
+    return parsed
+
+
+SNAPSHOT_MAGIC = b"NXSNAP\x00\x01"
+SNAPSHOT_HEADER = struct.Struct("<8sIII")  # magic, meta length, var id dictionary length, value count
+MISSING = np.iinfo(np.int32).min  # Value that could not be read
+
+# Parsed var id dictionaries by their compressed bytes. Archived snapshots of
+# the same firmware share one dictionary, so it is only decoded once.
+_layouts: Dict[bytes, Tuple[List[str], Dict[str, int]]] = {}
+
+
+def _layout(packed: bytes) -> Tuple[List[str], Dict[str, int]]:
+    layout = _layouts.get(packed)
+    if layout is None:
+        var_ids = json.loads(zlib.decompress(packed))
+        layout = (var_ids, {var_id: index for index, var_id in enumerate(var_ids)})
+        _layouts[packed] = layout
+    return layout
+
+
+class Snapshot:
+    """Every parameter value of one card at one point in time.
+
+    On disk a snapshot is a small header, JSON metadata, a zlib compressed
+    var id dictionary and then the values as a packed little-endian int32
+    array. load() memory maps the value array instead of parsing it, and
+    snapshots sharing a dictionary compare with a single array operation.
+    """
+
+    def __init__(self, var_ids: List[str], values: np.ndarray, meta: Optional[Dict] = None,
+                 index: Optional[Dict[str, int]] = None):
+        self.var_ids = var_ids
+        self.values = values
+        self.meta = meta or {}
+        self.index = index if index is not None else {var_id: i for i, var_id in enumerate(var_ids)}
+
+    @classmethod
+    def from_results(cls, results: Mapping[str, object], meta: Optional[Dict] = None) -> "Snapshot":
+        """Build a snapshot from GET results; failed, non-integer or out of int32 reads are stored as MISSING."""
+        values = np.full(len(results), MISSING, dtype="<i4")
+        for i, value in enumerate(results.values()):
+            try:
+                values[i] = int(value)
+            except (ValueError, TypeError, OverflowError):
+                continue
+        return cls(list(results), values, meta)
+
+    def get(self, var_id: str) -> Optional[int]:
+        value = int(self.values[self.index[var_id]])
+        return None if value == MISSING else value
+
+    def to_dict(self) -> Dict[str, int]:
+        return {var_id: int(value) for var_id, value in zip(self.var_ids, self.values.tolist()) if value != MISSING}
+
+    def save(self, path: str) -> None:
+        meta = json.dumps(self.meta).encode()
+        packed = zlib.compress(json.dumps(self.var_ids, separators=(",", ":")).encode(), 9)
+        with open(path, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(meta), len(packed), len(self.var_ids)))
+            f.write(meta)
+            f.write(packed)
+            f.write(b"\0" * (-f.tell() % 4))  # Align the values for the memory map
+            f.write(np.asarray(self.values, dtype="<i4").tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        with open(path, "rb") as f:
+            magic, meta_len, packed_len, count = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a NEXX snapshot")
+            meta = json.loads(f.read(meta_len))
+            packed = f.read(packed_len)
+        var_ids, index = _layout(packed)
+        if len(var_ids) != count:
+            raise ValueError(f"{path} is corrupt")
+        offset = SNAPSHOT_HEADER.size + meta_len + packed_len
+        offset += -offset % 4
+        if count:
+            values = np.memmap(path, dtype="<i4", mode="r", offset=offset, shape=(count,))
+        else:
+            values = np.zeros(0, dtype="<i4")
+        return cls(var_ids, values, meta, index)
+
+    def diff(self, other: "Snapshot") -> List[Tuple[str, Optional[int], Optional[int]]]:
+        """(var id, value here, value in other) for every var id whose value differs.
+
+        Var ids missing from one side are reported with None for that side.
+        """
+        if self.var_ids is other.var_ids or self.var_ids == other.var_ids:
+            changed = np.flatnonzero(self.values != other.values).tolist()
+            return [(self.var_ids[i], self.get(self.var_ids[i]), other.get(self.var_ids[i])) for i in changed]
+        differences = []
+        for var_id in self.var_ids + [var_id for var_id in other.var_ids if var_id not in self.index]:
+            mine = self.get(var_id) if var_id in self.index else None
+            theirs = other.get(var_id) if var_id in other.index else None
+            if mine != theirs:
+                differences.append((var_id, mine, theirs))
+        return differences
+
+    def count_differences(self, other: "Snapshot") -> int:
+        if self.var_ids is other.var_ids:
+            return int(np.count_nonzero(self.values != other.values))
+        return len(self.diff(other))
+
+
+def whole_number(value) -> int:
+    """value as an int. Raises ValueError if it has a fractional part, where int() would truncate."""
+    number = int(value)
+    if not isinstance(value, str) and number != value:
+        raise ValueError(f"{value!r} is not a whole number")
+    return number
+
+
+class RangeTable:
+    """Allowed (min, max) of every var id, as arrays for checking many values at once.
+
+    Built from (template, sub count) pairs and the ranges of the templates
+    that have one; var ids without a range are never flagged.
+    """
+
+    def __init__(self, templates: Sequence[Tuple[str, int]], ranges: Mapping[str, Tuple[int, int]],
+                 inputs: int = MAX_INPUTS):
+        parsed = parse_var_ids([(template, subs) for template, subs in templates if template in ranges], inputs)
+        self.index = {var_id: i for i, var_id in enumerate(parsed)}
+        self.low = np.array([ranges[template][0] for template, _, _ in parsed.values()], dtype=np.int64)
+        self.high = np.array([ranges[template][1] for template, _, _ in parsed.values()], dtype=np.int64)
+
+    def _violations(self, var_ids: Sequence[str], values: np.ndarray,
+                    valid: np.ndarray) -> List[Tuple[str, object, int, int]]:
+        positions = np.array([self.index.get(var_id, -1) for var_id in var_ids], dtype=np.int64)
+        ranged = positions >= 0
+        bad = np.zeros(len(var_ids), dtype=bool)
+        rows = positions[ranged]
+        bad[ranged] = ~valid[ranged] | (values[ranged] < self.low[rows]) | (values[ranged] > self.high[rows])
+        return [(var_ids[i], i, int(self.low[positions[i]]), int(self.high[positions[i]]))
+                for i in np.flatnonzero(bad).tolist()]
+
+    def check(self, writes: Sequence[Tuple[str, object]]) -> List[Tuple[str, object, int, int]]:
+        """(var id, value, min, max) for every write whose value is out of range or not a whole number.
+
+        Whole numbers are ints, integral floats such as 3.0 and strings of an
+        int such as "3"; 0.5 and "0.5" are flagged.
+        """
+        var_ids = [var_id for var_id, _ in writes]
+        raw = [value for _, value in writes]
+        valid = np.ones(len(raw), dtype=bool)
+        values = np.asarray(raw) if raw else np.zeros(0, dtype=np.int64)
+        if values.dtype.kind not in "biu":  # Floats, strings or a mix: casting would truncate, so check each
+            values = np.zeros(len(raw), dtype=np.int64)
+            for i, value in enumerate(raw):
+                try:
+                    values[i] = whole_number(value)
+                except (ValueError, TypeError, OverflowError):
+                    valid[i] = False
+        return [(var_id, raw[i], low, high) for var_id, i, low, high in self._violations(var_ids, values, valid)]
+
+    def check_snapshot(self, snapshot: Snapshot) -> List[Tuple[str, object, int, int]]:
+        """Like check() for every value of a snapshot; values that could not be read are ignored."""
+        values = np.asarray(snapshot.values, dtype=np.int64)
+        violations = self._violations(snapshot.var_ids, values, np.ones(len(values), dtype=bool))
+        return [(var_id, int(values[i]), low, high) for var_id, i, low, high in violations if values[i] != MISSING]
@@ -0,0 +1,97 @@
+import json
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmark import StandInCard
+from nexxapi import ControlServer
+from nexxcapabilities import CapabilityCache
+from nexxclient import RequestEngine, create_transport
+from nexxlock import LockManager
+from nexxscheduler import Scheduler
+
+
+@pytest.fixture
+def card():
+    card = StandInCard().start()
+    yield card
+    card.stop()
+
+
+@pytest.fixture
+def server(tmp_path):
+    engine = RequestEngine(create_transport("asyncio"))
+    scheduler = Scheduler(engine, str(tmp_path / "jobs"), capability_cache=CapabilityCache(str(tmp_path / "caps.json")),
+                          locks=LockManager(str(tmp_path / "locks")))
+    server = ControlServer(scheduler, port=0).start()
+    yield server
+    server.stop()
+    scheduler.stop()
+    scheduler.locks.close()
+    engine.stop()
+
+
+def call(server, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(f"http://127.0.0.1:{server.port}{path}", data, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def raw(server, data):
+    """Send bytes as they are and return the status code of the answer."""
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as connection:
+        connection.sendall(data)
+        connection.shutdown(socket.SHUT_WR)
+        answer = b""
+        while True:
+            chunk = connection.recv(4096)
+            if not chunk:
+                break
+            answer += chunk
+    return int(answer.split()[1])
+
+
+def test_submitted_jobs_run_and_report(server, card):
+    status, job = call(server, "POST", "/jobs", {"kind": "apply", "cards": [card.address], "plan": {"400.0.0@i": 0}})
+    assert status == 201 and job["status"] == "queued" and job["total"] == 1
+    assert [listed["id"] for listed in call(server, "GET", "/jobs")[1]] == [job["id"]]
+    server.scheduler.run_pending()
+    status, report = call(server, "GET", f"/jobs/{job['id']}")
+    assert status == 200 and report["status"] == "done"
+    assert report["cards"][card.address]["completed"] == 1 and card.values == {"400.0.0@i": "0"}
+
+
+def test_out_of_range_plans_are_refused(server, card):
+    status, answer = call(server, "POST", "/jobs", {"cards": [card.address], "plan": {"400.0.0@i": 99}})
+    assert status == 400 and "out of range" in answer["error"]
+    assert server.scheduler.jobs() == []
+
+
+@pytest.mark.parametrize("body", [None, [], {"cards": "10.20.0.11", "plan": {}}, {"cards": ["10.20.0.11"]},
+                                  {"cards": ["10.20.0.11"], "plan": {"400.0.0@i": 1}, "kind": "erase"}])
+def test_bad_job_requests_are_refused(server, body):
+    assert call(server, "POST", "/jobs", body)[0] == 400
+
+
+def test_unknown_jobs_and_routes(server):
+    assert call(server, "GET", "/jobs/nosuchjob")[0] == 404
+    assert call(server, "GET", "/nothing")[0] == 404
+    assert call(server, "PUT", "/jobs")[0] == 405
+
+
+@pytest.mark.parametrize("head", [b"GET /jobs\r\n\r\n",
+                                  b"POST /jobs HTTP/1.1\r\nContent-Length: lots\r\n\r\n",
+                                  b"POST /jobs HTTP/1.1\r\nContent-Length: -5\r\n\r\n"])
+def test_malformed_requests_are_answered_with_400(server, head):
+    assert raw(server, head) == 400
+
+
+def test_the_server_still_answers_after_malformed_requests(server):
+    raw(server, b"POST /jobs HTTP/1.1\r\nContent-Length: lots\r\n\r\n")
+    assert call(server, "GET", "/jobs") == (200, [])
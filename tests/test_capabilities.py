@@ -0,0 +1,82 @@
+import nexxschema
+from nexxcapabilities import CapabilityCache, Capabilities, probe
+from nexxclient import CardClient, ErrorResponse, RequestError, Transport
+
+TEMPLATES = [("511.x.y@i", 16), ("512.x.y@i", 8), ("530.x.y@i", 16), ("531.x.y@i", 8), ("400.x.0@i", 1)]
+INDEXES = {"511.x.y@i": "channel", "512.x.y@i": "pair", "530.x.y@i": None, "531.x.y@i": None}
+
+
+def capabilities(inputs=32, channels=8, missing=()):
+    return Capabilities("card", inputs, channels, missing, TEMPLATES, INDEXES)
+
+
+def test_channel_and_pair_templates_follow_the_card_channels():
+    card = capabilities(channels=8)
+    assert card.supports("511.0.7@i") and not card.supports("511.0.8@i")
+    assert card.supports("512.0.3@i") and not card.supports("512.0.4@i")
+
+
+def test_templates_with_as_many_subs_but_no_channel_index_are_not_limited():
+    card = capabilities(channels=8)
+    assert card.supports("530.0.15@i") and card.supports("531.0.7@i")
+
+
+def test_inputs_and_missing_templates():
+    card = capabilities(inputs=16, missing=["400.x.0@i"])
+    assert not card.supports("400.0.0@i")
+    assert card.supports("511.15.0@i") and not card.supports("511.16.0@i")
+    assert card.supports("999.0.0@i")
+
+
+def test_default_indexes_come_from_the_schema():
+    schema = nexxschema.load()
+    card = Capabilities("card", 32, 4, [], schema.templates())
+    channel = next(template for template, index in schema.indexes().items() if index == "channel")
+    pair = next(template for template, index in schema.indexes().items() if index == "pair")
+    assert not card.supports(channel.replace("x", "0").replace("y", "4"))
+    assert card.supports(pair.replace("x", "0").replace("y", "1"))
+    assert not card.supports(pair.replace("x", "0").replace("y", "2"))
+
+
+class FlakyTransport(Transport):
+    """A card with 16 inputs, one of whose probes times out the first `failures` times it is asked."""
+
+    name = "flaky"
+
+    def __init__(self, failures, flaky="400.7.0@i"):
+        self.failures = failures
+        self.flaky = flaky
+
+    def fetch(self, url, timeout=5.0):
+        var_id = url.split("/")[-1]
+        if var_id == self.flaky and self.failures:
+            self.failures -= 1
+            raise RequestError(f"Timed out fetching {url}")
+        if var_id.startswith("400.") and int(var_id.split(".")[1]) >= 16:
+            raise ErrorResponse(f"HTTP 404 from {url}")
+        return b'{"value": "1"}'
+
+
+def probed(tmp_path, transport):
+    cache = CapabilityCache(str(tmp_path / "capabilities.json"))
+    client = CardClient("10.20.0.11", transport)
+    try:
+        capabilities, _ = probe(client, TEMPLATES, cache, INDEXES)
+    finally:
+        client.stop()
+    return capabilities, CapabilityCache(cache.path).get("10.20.0.11", "1", TEMPLATES, INDEXES)
+
+
+def test_probes_lost_on_the_way_are_asked_again(tmp_path):
+    capabilities, cached = probed(tmp_path, FlakyTransport(failures=1))
+    assert capabilities.inputs == 16 and cached.inputs == 16
+
+
+def test_probes_never_answered_count_as_present_and_are_not_cached(tmp_path):
+    capabilities, cached = probed(tmp_path, FlakyTransport(failures=100))
+    assert capabilities.inputs == 16 and cached is None
+
+
+def test_an_unanswered_template_is_not_missing(tmp_path):
+    capabilities, cached = probed(tmp_path, FlakyTransport(failures=100, flaky="512.0.0@i"))
+    assert capabilities.supports("512.0.0@i") and cached is None
@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+
+from benchmark import StandInCard
+from nexxclient import (AdaptiveWindow, CardClient, RequestEngine, RequestError, Transport, Unsupported,
+                        create_transport)
+
+
+class GatedTransport(Transport):
+    """Records every URL and holds each fetch until the gate opens."""
+
+    name = "gated"
+
+    def __init__(self):
+        self.urls = []
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def fetch(self, url, timeout=5.0):
+        self.urls.append(url)
+        self.started.set()
+        if not self.gate.wait(5):
+            raise RequestError("gate never opened")
+        return b'{"value": "1"}'
+
+
+@pytest.fixture
+def gated():
+    transport = GatedTransport()
+    client = CardClient("10.20.0.11", transport, max_window=1)
+    client.window = AdaptiveWindow(initial=1, maximum=1)
+    yield transport, client
+    transport.gate.set()
+    client.stop()
+
+
+def paths(transport):
+    return [url.split("/EV/")[1] for url in transport.urls]
+
+
+def test_queued_sets_of_one_var_id_are_coalesced(gated):
+    transport, client = gated
+    blocker = client.submit("1")
+    assert transport.started.wait(5)
+    futures = [client.submit("400.0.0@i", value) for value in (1, 0, 1, 0)]
+    assert client.coalesced == 3
+    transport.gate.set()
+    blocker.result(5)
+    assert [future.result(5) for future in futures] == [None] * 4
+    assert paths(transport) == ["GET/parameter/1", "SET/parameter/400.0.0@i/0"]
+
+
+def test_a_get_in_between_ends_coalescing(gated):
+    transport, client = gated
+    client.submit("1")
+    assert transport.started.wait(5)
+    first = client.submit("400.0.0@i", 1)
+    read = client.submit("400.0.0@i")
+    second = client.submit("400.0.0@i", 0)
+    third = client.submit("400.0.0@i", 1)
+    transport.gate.set()
+    assert read.result(5) == "1" and first.result(5) is None and second.result(5) is None and third.result(5) is None
+    assert client.coalesced == 1
+    assert paths(transport) == ["GET/parameter/1", "SET/parameter/400.0.0@i/1", "GET/parameter/400.0.0@i",
+                                "SET/parameter/400.0.0@i/1"]
+
+
+def test_background_sets_are_never_coalesced(gated):
+    transport, client = gated
+    client.submit("1")
+    assert transport.started.wait(5)
+    client.submit("400.0.0@i", 1, background=True)
+    client.submit("400.0.0@i", 0, background=True)
+    assert client.coalesced == 0
+
+
+def test_get_and_set_against_a_stand_in_card():
+    card = StandInCard().start()
+    engine = RequestEngine(create_transport("asyncio"))
+    try:
+        client = engine.client(card.address)
+        assert client.set_many([("400.0.0@i", 0), ("400.1.0@i", 1)]) == []
+        assert client.get_many(["400.0.0@i", "400.1.0@i", "401.0.0@i"]) == {"400.0.0@i": "0", "400.1.0@i": "1",
+                                                                            "401.0.0@i": "1"}
+        assert engine.cache.get(card.address, "400.0.0@i") == "0"
+        assert client.metrics()["sent"] == 5 and client.metrics()["errors"] == 0
+    finally:
+        engine.stop()
+        card.stop()
+
+
+def test_unsupported_var_ids_are_skipped():
+    class OnlyInputOne:
+        @staticmethod
+        def supports(var_id):
+            return var_id.startswith("400.0.")
+
+    transport = GatedTransport()
+    transport.gate.set()
+    client = CardClient("10.20.0.11", transport)
+    client.capabilities = OnlyInputOne()
+    try:
+        assert isinstance(client.get_many(["400.1.0@i"])["400.1.0@i"], Unsupported)
+        assert client.set_many([("400.0.0@i", 1), ("400.1.0@i", 1)]) == []
+        assert client.skipped == 2 and paths(transport) == ["SET/parameter/400.0.0@i/1"]
+    finally:
+        client.stop()
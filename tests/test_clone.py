@@ -0,0 +1,147 @@
+import json
+
+import pytest
+
+from nexxclient import ErrorResponse, RequestEngine, RequestError, Transport, Unsupported
+from nexxclone import clone_card, clone_input, input_pairs, plan_writes
+
+TEMPLATES = [("400.x.0@i", 1), ("511.x.y@i", 2), ("1009", 1)]
+SOURCE = "10.20.0.11"
+STUCK = "10.20.0.12"
+FLAKY = "10.20.0.13"
+
+
+class CardsTransport(Transport):
+    """Cards answering from dicts of values.
+
+    Var ids a card does not have answer 404, SETs of stuck (ip, var id)
+    pairs are ignored and those of broken ones fail.
+    """
+
+    name = "cards"
+
+    def __init__(self, cards, stuck=(), broken=()):
+        self.cards = cards
+        self.stuck = set(stuck)
+        self.broken = set(broken)
+
+    def fetch(self, url, timeout=5.0):
+        ip = url.split("/")[2]
+        action, _, var_id, *value = url.split("/EV/")[1].split("/")
+        values = self.cards[ip]
+        if var_id not in values:
+            raise ErrorResponse(f"HTTP 404 from {url}")
+        if action == "SET":
+            if (ip, var_id) in self.broken:
+                raise RequestError(f"Timed out fetching {url}")
+            if (ip, var_id) not in self.stuck:
+                values[var_id] = value[0]
+            return b"{}"
+        return json.dumps({"value": values[var_id]}).encode()
+
+
+class Lacking:
+    """Capabilities of a card without the var ids that start with prefix."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    def supports(self, var_id):
+        return not var_id.startswith(self.prefix)
+
+
+@pytest.fixture
+def engine():
+    engine = RequestEngine(CardsTransport({}))
+    yield engine
+    engine.stop()
+
+
+def test_input_pairs_leave_out_card_wide_templates_and_the_source():
+    assert input_pairs(TEMPLATES, 1, [1, 2, 3]) == [
+        ("400.0.0@i", "400.1.0@i"), ("400.0.0@i", "400.2.0@i"),
+        ("511.0.0@i", "511.1.0@i"), ("511.0.0@i", "511.2.0@i"),
+        ("511.0.1@i", "511.1.1@i"), ("511.0.1@i", "511.2.1@i")]
+
+
+def test_plan_writes_only_what_differs():
+    pairs = [("a", "a2"), ("b", "b2"), ("c", "c2"), ("d", "d2"), ("e", "e2"), ("e", "e3")]
+    report = plan_writes(pairs, {"a": "1", "b": 2, "c": 3, "d": None, "e": RequestError("lost")},
+                         {"a2": 1, "b2": 0, "c2": Unsupported("c2")})
+    assert report.writes == [("b2", 2)]
+    assert (report.unchanged, report.unsupported, report.unreadable) == (1, 1, ["d", "e"])
+
+
+def test_targets_that_could_not_be_read_are_written():
+    report = plan_writes([("a", "a2")], {"a": 1}, {"a2": RequestError("lost")})
+    assert report.writes == [("a2", 1)] and report.unchanged == 0
+
+
+def test_clone_input_copies_the_differing_values(engine):
+    engine.transport.cards[SOURCE] = {"400.0.0@i": "0", "400.1.0@i": "1", "400.2.0@i": "0", "511.0.0@i": "-20",
+                                      "511.1.0@i": "-20", "511.0.1@i": "-18", "511.1.1@i": "0"}
+    client = engine.client(SOURCE)
+    client.capabilities = Lacking("511.2.")
+    report = clone_input(client, TEMPLATES, 1, [2, 3])
+    assert sorted(report.writes) == [("400.1.0@i", "0"), ("511.1.1@i", "-18")]
+    assert report.failed == [] and report.unchanged == 2
+    assert report.unreadable == [] and report.unsupported == 2
+    assert engine.transport.cards[SOURCE]["511.1.1@i"] == "-18"
+    assert report.summary().startswith("2 values written, 2 already matching, 0 failed")
+
+
+def test_clone_input_reports_unreadable_source_values(engine):
+    engine.transport.cards[SOURCE] = {"400.0.0@i": "0", "400.1.0@i": "1"}
+    report = clone_input(engine.client(SOURCE), TEMPLATES[:2], 1, [2])
+    assert report.writes == [("400.1.0@i", "0")]
+    assert report.unreadable == ["511.0.0@i", "511.0.1@i"]
+    assert "2 source values could not be read" in report.summary()
+
+
+def test_a_cancelled_clone_input_has_no_failures(engine):
+    engine.transport.cards[SOURCE] = {"400.0.0@i": "0", "400.1.0@i": "1"}
+    report = clone_input(engine.client(SOURCE), TEMPLATES[:1], 1, [2], write=lambda writes: None)
+    assert report.failed is None and engine.transport.cards[SOURCE]["400.1.0@i"] == "1"
+
+
+@pytest.fixture
+def cards(engine):
+    engine.transport.cards.update({SOURCE: {"400.0.0@i": "0", "400.1.0@i": "0", "400.2.0@i": "0"},
+                                   STUCK: {"400.0.0@i": "1", "400.1.0@i": "0", "400.2.0@i": "1"},
+                                   FLAKY: {"400.0.0@i": "1", "400.1.0@i": "1", "400.2.0@i": "1"}})
+    engine.transport.stuck.add((STUCK, "400.2.0@i"))
+    engine.transport.broken.add((FLAKY, "400.1.0@i"))
+    engine.client(FLAKY).capabilities = Lacking("400.2.")
+    return engine.transport.cards
+
+
+def test_clone_card_writes_and_verifies_every_destination(engine, cards):
+    reports = clone_card(engine, TEMPLATES[:1], SOURCE, [STUCK, SOURCE, FLAKY, STUCK], inputs=3)
+    assert sorted(reports) == [STUCK, FLAKY]
+
+    stuck = reports[STUCK]
+    assert stuck.writes == [("400.0.0@i", "0"), ("400.2.0@i", "0")] and stuck.failed == []
+    assert stuck.unchanged == 1 and stuck.mismatched == ["400.2.0@i"]
+    assert stuck.summary().endswith(", 1 differ on read back")
+
+    flaky = reports[FLAKY]
+    assert flaky.writes == [("400.0.0@i", "0"), ("400.1.0@i", "0")] and flaky.unsupported == 1
+    assert [var_id for var_id, _ in flaky.failed] == ["400.1.0@i"] and flaky.mismatched == []
+    assert flaky.summary().endswith(", 1 not supported by the card, all verified")
+    assert cards[FLAKY] == {"400.0.0@i": "0", "400.1.0@i": "1", "400.2.0@i": "1"}
+
+
+def test_clone_card_verifies_nothing_when_cancelled_or_asked_not_to(engine, cards):
+    reports = clone_card(engine, TEMPLATES[:1], SOURCE, [STUCK], inputs=3, write=lambda ip, writes: None)
+    assert reports[STUCK].failed is None and reports[STUCK].mismatched is None
+    assert cards[STUCK]["400.0.0@i"] == "1"
+    reports = clone_card(engine, TEMPLATES[:1], SOURCE, [STUCK], inputs=3, verify=False)
+    assert reports[STUCK].failed == [] and reports[STUCK].mismatched is None
+    assert cards[STUCK]["400.0.0@i"] == "0"
+
+
+def test_clone_card_reports_unreadable_source_values(engine, cards):
+    del cards[SOURCE]["400.1.0@i"]
+    reports = clone_card(engine, TEMPLATES[:1], SOURCE, [FLAKY], inputs=3)
+    assert reports[FLAKY].unreadable == ["400.1.0@i"] and reports[FLAKY].failed == []
+    assert reports[FLAKY].writes == [("400.0.0@i", "0")] and reports[FLAKY].mismatched == []
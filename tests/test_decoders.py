@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from nexxclient import DECODERS, Decoder, FastDecoder, JsonDecoder, create_decoder
+
+BODIES = [b'{"value": "12"}', b'{"value":"x"}', b'{"value": ""}', b'{"value": 5}', b'{"value": 0}', b'{"value": -3}',
+          b'{"value": 1.5}', b'{"value": "a\\"b"}', b'{"value": "\\u00e9"}', '{"value": "é"}'.encode(),
+          b'{"value": null}', b'{"other": 1}', b'{"value": "1", "x": 2}', b' {"value": "1"} ', b'{"value": [1]}',
+          b'{"value": true}', '{"value": "s"}', b'{"value": 012}', b'', b'nope', b'[1]', b'{"value": "}', b'"value"']
+
+
+def installed():
+    names = []
+    for name in DECODERS:
+        try:
+            create_decoder(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def outcome(decoder, body):
+    try:
+        value = decoder.decode(body)
+    except (ValueError, AttributeError) as e:
+        return type(e) if isinstance(e, AttributeError) else ValueError
+    return type(value), value
+
+
+@pytest.mark.parametrize("name", installed())
+@pytest.mark.parametrize("body", BODIES)
+def test_decoders_agree_with_json(name, body):
+    assert outcome(create_decoder(name), body) == outcome(JsonDecoder(), body)
+
+
+def test_fast_decoder_agrees_on_stand_in_card_bodies():
+    fast, reference = FastDecoder(), JsonDecoder()
+    for value in ["0", "1", "-100", "999", "Input 1", "x" * 200, 0, 7, 2 ** 40]:
+        body = json.dumps({"value": value}).encode()
+        assert outcome(fast, body) == outcome(reference, body)
+
+
+def test_fast_decoder_falls_back_for_other_shapes():
+    calls = []
+
+    class Recording(JsonDecoder):
+        def decode(self, content):
+            calls.append(content)
+            return super().decode(content)
+
+    fast = FastDecoder(Recording())
+    assert fast.decode(b'{"value": "3"}') == "3" and calls == []
+    assert fast.decode(b'{"value": 1.5}') == 1.5 and calls == [b'{"value": 1.5}']
+
+
+def test_default_decoder_is_orjson_or_fast():
+    assert create_decoder().name in ("orjson", "fast")
+
+
+def test_unknown_decoder_and_missing_decode():
+    with pytest.raises(ValueError):
+        create_decoder("yaml")
+
+    class Incomplete(Decoder):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,38 @@
+import pytest
+
+from benchmark import StandInCard
+from nexxdiscovery import MAX_ADDRESSES, host_count, hosts, scan
+
+
+@pytest.mark.parametrize("cidr, count", [("10.20.0.0/24", 254), ("10.20.0.7", 1), ("10.20.0.6/31", 2),
+                                         ("10.20.0.9/30", 2), ("10.0.0.0/16", 65534)])
+def test_host_count_matches_hosts(cidr, count):
+    assert host_count(cidr) == count
+    if count < 1000:
+        assert len(list(hosts(cidr))) == count
+
+
+@pytest.mark.parametrize("cidr", ["10.0.0.0/8", "10.0.0.0/15", "::/64", "fe80::1", "10.20.0.300/24", "nonsense"])
+def test_too_large_ipv6_and_invalid_ranges_are_refused(cidr):
+    with pytest.raises(ValueError):
+        host_count(cidr)
+    with pytest.raises(ValueError):
+        hosts(cidr)
+
+
+def test_hosts_is_lazy():
+    addresses = hosts("10.0.0.0/16")
+    assert next(addresses) == "10.0.0.1" and MAX_ADDRESSES == 65536
+
+
+def test_scan_finds_a_card_and_reports_progress():
+    card = StandInCard().start()
+    try:
+        card.values["1"] = "NEXX-1"
+        port = card.server_address[1]
+        progress = []
+        found = scan("127.0.0.1/30", port, timeout=1, progress=lambda done, total: progress.append((done, total)))
+    finally:
+        card.stop()
+    assert found == [("127.0.0.1", "NEXX-1")]
+    assert progress[-1] == (2, 2)
@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+import nexxfleet
+from nexxlock import LockManager
+
+
+def test_apply_reports_the_locked_cards(tmp_path, capsys):
+    plan = tmp_path / "plan.json"
+    plan.write_text(json.dumps({"400.0.0@i": 1}))
+    other = LockManager(str(tmp_path), owner="other")
+    assert other.acquire("10.20.0.12", "apply job")
+    try:
+        with pytest.raises(SystemExit) as exit:
+            nexxfleet.main(["apply", "--cards", "10.20.0.11,10.20.0.12", "--plan", str(plan), "--locks",
+                            str(tmp_path), "--processes", "1"])
+    finally:
+        other.close()
+    assert exit.value.code == 1
+    assert "10.20.0.12: other since" in capsys.readouterr().err
+    assert LockManager(str(tmp_path)).locks() == []
+
+
+def test_cards_are_sharded_round_robin():
+    with nexxfleet.FleetExecutor(processes=2) as fleet:
+        assert fleet.shards(["a", "b", "c", "a"]) == [["a", "c"], ["b"]]
+        assert fleet.shards(["a"]) == [["a"]]
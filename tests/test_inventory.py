@@ -0,0 +1,78 @@
+import sqlite3
+import time
+
+import pytest
+
+import nexxinventory
+from nexxinventory import Inventory
+
+TEMPLATES = [("400.x.0@i", 1), ("511.x.y@i", 16)]
+
+
+@pytest.fixture
+def inventory(tmp_path, monkeypatch):
+    monkeypatch.setattr(nexxinventory, "FLUSH_INTERVAL", 60.0)  # Only flushes the tests ask for
+    inventory = Inventory(str(tmp_path / "inventory.sqlite"), TEMPLATES)
+    yield inventory
+    inventory.close()
+
+
+def stored(inventory):
+    """Rows on disk, read without flushing."""
+    with sqlite3.connect(inventory.path) as db:
+        return db.execute("SELECT card, var_id, value FROM params ORDER BY card, var_id").fetchall()
+
+
+def test_records_are_written_in_batches(inventory, monkeypatch):
+    monkeypatch.setattr(nexxinventory, "FLUSH_SIZE", 3)
+    inventory.record("10.20.0.11", "400.0.0@i", "1")
+    inventory.record("10.20.0.11", "400.1.0@i", "0")
+    assert stored(inventory) == []
+    inventory.record("10.20.0.12", "400.0.0@i", "1")
+    assert stored(inventory) == [("10.20.0.11", "400.0.0@i", 1), ("10.20.0.11", "400.1.0@i", 0),
+                                 ("10.20.0.12", "400.0.0@i", 1)]
+
+
+def test_values_are_keyed_by_template_input_and_sub(inventory):
+    inventory.record("10.20.0.11", "511.2.5@i", "-20", when=10.0)
+    inventory.record("10.20.0.11", "511.2.5@i", "-18", when=20.0)
+    inventory.record("10.20.0.11", "1009", "NEXX v2")
+    assert inventory.query("511.x.y@i") == [("10.20.0.11", 3, 5, -18, 20.0)]
+    assert [row[1:4] for row in inventory.query("1009")] == [(0, 0, "NEXX v2")]
+
+
+def test_query_filters(inventory):
+    for card in ("10.20.0.12", "10.20.0.11"):
+        for input_num in range(3):
+            inventory.record(card, f"400.{input_num}.0@i", input_num % 2, when=1.0)
+    assert [row[:3] for row in inventory.query("400.x.0@i", value=0)] == [
+        ("10.20.0.11", 1, 0), ("10.20.0.11", 3, 0), ("10.20.0.12", 1, 0), ("10.20.0.12", 3, 0)]
+    assert [row[:2] for row in inventory.query("400.x.0@i", input_num=2)] == [("10.20.0.11", 2), ("10.20.0.12", 2)]
+    assert [row[1] for row in inventory.query("400.x.0@i", card="10.20.0.12", value=1)] == [2]
+    assert inventory.query("511.x.y@i") == []
+
+
+def test_max_age_leaves_out_old_values(inventory):
+    inventory.record("10.20.0.11", "400.0.0@i", 1, when=time.time() - 3600)
+    inventory.record("10.20.0.11", "400.1.0@i", 1)
+    assert [row[1] for row in inventory.query("400.x.0@i", max_age=60)] == [2]
+    assert len(inventory.query("400.x.0@i")) == 2
+
+
+def test_cards_keep_when_they_were_last_seen(inventory):
+    inventory.record("10.20.0.11", "400.0.0@i", 1, when=20.0)
+    inventory.record("10.20.0.12", "400.0.0@i", 1, when=15.0)
+    inventory.flush()
+    inventory.record("10.20.0.11", "400.1.0@i", 1, when=10.0)
+    inventory.record("10.20.0.12", "400.1.0@i", 1, when=30.0)
+    assert inventory.cards() == [("10.20.0.11", 20.0), ("10.20.0.12", 30.0)]
+
+
+def test_values_survive_reopening(inventory):
+    inventory.record("10.20.0.11", "400.0.0@i", 0)
+    inventory.close()
+    reopened = Inventory(inventory.path, TEMPLATES)
+    try:
+        assert [row[:4] for row in reopened.query("400.x.0@i")] == [("10.20.0.11", 1, 0, 0)]
+    finally:
+        reopened.close()
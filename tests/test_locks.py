@@ -0,0 +1,184 @@
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from nexxlock import CardLocked, LockManager
+
+IP = "10.20.0.11"
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path)
+
+
+def plant(directory, ip, expires, owner="crashed"):
+    """A lock file as left by an instance that is gone, created the way real locks are."""
+    manager = LockManager(directory)
+    temporary = manager.path(ip) + ".planted"
+    with open(temporary, "w") as f:
+        json.dump({"ip": ip, "owner": owner, "token": owner, "job": "", "acquired": 0.0, "expires": expires}, f)
+    try:
+        os.link(temporary, manager.path(ip))
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.unlink(temporary)
+
+
+def test_only_one_instance_holds_a_card(directory):
+    a, b = LockManager(directory, owner="a"), LockManager(directory, owner="b")
+    assert a.acquire(IP, "job 1")
+    assert not b.acquire(IP)
+    assert b.check(IP).owner == "a" and b.check(IP).job == "job 1"
+    assert a.check(IP) is None
+    a.release(IP)
+    assert b.check(IP) is None and b.acquire(IP)
+    b.close()
+    a.close()
+
+
+def test_acquire_is_reentrant(directory):
+    a, b = LockManager(directory, owner="a"), LockManager(directory, owner="b")
+    assert a.acquire(IP) and a.acquire(IP)
+    a.release(IP)
+    assert a.holds(IP) and b.check(IP) is not None
+    a.release(IP)
+    assert not a.holds(IP) and b.check(IP) is None
+    assert not os.path.exists(a.path(IP))
+    a.close()
+
+
+def test_close_releases_every_lock(directory):
+    a, b = LockManager(directory, owner="a"), LockManager(directory, owner="b")
+    assert a.acquire(IP) and a.acquire(IP) and a.acquire("10.20.0.12")
+    a.close()
+    assert not a.holds(IP) and not a.holds("10.20.0.12") and a.locks() == []
+    assert b.acquire(IP) and b.acquire("10.20.0.12")
+    b.close()
+
+
+def test_expired_and_corrupt_locks_are_taken_over(directory):
+    a = LockManager(directory, owner="a")
+    assert plant(directory, IP, time.time() - 1)
+    assert a.holder(IP) is None
+    assert a.acquire(IP)
+    a.release(IP)
+    with open(a.path("10.20.0.12"), "w") as f:
+        f.write("not json")
+    assert a.acquire("10.20.0.12")
+    a.close()
+
+
+def test_live_locks_are_not_taken_over(directory):
+    assert plant(directory, IP, time.time() + 60, owner="alive")
+    a = LockManager(directory)
+    assert not a.acquire(IP)
+    assert a.holder(IP).owner == "alive"
+
+
+def test_breaking_a_lock_taken_over_meanwhile_leaves_it(directory, monkeypatch):
+    a, b, c = (LockManager(directory, owner=owner) for owner in "abc")
+    assert plant(directory, IP, time.time() - 1)
+    assert a.acquire(IP)  # b read the expired lock before a took it over, and breaks it only now
+    read = LockManager._read_path
+    raced = []
+
+    def read_while_c_acquires(path):
+        holder = read(path)
+        if not raced:
+            raced.append(None)  # c's own reads must not race again
+            raced[0] = c.acquire(IP)
+        return holder
+
+    monkeypatch.setattr(LockManager, "_read_path", staticmethod(read_while_c_acquires))
+    b._break(IP)
+    monkeypatch.undo()
+    assert raced == [False]
+    assert c.check(IP).owner == "a" and a.check(IP) is None
+    a.close()
+
+
+def test_heartbeat_keeps_the_lease(directory):
+    a, b = LockManager(directory, ttl=0.6, owner="a"), LockManager(directory, ttl=0.6, owner="b")
+    assert a.acquire(IP)
+    time.sleep(1.5)
+    assert b.check(IP) is not None and not b.acquire(IP)
+    a.close()
+    assert b.acquire(IP)
+    b.close()
+
+
+def test_wait_for_a_release(directory):
+    a, b = LockManager(directory, owner="a"), LockManager(directory, owner="b")
+    assert a.acquire(IP)
+    start = time.monotonic()
+    assert not b.acquire(IP, wait=0.3)
+    assert time.monotonic() - start >= 0.3
+    a.release(IP)
+    assert b.acquire(IP, wait=1)
+    b.close()
+
+
+def test_hold_releases_what_it_took_when_a_card_is_locked(directory):
+    a, b = LockManager(directory, owner="a"), LockManager(directory, owner="b")
+    assert a.acquire("10.20.0.12")
+    with pytest.raises(CardLocked) as raised:
+        with b.hold(["10.20.0.12", "10.20.0.11"]):
+            pass
+    assert raised.value.holder.owner == "a"
+    assert a.check("10.20.0.11") is None
+    a.close()
+
+
+def test_locks_lists_unexpired_locks(directory):
+    a = LockManager(directory, owner="a")
+    a.acquire(IP)
+    plant(directory, "10.20.0.12", time.time() - 1)
+    assert [holder.ip for holder in a.locks()] == [IP]
+    a.close()
+
+
+def _contend(directory, rounds, inside, overlaps):
+    manager = LockManager(directory, owner=f"worker {os.getpid()}")
+    for _ in range(rounds):
+        if not manager.acquire(IP, wait=30):
+            continue
+        try:
+            os.close(os.open(inside, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            overlaps.value += 1
+        else:
+            time.sleep(0.002)
+            os.unlink(inside)
+        manager.release(IP)
+    manager.close()
+
+
+def _crash_repeatedly(directory, stop):
+    # Keeps leaving expired locks behind, so the workers keep taking them over
+    while not stop.is_set():
+        plant(directory, IP, time.time() - 1)
+        time.sleep(0.001)
+
+
+def test_processes_contending_for_one_card_never_overlap(directory):
+    context = multiprocessing.get_context("spawn")
+    overlaps = context.Value("i", 0)
+    stop = context.Event()
+    inside = os.path.join(directory, "inside")
+    crasher = context.Process(target=_crash_repeatedly, args=(directory, stop))
+    workers = [context.Process(target=_contend, args=(directory, 40, inside, overlaps)) for _ in range(6)]
+    crasher.start()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(120)
+    stop.set()
+    crasher.join(10)
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert overlaps.value == 0
@@ -0,0 +1,129 @@
+from concurrent.futures import Future
+
+import pytest
+
+from nexxmonitor import DriftMonitor
+
+IP = "10.20.0.11"
+
+
+class FakeEngine:
+    """Stands in for the request engine: every read waits until the test answers it."""
+
+    def __init__(self):
+        self.pending = []  # ((ip, var id), future) of reads not answered yet
+
+    def client(self, ip):
+        engine = self
+
+        class Client:
+            @staticmethod
+            def submit(var_id, background=False):
+                future = Future()
+                engine.pending.append(((ip, var_id), future))
+                return future
+
+        return Client
+
+    def read(self):
+        return [key[1] for key, _ in self.pending]
+
+    def answer(self, values):
+        pending, self.pending = self.pending, []
+        for (_, var_id), future in pending:
+            if isinstance(values[var_id], Exception):
+                future.set_exception(values[var_id])
+            else:
+                future.set_result(values[var_id])
+
+
+@pytest.fixture
+def engine():
+    return FakeEngine()
+
+
+def test_each_watched_parameter_is_polled_once_a_round(engine):
+    monitor = DriftMonitor(engine, budget=100)
+    for var_id in ("a", "b", "c", "a"):
+        monitor.watch(IP, var_id, 1)
+    assert monitor.poll() == 3 and engine.read() == ["a", "b", "c"]
+
+
+def test_unwatched_parameters_leave_the_rotation(engine):
+    monitor = DriftMonitor(engine, budget=2)
+    for var_id in ("a", "b", "c", "d"):
+        monitor.watch(IP, var_id, 1)
+    monitor.unwatch(IP, ["a", "b", "c"])
+    assert list(monitor._rotation) == [(IP, "d")]
+    monitor.watch(IP, "b", 1)
+    assert monitor.poll() == 2 and engine.read() == ["d", "b"]
+    monitor.unwatch(IP, ["b", "d"])
+    assert not monitor._rotation and monitor.poll() == 0
+
+
+@pytest.fixture
+def drifts():
+    return []
+
+
+@pytest.fixture
+def monitor(engine, drifts):
+    monitor = DriftMonitor(engine, budget=100, on_drift=lambda *drift: drifts.append(drift))
+    monitor.watch(IP, "400.0.0@i", "1")
+    monitor.watch(IP, "400.1.0@i", 1)
+    return monitor
+
+
+def test_changes_on_the_card_are_reported_once(engine, monitor, drifts):
+    monitor.poll()
+    engine.answer({"400.0.0@i": "0", "400.1.0@i": "1"})
+    assert drifts == [(IP, "400.0.0@i", 1, 0)]
+    assert monitor.drifted(IP) == {"400.0.0@i": (1, 0)} and monitor.drifted("10.20.0.12") == {}
+    monitor.poll()
+    engine.answer({"400.0.0@i": 0, "400.1.0@i": "1"})
+    assert len(drifts) == 1
+
+
+def test_a_value_changed_back_is_reported_and_cleared(engine, monitor, drifts):
+    monitor.poll()
+    engine.answer({"400.0.0@i": "0", "400.1.0@i": "1"})
+    monitor.poll()
+    engine.answer({"400.0.0@i": "1", "400.1.0@i": "1"})
+    assert drifts == [(IP, "400.0.0@i", 1, 0), (IP, "400.0.0@i", 1, 1)]
+    assert monitor.drifted(IP) == {}
+
+
+def test_failed_and_unwatched_reads_are_ignored(engine, monitor, drifts):
+    monitor.poll()
+    monitor.unwatch(IP, ["400.1.0@i"])
+    engine.answer({"400.0.0@i": TimeoutError(), "400.1.0@i": "0"})
+    assert drifts == [] and monitor.drifted(IP) == {}
+
+
+def test_conflicts_are_writes_over_external_changes(engine, monitor):
+    monitor.poll()
+    engine.answer({"400.0.0@i": "0", "400.1.0@i": "1"})
+    assert monitor.conflicts(IP, [("400.0.0@i", 1), ("400.1.0@i", 0)]) == [("400.0.0@i", 1, 0, 1)]
+    assert monitor.conflicts(IP, [("400.0.0@i", "0")]) == []
+    assert monitor.conflicts("10.20.0.12", [("400.0.0@i", 1)]) == []
+
+
+def test_rebase_takes_written_values_as_loaded(engine, monitor, drifts):
+    monitor.poll()
+    engine.answer({"400.0.0@i": "0", "400.1.0@i": "1"})
+    assert monitor.rebase(IP, [("400.0.0@i", 1), ("400.1.0@i", 0), ("400.2.0@i", 0)]) == ["400.0.0@i"]
+    assert monitor.drifted(IP) == {}
+    monitor.poll()
+    engine.answer({"400.0.0@i": "1", "400.1.0@i": "0"})
+    assert len(drifts) == 1 and monitor.drifted(IP) == {}
+
+
+def test_outstanding_reads_count_against_the_budget(engine):
+    monitor = DriftMonitor(engine, budget=3)
+    for input_num in range(5):
+        monitor.watch(IP, f"400.{input_num}.0@i", 1)
+    assert monitor.poll() == 3
+    assert monitor.poll() == 0
+    engine.answer(dict.fromkeys(engine.read(), "1"))
+    assert monitor.poll() == 3 and engine.read() == ["400.3.0@i", "400.4.0@i", "400.0.0@i"]
+    assert monitor.polled == 6
@@ -0,0 +1,54 @@
+import pytest
+
+from nexxstate import RangeTable, Snapshot, whole_number
+
+TEMPLATES = [("343@i", 1), ("530.y.0@i", 4)]
+RANGES = {"343@i": (0, 10), "530.y.0@i": (-5, 5)}
+
+
+@pytest.fixture
+def table():
+    return RangeTable(TEMPLATES, RANGES, inputs=2)
+
+
+def test_in_range_ints_pass(table):
+    assert table.check([("343@i", 0), ("343@i", 10), ("530.3.0@i", -5)]) == []
+
+
+def test_out_of_range_ints_are_flagged_with_their_range(table):
+    assert table.check([("343@i", 11), ("530.1.0@i", -6)]) == [("343@i", 11, 0, 10), ("530.1.0@i", -6, -5, 5)]
+
+
+def test_unranged_var_ids_are_never_flagged(table):
+    assert table.check([("999@i", 12345), ("999@i", "junk")]) == []
+
+
+@pytest.mark.parametrize("value", [0.5, 2.25, -0.1, float("nan"), float("inf")])
+def test_fractional_floats_are_flagged(table, value):
+    assert [var_id for var_id, *_ in table.check([("343@i", value)])] == ["343@i"]
+
+
+def test_integral_floats_pass(table):
+    assert table.check([("343@i", 3.0), ("530.0.0@i", -5.0)]) == []
+
+
+@pytest.mark.parametrize("value, flagged", [("4", False), ("-5", True), ("0.5", True), ("4.0", True),
+                                            ("", True), ("four", True)])
+def test_numeric_strings(table, value, flagged):
+    assert bool(table.check([("343@i", value)])) == flagged
+
+
+def test_mixed_values_are_checked_one_by_one(table):
+    violations = table.check([("343@i", 1), ("343@i", "2"), ("343@i", 2.5), ("343@i", None), ("343@i", 2 ** 70)])
+    assert [value for _, value, _, _ in violations] == [2.5, None, 2 ** 70]
+
+
+def test_whole_number():
+    assert whole_number(3.0) == 3 and whole_number("7") == 7 and whole_number(True) == 1
+    with pytest.raises(ValueError):
+        whole_number(3.5)
+
+
+def test_check_snapshot_ignores_missing_values(table):
+    snapshot = Snapshot.from_results({"343@i": 11, "530.0.0@i": "x", "530.1.0@i": 2})
+    assert table.check_snapshot(snapshot) == [("343@i", 11, 0, 10)]
@@ -0,0 +1,125 @@
+import datetime
+
+import pytest
+
+from benchmark import StandInCard
+from nexxcapabilities import CapabilityCache
+from nexxclient import RequestEngine, create_transport
+from nexxlock import LockManager
+from nexxscheduler import APPLY, DIFF, DONE, PAUSED, QUEUED, Job, Scheduler, Window
+
+OPEN = datetime.datetime(2026, 1, 1, 2, 0)
+CLOSED = datetime.datetime(2026, 1, 1, 5, 0)
+
+
+class Clock:
+    """Inside 01:00-04:00 for the next `ticks` looks at the time, outside after."""
+
+    def __init__(self, ticks=1000):
+        self.ticks = ticks
+
+    def __call__(self):
+        self.ticks -= 1
+        return OPEN if self.ticks >= 0 else CLOSED
+
+
+@pytest.fixture
+def card():
+    card = StandInCard().start()
+    yield card
+    card.stop()
+
+
+@pytest.fixture
+def make_scheduler(tmp_path):
+    made = []
+
+    def make(clock=None, chunk=64):
+        engine = RequestEngine(create_transport("asyncio"))
+        scheduler = Scheduler(engine, str(tmp_path / "jobs"), chunk,
+                              CapabilityCache(str(tmp_path / "capabilities.json")), clock or Clock(),
+                              locks=LockManager(str(tmp_path / "locks")))
+        made.append(scheduler)
+        return scheduler
+
+    yield make
+    for scheduler in made:
+        scheduler.stop()
+        scheduler.locks.close()
+        scheduler.engine.stop()
+
+
+def test_apply_writes_the_plan_to_the_card(make_scheduler, card):
+    scheduler = make_scheduler()
+    job = scheduler.submit([("400.0.0@i", 0), ("400.1.0@i", 1)], [card.address])
+    [job] = scheduler.run_pending()
+    assert job.status == DONE and job.remaining == 0
+    assert card.values == {"400.0.0@i": "0", "400.1.0@i": "1"}
+    assert not scheduler.locks.holds(card.address)
+
+
+def test_diff_reports_what_differs(make_scheduler, card):
+    card.values["400.1.0@i"] = "0"
+    scheduler = make_scheduler()
+    scheduler.submit([("400.0.0@i", 1), ("400.1.0@i", 1)], [card.address], kind=DIFF)
+    [job] = scheduler.run_pending()
+    assert job.status == DONE
+    assert job.cards[card.address].differences == [("400.1.0@i", 1, "0")]
+
+
+def test_a_repeated_var_id_keeps_its_last_value(make_scheduler, card):
+    scheduler = make_scheduler()
+    job = scheduler.submit([("400.0.0@i", 1), ("400.1.0@i", 1), ("400.0.0@i", 0)], [card.address])
+    assert job.writes == [("400.0.0@i", 0), ("400.1.0@i", 1)] and job.size == 2
+    [job] = scheduler.run_pending()
+    assert job.status == DONE and card.values["400.0.0@i"] == "0"
+
+
+def test_a_diff_repeating_a_var_id_finishes(make_scheduler, card):
+    scheduler = make_scheduler()
+    job = scheduler.submit([("400.0.0@i", 1), ("400.0.0@i", 1)], [card.address], kind=DIFF)
+    assert job.size == 1
+    [job] = scheduler.run_pending()
+    assert job.status == DONE and job.remaining == 0
+
+
+def test_a_saved_diff_repeating_a_var_id_finishes(make_scheduler, card):
+    scheduler = make_scheduler()
+    scheduler.save(Job("repeated", "", [("400.0.0@i", 1), ("400.0.0@i", 1)], [card.address], kind=DIFF))
+    [job] = scheduler.run_pending()
+    assert job.status == DONE and job.remaining == 0
+
+
+def test_an_unfinished_job_without_a_window_is_paused(make_scheduler, card, monkeypatch):
+    scheduler = make_scheduler()
+    monkeypatch.setattr(scheduler, "_run_card", lambda job, ip: None)
+    scheduler.submit([("400.0.0@i", 1)], [card.address])
+    [job] = scheduler.run_pending()
+    assert job.status == PAUSED and job.message == "Stopped before finishing, retrying"
+
+
+def test_a_job_waits_for_its_window(make_scheduler, card):
+    scheduler = make_scheduler(Clock(ticks=0))
+    job = scheduler.submit([("400.0.0@i", 0)], [card.address], Window.parse("01:00-04:00"))
+    assert scheduler.run_pending() == []
+    assert scheduler.job(job.id).status == QUEUED and card.values == {}
+    scheduler.clock.ticks = 1000
+    [job] = scheduler.run_pending()
+    assert job.status == DONE and card.values == {"400.0.0@i": "0"}
+
+
+def test_a_job_paused_by_its_window_resumes_after_a_restart(make_scheduler, card):
+    writes = [(f"400.{i}.0@i", 0) for i in range(3)]
+    # One look when dispatching, then one before each chunk: the window closes before the third write
+    scheduler = make_scheduler(Clock(ticks=3), chunk=1)
+    job = scheduler.submit(writes, [card.address], Window.parse("01:00-04:00"), kind=APPLY)
+    [job] = scheduler.run_pending()
+    assert job.status == PAUSED and job.message.startswith("Window closed, resuming at 2026-01-02 01:00")
+    assert job.cards[card.address].done == 2 and len(card.values) == 2
+    scheduler.stop()
+
+    restarted = make_scheduler(chunk=1)
+    assert restarted.job(job.id).cards[card.address].done == 2
+    [job] = restarted.run_pending()
+    assert job.status == DONE and job.remaining == 0
+    assert card.values == {var_id: "0" for var_id, _ in writes}
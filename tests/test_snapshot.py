@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from nexxstate import MISSING, Snapshot
+
+RESULTS = {"400.0.0@i": "3", "400.1.0@i": 7, "401.0.0@i": RuntimeError("timed out"), "402.0.0@i": "Input 1",
+           "403.0.0@i": None, "404.0.0@i": -12}
+
+
+def test_from_results_stores_unreadable_values_as_missing():
+    snapshot = Snapshot.from_results(RESULTS)
+    assert snapshot.var_ids == list(RESULTS)
+    assert snapshot.get("400.0.0@i") == 3 and snapshot.get("404.0.0@i") == -12
+    assert snapshot.get("401.0.0@i") is None and snapshot.get("402.0.0@i") is None
+    assert snapshot.to_dict() == {"400.0.0@i": 3, "400.1.0@i": 7, "404.0.0@i": -12}
+
+
+@pytest.mark.parametrize("value", [2 ** 40, -2 ** 40, str(2 ** 31)])
+def test_from_results_stores_values_beyond_int32_as_missing(value):
+    snapshot = Snapshot.from_results({"400.0.0@i": value, "400.1.0@i": 1})
+    assert snapshot.get("400.0.0@i") is None and snapshot.get("400.1.0@i") == 1
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "card.nxs")
+    Snapshot.from_results(RESULTS, {"ip": "10.20.0.11", "taken": 1.5}).save(path)
+    loaded = Snapshot.load(path)
+    assert loaded.meta == {"ip": "10.20.0.11", "taken": 1.5}
+    assert loaded.var_ids == list(RESULTS)
+    assert loaded.to_dict() == Snapshot.from_results(RESULTS).to_dict()
+    assert int(loaded.values[loaded.index["401.0.0@i"]]) == MISSING
+
+
+def test_load_memory_maps_the_values(tmp_path):
+    path = str(tmp_path / "card.nxs")
+    Snapshot.from_results(RESULTS).save(path)
+    assert isinstance(Snapshot.load(path).values, np.memmap)
+
+
+def test_loaded_snapshots_share_their_var_id_dictionary(tmp_path):
+    first, second = str(tmp_path / "a.nxs"), str(tmp_path / "b.nxs")
+    Snapshot.from_results(RESULTS).save(first)
+    Snapshot.from_results(dict(RESULTS, **{"400.0.0@i": "4"})).save(second)
+    a, b = Snapshot.load(first), Snapshot.load(second)
+    assert a.var_ids is b.var_ids
+    assert a.diff(b) == [("400.0.0@i", 3, 4)]
+    assert a.count_differences(b) == 1
+
+
+def test_diff_of_different_layouts_reports_missing_sides():
+    a = Snapshot.from_results({"400.0.0@i": 1, "400.1.0@i": 2})
+    b = Snapshot.from_results({"400.1.0@i": 2, "401.0.0@i": 5})
+    assert a.diff(b) == [("400.0.0@i", 1, None), ("401.0.0@i", None, 5)]
+
+
+def test_empty_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "empty.nxs")
+    Snapshot.from_results({}).save(path)
+    assert Snapshot.load(path).to_dict() == {}
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.nxs"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        Snapshot.load(str(path))
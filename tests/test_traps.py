@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from nexxstate import FleetTrapState, TrapMatrix
+
+TRAPS = ["560.x.4@i", "560.x.5@i", "1009.x.0@i"]
+
+
+def matrix(rows, inputs=3):
+    """A matrix with the given enables known on inputs 1..len(rows)."""
+    result = TrapMatrix(TRAPS, inputs)
+    for input_num, row in enumerate(rows, start=1):
+        result.update(input_num, {var_id.replace("x", str(input_num - 1)): value for var_id, value in zip(TRAPS, row)})
+    return result
+
+
+def test_update_records_zero_and_one():
+    card = matrix([["1", "0", 1]])
+    assert card.values[0].tolist() == [True, False, True]
+    assert card.known[0].tolist() == [True, True, True]
+    assert not card.known[1:].any()
+
+
+@pytest.mark.parametrize("value", [2, -1, "7", "on", None, RuntimeError("timed out")])
+def test_update_leaves_other_values_unknown(value):
+    card = matrix([["1", value, "0"]])
+    assert card.known[0].tolist() == [True, False, True]
+    assert not card.values[0, 1]
+
+
+def test_diff_only_compares_cells_known_on_both_sides():
+    card = matrix([["1", "0", "0"], ["1", None, "1"]])
+    golden = TrapMatrix.from_row(TRAPS, [1, 1, 0], 1, 2, inputs=3)
+    assert card.diff(golden)[:2].tolist() == [[False, True, False], [False, False, True]]
+    assert card.differing_inputs(golden) == [1, 2]
+
+
+def test_plan_writes_what_differs_or_is_unknown():
+    card = matrix([["1", "0", "0"], ["1", None, "0"]])
+    golden = TrapMatrix.from_row(TRAPS, [1, 1, 0], 1, 2, inputs=3)
+    assert card.plan(golden) == [("560.0.5@i", 1), ("560.1.5@i", 1)]
+    assert matrix([["1", "1", "0"], ["1", "1", "0"]]).plan(golden) == []
+
+
+def test_writes_of_a_golden_row():
+    golden = TrapMatrix.from_row(TRAPS, [0, 1, 1], 2, 2, inputs=3)
+    assert golden.writes() == [("560.1.4@i", 0), ("560.1.5@i", 1), ("1009.1.0@i", 1)]
+
+
+def test_fleet_state_plans_per_card():
+    golden = TrapMatrix.from_row(TRAPS, [1, 0, 0], inputs=2)
+    fleet = FleetTrapState({"a": matrix([["1", "0", "0"], ["1", "0", "0"]], 2),
+                            "b": matrix([["1", "1", "0"], ["1", "0", "0"]], 2)})
+    assert fleet.differing_inputs(golden) == {"b": [1]}
+    assert fleet.plans(golden) == {"b": [("560.0.5@i", 0)]}
+    assert np.array_equal(fleet.card("b").values, matrix([["1", "1", "0"], ["1", "0", "0"]], 2).values)
+
+
+def test_fleet_state_refuses_different_layouts():
+    with pytest.raises(ValueError):
+        FleetTrapState({"a": TrapMatrix(TRAPS, 2), "b": TrapMatrix(TRAPS[:2], 2)})
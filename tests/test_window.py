@@ -0,0 +1,33 @@
+from nexxclient import AdaptiveWindow
+
+
+def test_window_grows_by_one_per_round_trip():
+    window = AdaptiveWindow(latency_ceiling=0.25, initial=4, maximum=16)
+    for _ in range(4):
+        window.on_success(0.01)
+    assert window.size == 4  # 1/4 + 1/4.25 + ... is just short of a whole request
+    window.on_success(0.01)
+    assert window.size == 5
+    for _ in range(200):
+        window.on_success(0.01)
+    assert window.size == 16
+
+
+def test_window_halves_once_per_round_trip():
+    window = AdaptiveWindow(latency_ceiling=0.25, initial=16)
+    window.on_error()
+    assert window.size == 8
+    window.on_error()
+    window.on_success(1.0)
+    assert window.size == 8
+
+
+def test_window_halves_on_slow_replies_and_keeps_its_minimum(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("nexxclient.time.monotonic", lambda: now[0])
+    window = AdaptiveWindow(latency_ceiling=0.25, initial=8, minimum=1)
+    for _ in range(6):
+        window.on_success(1.0)
+        now[0] += 2.0
+    assert window.size == 1
+    assert window.latency > 0.25